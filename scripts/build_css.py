@@ -0,0 +1,218 @@
+# Classes CSS em uso e poda das folhas de estilo por tipo de página.
+import json
+import re
+
+from build_lib import ROOT
+
+# ===== CSS: classes em uso e poda por tipo de página =====
+# Extratores compartilhados por tools/audita_css.py (auditoria) e
+# scripts/gerar_css.py (CSS crítico + folhas podadas por tipo de página).
+CSS_DIST = ROOT / "styles" / "dist"
+CSS_MANIFEST = CSS_DIST / "css-manifest.json"
+
+# Classes sempre consideradas em uso (ajuste aqui se mudar convenções)
+SAFELIST = {
+  # utilitários/core
+  "visually-hidden","sr-only-focusable","skip-link","js", "bg-surface", "shadow-1", "shadow-2",
+  # header/nav
+  "header","header__inner","logo","nav","nav__list","footer","footer__inner",
+  # comparador (injetadas por JS)
+  "chip","card","cmp-card","cmp-card__title","cmp-grid","cmp-cell","cmp-cell--label",
+  "cmp-colhead","cmp-colhead__box","cmp-colhead__txt","cmp-thumb","cmp-add-col","cmp-add-input","cmp-spacer", "compare-main", "page-compare"
+}
+SAFE_PREFIXES = ("is-","js-","cmp-")  # estados, hooks e família do comparador
+
+
+def _norm(c: str) -> str:
+    """Normaliza nome de classe: remove ponto, pseudo, separadores."""
+    c = (c or "").strip()
+    if c.startswith("."):
+        c = c[1:]
+    c = re.split(r"[:\s,>+~]", c)[0]
+    return c
+
+def extract_css_classes(text: str) -> set[str]:
+    """Extrai classes definidas no CSS (sem pseudo)."""
+    raw = re.findall(r"\.[a-zA-Z0-9_-]+", text)
+    cleaned = []
+    for t in raw:
+        name = t[1:]
+        if not name or name[0].isdigit():
+            continue
+        if re.match(r"^\d*(rem|em|vw|vh|ms|s|px)$", name):
+            continue
+        name = re.split(r"[:\s]", name)[0]
+        cleaned.append(_norm(name))
+    return set(cleaned)
+
+def extract_used_from_html(text: str) -> set[str]:
+    """Extrai classes usadas do HTML estático (class="a b")."""
+    used = set()
+    for m in re.findall(r'class=(["\'])(.*?)\1', text, flags=re.S):
+        for cls in re.split(r"\s+", m[1].strip()):
+            if cls:
+                used.add(_norm(cls))
+    return used
+
+def extract_used_from_js(text: str) -> set[str]:
+    """Extrai classes usadas em JS (classList, className, setAttribute, seletores CSS)."""
+    used = set()
+
+    # 1) classList.add/remove/toggle('a','b',"c")
+    for call in re.findall(r'classList\.(?:add|remove|toggle)\((.*?)\)', text, flags=re.S):
+        for token in re.findall(r'["\']([a-zA-Z0-9_-]+)["\']', call):
+            used.add(_norm(token))
+
+    # 2) Atribuição direta: el.className = "a b"
+    for value in re.findall(r'\.className\s*=\s*(["\'])(.*?)\1', text, flags=re.S):
+        for token in re.findall(r'[a-zA-Z0-9_-]+', value[1]):
+            used.add(_norm(token))
+
+    # 3) setAttribute('class', 'a b')
+    for value in re.findall(r'setAttribute\(\s*["\']class["\']\s*,\s*(["\'])(.*?)\1\)', text, flags=re.S):
+        for token in re.findall(r'[a-zA-Z0-9_-]+', value[1]):
+            used.add(_norm(token))
+
+    # 4) Template strings: class=`a b` (com crase)
+    for content in re.findall(r'class\s*=\s*`([^`]+)`', text, flags=re.S):
+        for token in re.findall(r'[a-zA-Z0-9_-]+', content):
+            used.add(_norm(token))
+
+    # 5) Seletores em querySelector/All, matches e closest: extrai .minhas-classe(s)
+    for sel in re.findall(r'(?:querySelector(?:All)?|matches|closest)\(\s*([\'"`])([^\'"`]+)\1\s*\)', text):
+        for token in re.findall(r'\.([a-zA-Z0-9_-]+)', sel[1]):
+            used.add(_norm(token))
+
+    return used
+
+
+def is_safelisted(cls: str) -> bool:
+    return cls in SAFELIST or any(cls.startswith(pref) for pref in SAFE_PREFIXES)
+
+def _css_blocos(text):
+    """(prelúdio, corpo ou None) de primeiro nível; None = instrução terminada em ';'."""
+    i, n = 0, len(text)
+    while i < n:
+        j = i
+        while j < n and text[j] not in "{;":
+            j += 1
+        prelude = text[i:j].strip()
+        if j >= n:
+            break
+        if text[j] == ";":
+            if prelude:
+                yield prelude, None
+            i = j + 1
+            continue
+        depth, k, quote = 1, j + 1, None
+        while k < n and depth:
+            ch = text[k]
+            if quote:
+                if ch == "\\":
+                    k += 1
+                elif ch == quote:
+                    quote = None
+            elif ch in "\"'":
+                quote = ch
+            elif ch == "{":
+                depth += 1
+            elif ch == "}":
+                depth -= 1
+            k += 1
+        yield prelude, text[j + 1:k - 1]
+        i = k
+
+def _split_top(s, sep=","):
+    """Divide `s` em `sep` fora de parênteses/colchetes (ex.: :where(a, b))."""
+    out, depth, cur = [], 0, []
+    for ch in s:
+        if ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        if ch == sep and depth == 0:
+            out.append("".join(cur).strip())
+            cur = []
+        else:
+            cur.append(ch)
+    out.append("".join(cur).strip())
+    return [x for x in out if x]
+
+def parse_css(text):
+    """
+    Regras de uma folha de estilo em ordem: (media, seletores, corpo), com
+    `media` = prelúdio do @media que envolve a regra (ou None). Demais
+    at-rules vêm inteiras em `corpo`, com seletores None (sempre mantidas).
+    """
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    regras = []
+    for prelude, body in _css_blocos(text):
+        if prelude.startswith("@media") and body is not None:
+            for sel, corpo in _css_blocos(body):
+                if corpo is not None:
+                    regras.append((prelude, _split_top(sel), corpo))
+        elif prelude.startswith("@"):
+            regras.append((None, None, prelude + (f"{{{body}}}" if body is not None else ";")))
+        else:
+            regras.append((None, _split_top(prelude), body))
+    return regras
+
+def selector_classes(sel: str) -> set[str]:
+    """
+    Classes que um seletor exige. Strings, [atributos] e o conteúdo de
+    pseudo-classes funcionais (:not, :is, :where, :has) não contam — na
+    dúvida, a regra é mantida.
+    """
+    sel = re.sub(r"\"[^\"]*\"|'[^']*'", "", sel)
+    sel = re.sub(r"\[[^\]]*\]", "", sel)
+    while True:
+        s2 = re.sub(r":[a-zA-Z-]+\([^()]*\)", "", sel)
+        if s2 == sel:
+            break
+        sel = s2
+    return set(re.findall(r"\.(-?[_a-zA-Z][\w-]*)", sel))
+
+def _css_min(body: str) -> str:
+    body = re.sub(r"\s+", " ", body).strip()
+    return re.sub(r"\s*([;{}])\s*", r"\1", body).rstrip(";")
+
+def prune_css(regras, usadas, safelist=True) -> str:
+    """
+    CSS (minificado) só com os seletores cujas classes estão todas em
+    `usadas` (ou na safelist); regras sem classes (elementos, :root) ficam.
+    Regras sem declarações (`.x main{}`) saem. A ordem original é preservada
+    (a cascata não muda).
+    """
+    ok = (lambda c: c in usadas or is_safelisted(c)) if safelist else usadas.__contains__
+    out, media_atual, bloco = [], None, []
+
+    def fecha():
+        if media_atual is not None and bloco:
+            out.append(f"{media_atual}{{{''.join(bloco)}}}")
+        bloco.clear()
+
+    for media, sels, corpo in regras:
+        if sels is None:
+            texto = corpo
+        else:
+            decl = _css_min(corpo)
+            manter = [s for s in sels if all(ok(c) for c in selector_classes(s))] if decl else None
+            if not manter:
+                continue
+            texto = f"{','.join(manter)}{{{decl}}}"
+        if media != media_atual:
+            fecha()
+            media_atual = media
+        if media is None:
+            out.append(texto)
+        else:
+            bloco.append(texto)
+    fecha()
+    return "".join(out)
+
+def load_css_manifest() -> dict:
+    """styles/dist/css-manifest.json (tipo -> href e CSS crítico); {} se ainda não gerado."""
+    try:
+        return json.loads(CSS_MANIFEST.read_text(encoding="utf-8")).get("tipos", {})
+    except (FileNotFoundError, ValueError):
+        return {}
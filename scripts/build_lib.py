@@ -1,5 +1,7 @@
 from pathlib import Path
 from html import escape as _escape
+from string import Template
+import hashlib
 import json
 import unicodedata
 import re
@@ -7,17 +9,186 @@ import re
 # ===== Paths / Carregamento =====
 ROOT = Path(__file__).resolve().parents[1]
 
-def load_all():
-    """Carrega site, regras e raças."""
+def load_site_rules():
+    """Carrega site e regras (sem o catálogo)."""
     site  = json.loads((ROOT/"data/site.json").read_text(encoding="utf-8"))
     rules = json.loads((ROOT/"data/rules.json").read_text(encoding="utf-8"))
-    racas = json.loads((ROOT/"data/racas.json").read_text(encoding="utf-8"))
-    return site, rules, racas
+    return site, rules
+
+def load_all():
+    """Carrega site, regras e raças."""
+    site, rules = load_site_rules()
+    return site, rules, list(iter_racas())
+
+def catalog_path():
+    """data/racas.ndjson se existir; senão data/racas.json."""
+    nd = ROOT/"data/racas.ndjson"
+    return nd if nd.exists() else ROOT/"data/racas.json"
+
+def iter_racas(path=None):
+    """
+    Itera o catálogo de raças. Em NDJSON (uma raça por linha) lê linha a
+    linha, sem manter o catálogo inteiro em memória; em JSON (array) carrega
+    o arquivo e itera.
+    """
+    path = Path(path) if path else catalog_path()
+    if path.suffix == ".ndjson":
+        with path.open(encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path.name}:{n}: {e}") from None
+    else:
+        yield from json.loads(path.read_text(encoding="utf-8"))
+
+def iter_batches(it, size):
+    """Agrupa um iterável em listas de até `size` itens."""
+    batch = []
+    for x in it:
+        batch.append(x)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
 def load_aliases_map():
     p = ROOT / "data" / "aliases_oficiais.json"
     return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
 
+# ===== Hashes / Build incremental =====
+CACHE_DIR = ROOT / ".build-cache"
+
+def content_hash(data) -> str:
+    """sha256 (hex) de bytes ou str."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+def json_hash(obj) -> str:
+    """Hash estável de um objeto JSON (chaves ordenadas)."""
+    return content_hash(json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(",", ":")))
+
+def file_hash(path: Path) -> str:
+    """sha256 (hex) de um arquivo, lido em blocos."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+def write_if_changed(path: Path, text) -> bool:
+    """Escreve (str ou bytes) só se os bytes mudaram (preserva mtime). Retorna True se escreveu."""
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+class BuildManifest:
+    """
+    Manifesto de hashes das entradas de cada saída gerada.
+    Cada página tem uma chave (hash das entradas); se a chave não mudou
+    desde o último build e o arquivo existe, a página não é re-renderizada.
+    """
+    VERSION = 1
+
+    def __init__(self, name: str, enabled: bool = True, root: Path = ROOT):
+        self.path = CACHE_DIR / f"{name}.json"
+        self.root = root
+        self.enabled = enabled
+        self.prev = {}
+        if enabled and self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == self.VERSION:
+                    self.prev = data.get("pages", {})
+            except ValueError:
+                self.prev = {}
+        self.pages = {}
+
+    def is_fresh(self, rel: str, key: str) -> bool:
+        self.pages[rel] = key
+        return self.enabled and self.prev.get(rel) == key and (self.root / rel).exists()
+
+    def keep(self, rel: str):
+        """Mantém a chave anterior de uma saída que não foi avaliada neste build."""
+        if rel in self.prev:
+            self.pages[rel] = self.prev[rel]
+
+    def previous(self, rel: str):
+        """Chave de `rel` no build anterior (None se não houver ou com o manifesto desligado)."""
+        return self.prev.get(rel) if self.enabled else None
+
+    def record(self, rel: str, key: str):
+        """Registra a chave de `rel` sem checar a saída (ex.: chaves com estado próprio)."""
+        self.pages[rel] = key
+
+    def save(self):
+        """Grava o manifesto; o build atual passa a ser a referência do próximo."""
+        CACHE_DIR.mkdir(exist_ok=True)
+        # compacto e na ordem do build: indent força o encoder em Python puro
+        # (lento com muitas páginas); a ordem já é determinística
+        write_if_changed(self.path, json.dumps(
+            {"version": self.VERSION, "pages": self.pages},
+            ensure_ascii=False, separators=(",", ":")
+        ))
+        self.prev, self.pages = self.pages, {}
+
+# ===== Templates compilados =====
+_MISSING = object()
+
+class CompiledTemplate:
+    """
+    Template com a sintaxe e a semântica de string.Template.safe_substitute
+    (${var} / $var, $$ → $, placeholders ausentes ficam como estão), mas
+    compilado uma única vez em trechos estáticos + índices dos slots: cada
+    render só preenche os slots e junta as partes, sem reescanear o texto.
+    """
+    def __init__(self, template: str):
+        self.template = template
+        parts, slots, literal = [], [], []
+        pos = 0
+        for mo in Template.pattern.finditer(template):
+            literal.append(template[pos:mo.start()])
+            pos = mo.end()
+            nome = mo.group("named") or mo.group("braced")
+            if nome is None:
+                # "$$" vira "$"; "$" inválido fica como está
+                literal.append("$" if mo.group("escaped") is not None else mo.group())
+                continue
+            parts.append("".join(literal))
+            literal = []
+            slots.append((len(parts), nome))
+            parts.append(mo.group())  # ausente no mapping: fica o texto original
+        literal.append(template[pos:])
+        parts.append("".join(literal))
+        self.parts = parts
+        self.slots = slots
+
+    def parts_for(self, mapping=None, /, **kws):
+        """Trechos da página (estáticos e slots preenchidos), na ordem, sem juntar."""
+        if mapping is None:
+            mapping = kws
+        elif kws:
+            mapping = {**mapping, **kws}
+        out = self.parts.copy()
+        for i, nome in self.slots:
+            v = mapping.get(nome, _MISSING)
+            if v is not _MISSING:
+                out[i] = v if type(v) is str else str(v)
+        return out
+
+    def safe_substitute(self, mapping=None, /, **kws):
+        return "".join(self.parts_for(mapping, **kws))
+
 # ===== Utilitários =====
 rng = re.compile(r"(\d+)\D+(\d+)")
 
@@ -118,22 +289,142 @@ def parse_minmax(txt):
 def breed_slug(r):
     return (r.get("slug") or slugify(r["nome"]))
 
-def get_aliases_for_breed(r, aliases_map):
-    sl = breed_slug(r)
-    arr = aliases_map.get(sl) or []
+def dedup_aliases(arr):
     seen, out = set(), []
-    for a in arr:
+    for a in arr or []:
         a = (a or "").strip()
         if a and a.lower() not in seen:
             seen.add(a.lower())
             out.append(a)
     return out
 
+def get_aliases_for_breed(r, aliases_map):
+    return dedup_aliases(aliases_map.get(breed_slug(r)))
+
+# ===== Busca (índice invertido da lista de raças) =====
+_RE_SIMPL_APOS  = re.compile(r"[’'´`-]+")
+_RE_SIMPL_OUTRO = re.compile(r"[^a-z0-9]+")
+_RE_SIMPL_ESPAC = re.compile(r"\s+")
+_RE_COMBINANTE  = re.compile(r"[\u0300-\u036f]")
+
+def simplify(s: str) -> str:
+    """Normalização de busca — idêntica ao simplify() de scripts/main.js."""
+    s = _RE_COMBINANTE.sub("", unicodedata.normalize("NFD", s or "")).lower()
+    s = _RE_SIMPL_APOS.sub(" ", s)
+    s = _RE_SIMPL_OUTRO.sub(" ", s)
+    return _RE_SIMPL_ESPAC.sub(" ", s).strip()
+
+def _gaps(ids):
+    """Postings (ids crescentes) codificadas como diferenças."""
+    return [ids[0]] + [b - a for a, b in zip(ids, ids[1:])] if ids else []
+
+def build_search_index(entries):
+    """
+    Índice invertido da listagem. `entries`: (slug, nome, aliases, porte, grupo)
+    na ordem da lista. Termos = tokens de simplify(nome + aliases), ordenados
+    (o cliente resolve prefixos por busca binária); postings de termos, porte e
+    grupo FCI são ids das raças em `slugs`/`nomes`, com diferenças (delta).
+    """
+    slugs, nomes, terms, portes, grupos = [], [], {}, {}, {}
+    for i, (slug, nome, aliases, porte, grupo) in enumerate(entries):
+        slugs.append(slug)
+        nomes.append(nome)
+        for t in sorted(set(simplify(" ".join([nome, *aliases])).split())):
+            terms.setdefault(t, []).append(i)
+        if porte:
+            portes.setdefault(porte, []).append(i)
+        if grupo:
+            grupos.setdefault(str(grupo), []).append(i)
+    return {
+        "v": 1,
+        "slugs": slugs,
+        "nomes": nomes,
+        "terms": [[t, _gaps(terms[t])] for t in sorted(terms)],
+        "porte": {k: _gaps(v) for k, v in sorted(portes.items())},
+        "grupo": {k: _gaps(v) for k, v in sorted(grupos.items())},
+    }
+
+# ===== Índice de raças (slugs e aliases) =====
+class BreedIndex:
+    """
+    Slugs canônicos e aliases (deduplicados uma única vez) compartilhados
+    pelos geradores. add() registra nome e aliases de uma raça no mapa
+    reverso simplify(texto) -> slug, usado pelo comparador para resolver
+    nomes/aliases em O(1). Em conflito, nome vence alias e o primeiro
+    registrado vence; os conflitos ficam em `colisoes`.
+    """
+    def __init__(self, aliases_map=None):
+        self.aliases = {sl: dedup_aliases(arr) for sl, arr in (aliases_map or {}).items()}
+        self.lookup = {}      # chave normalizada -> (slug, prioridade)
+        self.colisoes = []    # (chave, slug mantido, slug descartado)
+        self._slugs = {}      # nome -> slug (quando o registro não traz slug)
+        self._hashes = {}
+
+    def slug(self, r) -> str:
+        sl = r.get("slug")
+        if sl:
+            return sl
+        nome = r["nome"]
+        sl = self._slugs.get(nome)
+        if sl is None:
+            sl = self._slugs[nome] = slugify(nome)
+        return sl
+
+    def aliases_for(self, slug) -> list:
+        return self.aliases.get(slug) or []
+
+    def aliases_of(self, r) -> list:
+        return self.aliases_for(self.slug(r))
+
+    def aliases_hash(self, slug) -> str:
+        """json_hash dos aliases do slug (chaves do build incremental)."""
+        h = self._hashes.get(slug)
+        if h is None:
+            h = self._hashes[slug] = json_hash(self.aliases_for(slug))
+        return h
+
+    def _registrar(self, texto, slug, prioridade):
+        chave = simplify(texto)
+        if not chave:
+            return
+        atual = self.lookup.get(chave)
+        if atual is None:
+            self.lookup[chave] = (slug, prioridade)
+        elif atual[0] != slug:
+            if prioridade < atual[1]:
+                self.lookup[chave] = (slug, prioridade)
+                self.colisoes.append((chave, slug, atual[0]))
+            else:
+                self.colisoes.append((chave, atual[0], slug))
+
+    def add(self, r) -> str:
+        """Registra a raça no mapa reverso; retorna o slug."""
+        slug = self.slug(r)
+        self._registrar(slug.replace("-", " "), slug, 0)
+        self._registrar(r["nome"], slug, 0)
+        for a in self.aliases_for(slug):
+            self._registrar(a, slug, 1)
+        return slug
+
+    def resolve(self, texto):
+        """Slug para um nome, alias ou slug (None se desconhecido)."""
+        hit = self.lookup.get(simplify(texto))
+        return hit[0] if hit else None
+
+    def client_lookup(self) -> dict:
+        """Mapa para o cliente, com chaves ordenadas (prefixos por busca binária)."""
+        return {"v": 1, "k": {k: self.lookup[k][0] for k in sorted(self.lookup)}}
+
+PORTES = ("mini", "pequeno", "medio", "grande", "gigante")
+
 def human_porte(p):
     m = {"mini":"Mini","pequeno":"Pequeno","medio":"Médio","grande":"Grande","gigante":"Gigante"}
     return m.get((p or "").lower(), "—")
 
 # ===== Scores / Textos =====
+SHEDDING_ESTACOES = ("baixo", "moderado", "alto")
+SHEDDING_SAZONAL = {"moderado", "alto"}
+
 FUNCOES_TXT = {
     "herding":"pastoreio", "retriever":"recolhedor de caça", "pointer":"cão de aponte",
     "terrier":"controle de pragas", "scent":"farejador", "guard":"guarda",
@@ -151,119 +442,82 @@ SUGESTOES = {
   "companhia": "passeios leves e interação social diária"
 }
 
-def score_atividade(r, rules):
-    at = r["atributos"]
-    grupo = str(at.get("fci_grupo") or "")
-    fci_int = rules["fci_base_intensidade"].get(grupo, 3)
-    fci_min = rules["fci_base_minutos"].get(grupo, 60)
-    intensidade = clamp_0_5(fci_int)
+def duracao_frase(mins):
+    if mins is None:
+        return "duração moderada"
+    if mins >= 90:
+        return "longa duração"
+    if mins >= 75:
+        return "duração moderada a longa"
+    if mins >= 60:
+        return "duração moderada"
+    if mins >= 45:
+        return "duração curta a moderada"
+    return "curta duração"
 
-    # === Funções/perfil + estimulação cognitiva ===
-    funcoes = at.get("funcoes", []) or []
-    funcao_pref = at.get("funcao_principal")
+def fun_pt(code: str) -> str:
+    return FUNCOES_TXT.get(code, (code or "").replace("_", " "))
 
-    main_func = funcao_pref if (funcao_pref and funcao_pref in funcoes) else (funcoes[0] if funcoes else None)
-    funcoes_escolhidas = [f for f in [main_func] if f]
-    # opcional: mostra no máx. 2 funções (principal + 1)
-    if funcoes:
-        for f in funcoes:
-            if f and f != main_func:
-                funcoes_escolhidas.append(f)
-                break
+# Regexes do tokenizador de sugestões (compiladas uma vez)
+_RE_SUPERVISAO = re.compile(r"\s+com\s+supervis[ãa]o\b")
+_RE_APORTE     = re.compile(r"\b(aportes?|apporte|buscar\s+e\s+trazer|buscar\s*,?\s*trazer)\b")
+_RE_APORTE_DEL = re.compile(r"\b(aportes?|apporte)\b\s*(\([^)]*\))?")
+_RE_BUSCAR_DEL = re.compile(r"\bbuscar\s*(?:,?\s*e\s*)?trazer\b")
+_RE_AQUATICO   = re.compile(r"\b(nata[çc][ãa]o|brincadeiras?\s+com\s+água|atividades?\s+aqu[áa]ticas?)\b")
+_RE_PAR_VAZIO  = re.compile(r"\(\s*\)")
+_RE_ESPACOS    = re.compile(r"\s{2,}")
+_RE_SEPARADOR  = re.compile(r",|\se\s|\sou\s|/")
+_RE_CONECTOR   = re.compile(r"(e|ou|com|de|do|da|dos|das|para|no|na|nos|nas)")
 
-    estimulo_map = rules["mental_funcoes"]
-    estimulo_vals = [estimulo_map.get(f, 2) for f in funcoes] or [2]
-    estimulo = clamp_0_5(max(estimulo_vals))
+def tokenizar_sugestao(s: str) -> list[str]:
+    s = (s or "").lower().strip()
 
-    # === Score final (0–5) com pesos ===
-    w = rules["pesos"]["atividade_fisica"]
-    val = round_int(
-        clamp_0_5(
-            intensidade * w["intensidade"]
-            + minutes_to_scale(fci_min) * w["duracao"]
-            + estimulo * w["estimulo_mental"]
-        )
-    )
+    # remove "com supervisão" (variações)
+    s = _RE_SUPERVISAO.sub("", s)
 
-    # === Texto base (sempre mostrado) ===
-    def duracao_frase(mins):
-        if mins is None:
-            return "duração moderada"
-        if mins >= 90:
-            return "longa duração"
-        if mins >= 75:
-            return "duração moderada a longa"
-        if mins >= 60:
-            return "duração moderada"
-        if mins >= 45:
-            return "duração curta a moderada"
-        return "curta duração"
+    tokens: list[str] = []
 
-    mins_chunk = f" (≈{fci_min} min/dia)" if fci_min is not None else ""
-    texto = (
-        f"Os cães da raça {r['nome']} costumam apresentar "
-        f"<strong>nível de energia física {nivel_txt(intensidade)}</strong>, "
-        f"necessitando de atividades de <strong>{duracao_frase(fci_min)}</strong>{mins_chunk} "
-        f"e de <strong>exigência cognitiva {nivel_txt(estimulo)}</strong>."
-    )
+    # 1) Agregar "aportes / buscar e trazer"
+    if _RE_APORTE.search(s):
+        tokens.append("aportes (buscar e trazer)")
+        # remove "aportes" + parênteses opcionais
+        s = _RE_APORTE_DEL.sub("", s)
+        # remove "buscar e trazer" (em qualquer formato comum)
+        s = _RE_BUSCAR_DEL.sub("", s)
 
-    # === Frase final (perfil + sugestões) no estilo antigo ===
-    def fun_pt(code: str) -> str:
-        return FUNCOES_TXT.get(code, (code or "").replace("_", " "))
-
-    def sug(code: str) -> str | None:
-        return SUGESTOES.get(code)
-
-    def tokenizar(s: str) -> list[str]:
-      s = (s or "").lower().strip()
-
-      # remove "com supervisão" (variações)
-      s = re.sub(r"\s+com\s+supervis[ãa]o\b", "", s)
-
-      tokens: list[str] = []
-
-      # 1) Agregar "aportes / buscar e trazer"
-      if re.search(r"\b(aportes?|apporte|buscar\s+e\s+trazer|buscar\s*,?\s*trazer)\b", s):
-          tokens.append("aportes (buscar e trazer)")
-          # remove "aportes" + parênteses opcionais
-          s = re.sub(r"\b(aportes?|apporte)\b\s*(\([^)]*\))?", "", s)
-          # remove "buscar e trazer" (em qualquer formato comum)
-          s = re.sub(r"\bbuscar\s*(?:,?\s*e\s*)?trazer\b", "", s)
-
-      # 2) Agregar qualquer coisa aquática
-      if re.search(r"\b(nata[çc][ãa]o|brincadeiras?\s+com\s+água|atividades?\s+aqu[áa]ticas?)\b", s):
-          tokens.append("atividades aquáticas supervisionadas")
-          s = re.sub(r"\b(nata[çc][ãa]o|brincadeiras?\s+com\s+água|atividades?\s+aqu[áa]ticas?)\b", "", s)
-
-      # 3) Limpezas finais: parênteses vazios, espaços e pontuação sobrando
-      s = re.sub(r"\(\s*\)", "", s)         # <- remove "()" que causava o bug
-      s = re.sub(r"\s{2,}", " ", s).strip(" ,.;/")
-
-      # 4) Quebrar o resto por vírgula, " e ", " ou " e "/"
-      parts = re.split(r",|\se\s|\sou\s|/", s)
-      for p in parts:
-          p = p.strip(" ,.;/")
-          if not p:
-              continue
-          # filtra conectores soltos
-          if re.fullmatch(r"(e|ou|com|de|do|da|dos|das|para|no|na|nos|nas)", p):
-              continue
-          tokens.append(p)
-
-      # 5) Dedup na ordem + filtra resíduos
-      out: list[str] = []
-      seen: set[str] = set()
-      for t in tokens:
-          t = t.strip()
-          if not t or t in {"()", "( )"}:
-              continue
-          if t not in seen:
-              seen.add(t)
-              out.append(t)
-      return out
+    # 2) Agregar qualquer coisa aquática
+    if _RE_AQUATICO.search(s):
+        tokens.append("atividades aquáticas supervisionadas")
+        s = _RE_AQUATICO.sub("", s)
 
+    # 3) Limpezas finais: parênteses vazios, espaços e pontuação sobrando
+    s = _RE_PAR_VAZIO.sub("", s)         # <- remove "()" que causava o bug
+    s = _RE_ESPACOS.sub(" ", s).strip(" ,.;/")
 
+    # 4) Quebrar o resto por vírgula, " e ", " ou " e "/"
+    for p in _RE_SEPARADOR.split(s):
+        p = p.strip(" ,.;/")
+        if not p:
+            continue
+        # filtra conectores soltos
+        if _RE_CONECTOR.fullmatch(p):
+            continue
+        tokens.append(p)
 
+    # 5) Dedup na ordem + filtra resíduos
+    out: list[str] = []
+    seen: set[str] = set()
+    for t in tokens:
+        t = t.strip()
+        if not t or t in {"()", "( )"}:
+            continue
+        if t not in seen:
+            seen.add(t)
+            out.append(t)
+    return out
+
+def perfil_funcoes(funcoes_escolhidas) -> dict:
+    """Textos de perfil/função e sugestões de atividades (deduplicadas) para as funções."""
     funcs_txt = [fun_pt(f) for f in funcoes_escolhidas if f]
     funcao_txt = " e ".join(funcs_txt) if funcs_txt else ""
     perfil_label = "Seus perfis/funções típicas são" if len(funcs_txt) > 1 else "Seu perfil/função típica é"
@@ -271,9 +525,9 @@ def score_atividade(r, rules):
     # monta trailer de atividades (deduplicado)
     todos_tokens: list[str] = []
     for f in funcoes_escolhidas:
-        s = sug(f)
+        s = SUGESTOES.get(f)
         if s:
-            todos_tokens += tokenizar(s)
+            todos_tokens += tokenizar_sugestao(s)
     uniq: list[str] = []
     seen: set[str] = set()
     for t in todos_tokens:
@@ -289,9 +543,119 @@ def score_atividade(r, rules):
             ativ_trailer += f"{atividades_final}</strong>."
         else:
             ativ_trailer = "."
-        texto += f" {perfil_label} de <strong>{funcao_txt}</strong>{ativ_trailer}"
     else:
         ativ_trailer = ""  # nada a dizer; mantém texto base
+    return {"funcao_txt": funcao_txt, "perfil_label": perfil_label,
+            "atividades_final": atividades_final, "ativ_trailer": ativ_trailer}
+
+class ScoringContext:
+    """
+    Regras do rules.json pré-compiladas para os scores: tabelas de lookup,
+    pesos já resolvidos e um cache dos textos de perfil/sugestões por função
+    (ou par de funções). Montado uma vez por build e aceito no lugar de
+    `rules` por todos os score_*; ctx["chave"] continua devolvendo o JSON.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.fci_base_intensidade = rules["fci_base_intensidade"]
+        self.fci_base_minutos = rules["fci_base_minutos"]
+        self.fci_grupos = rules.get("fci_grupos", {})
+        self.mental_funcoes = rules["mental_funcoes"]
+        self.escovacao_pelo = rules["escovacao_pelo"]
+        self.shedding_subpelo = rules["shedding_subpelo"]
+        self.tosa_necessidade = rules["tosa_necessidade"]
+
+        w = rules["pesos"]["atividade_fisica"]
+        self.w_atividade = (w["intensidade"], w["duracao"], w["estimulo_mental"])
+        w = rules["pesos"]["higiene_pelagem"]
+        self.w_grooming = (w["escovacao"], w["shedding"], w["tosa"])
+        self.perfil = rules["perfil_ambiente"]
+        w = rules["pesos"]["clima_ambiente"][self.perfil]
+        self.w_clima = (w["calor"], w["umidade"], w["espaco"])
+        # todos os perfis de clima das regras, na ordem do rules.json
+        perfis = rules["pesos"]["clima_ambiente"]
+        self.perfis_clima = tuple(perfis)
+        self.w_clima_perfis = tuple((w["calor"], w["umidade"], w["espaco"]) for w in perfis.values())
+        self.i_perfil = self.perfis_clima.index(self.perfil)
+        self.perfis_clima_txt = tuple(perfil_clima_label(p) for p in self.perfis_clima)
+
+        self._perfis = {}
+
+    @classmethod
+    def of(cls, rules):
+        """Devolve o próprio contexto, ou monta um a partir do dict de regras."""
+        return rules if isinstance(rules, cls) else cls(rules)
+
+    def __getitem__(self, key):
+        return self.rules[key]
+
+    def get(self, key, default=None):
+        return self.rules.get(key, default)
+
+    def perfil_funcoes(self, funcoes_escolhidas) -> dict:
+        key = tuple(funcoes_escolhidas)
+        hit = self._perfis.get(key)
+        if hit is None:
+            hit = self._perfis[key] = perfil_funcoes(key)
+        return hit
+
+def _funcoes_escolhidas(at):
+    funcoes = at.get("funcoes", []) or []
+    funcao_pref = at.get("funcao_principal")
+
+    main_func = funcao_pref if (funcao_pref and funcao_pref in funcoes) else (funcoes[0] if funcoes else None)
+    funcoes_escolhidas = [f for f in [main_func] if f]
+    # opcional: mostra no máx. 2 funções (principal + 1)
+    if funcoes:
+        for f in funcoes:
+            if f and f != main_func:
+                funcoes_escolhidas.append(f)
+                break
+    return funcoes_escolhidas
+
+def score_atividade(r, rules):
+    ctx = ScoringContext.of(rules)
+    at = r["atributos"]
+    grupo = str(at.get("fci_grupo") or "")
+    fci_int = ctx.fci_base_intensidade.get(grupo, 3)
+    fci_min = ctx.fci_base_minutos.get(grupo, 60)
+    intensidade = clamp_0_5(fci_int)
+
+    # === Funções/perfil + estimulação cognitiva ===
+    funcoes = at.get("funcoes", []) or []
+
+    estimulo_map = ctx.mental_funcoes
+    estimulo_vals = [estimulo_map.get(f, 2) for f in funcoes] or [2]
+    estimulo = clamp_0_5(max(estimulo_vals))
+
+    # === Score final (0–5) com pesos ===
+    wi, wd, we = ctx.w_atividade
+    val = round_int(
+        clamp_0_5(
+            intensidade * wi
+            + minutes_to_scale(fci_min) * wd
+            + estimulo * we
+        )
+    )
+    return (val, *texto_atividade(r, intensidade, fci_min, estimulo, ctx))
+
+def texto_atividade(r, intensidade, fci_min, estimulo, ctx):
+    """Texto e facts de atividade a partir dos valores já calculados."""
+    # === Texto base (sempre mostrado) ===
+    mins_chunk = f" (≈{fci_min} min/dia)" if fci_min is not None else ""
+    texto = (
+        f"Os cães da raça {r['nome']} costumam apresentar "
+        f"<strong>nível de energia física {nivel_txt(intensidade)}</strong>, "
+        f"necessitando de atividades de <strong>{duracao_frase(fci_min)}</strong>{mins_chunk} "
+        f"e de <strong>exigência cognitiva {nivel_txt(estimulo)}</strong>."
+    )
+
+    # === Frase final (perfil + sugestões) no estilo antigo ===
+    pf = ctx.perfil_funcoes(_funcoes_escolhidas(r["atributos"]))
+    funcao_txt = pf["funcao_txt"]
+    if funcao_txt:
+        texto += f" {pf['perfil_label']} de <strong>{funcao_txt}</strong>{pf['ativ_trailer']}"
 
     # === Facts para UI/JSON (compatível com novo e antigo) ===
     facts = {
@@ -300,29 +664,39 @@ def score_atividade(r, rules):
         "minutos_dia": fci_min,
         "exigencia_cog_txt": nivel_txt(estimulo),
         "perfil_txt": funcao_txt,                   # ex: "recolhedor de caça" ou "recolhedor de caça e farejador"
-        "sugestoes_txt": atividades_final,          # ex: "aportes (buscar e trazer), atividades aquáticas supervisionadas"
+        "sugestoes_txt": pf["atividades_final"],    # ex: "aportes (buscar e trazer), atividades aquáticas supervisionadas"
         # compat com template antigo:
-        "perfil_label": perfil_label,               # "Seu perfil/função típica é" | "Seus perfis/funções típicas são"
+        "perfil_label": pf["perfil_label"],         # "Seu perfil/função típica é" | "Seus perfis/funções típicas são"
         "funcao_txt": funcao_txt,                   # lista PT-BR
-        "ativ_txt_trailer": ativ_trailer,           # pontuação + conjunção já pronta
+        "ativ_txt_trailer": pf["ativ_trailer"],     # pontuação + conjunção já pronta
     }
-    return val, texto, facts
+    return texto, facts
 
 def score_grooming(r, rules):
+    ctx = ScoringContext.of(rules)
     at = r["atributos"]
     pelo = at.get("pelagem_tipo", "curta")
     subpelo = at.get("subpelo", "nenhum")
     shed_est = at.get("shedding_estacao", "baixo")
     need_tosa = at.get("necessita_tosa", "nao")
 
-    esc = rules["escovacao_pelo"].get(pelo, 1)
-    shed = rules["shedding_subpelo"].get(subpelo, 1)
-    if shed_est in {"moderado","alto"}:
+    esc = ctx.escovacao_pelo.get(pelo, 1)
+    shed = ctx.shedding_subpelo.get(subpelo, 1)
+    if shed_est in SHEDDING_SAZONAL:
         shed = clamp_0_5(shed + 1)
-    tosa = rules["tosa_necessidade"].get(need_tosa, 1)
+    tosa = ctx.tosa_necessidade.get(need_tosa, 1)
 
-    w = rules["pesos"]["higiene_pelagem"]
-    val = round_int(clamp_0_5(esc*w["escovacao"] + shed*w["shedding"] + tosa*w["tosa"]))
+    we, ws, wt = ctx.w_grooming
+    val = round_int(clamp_0_5(esc*we + shed*ws + tosa*wt))
+    return (val, *texto_grooming(r, esc))
+
+def texto_grooming(r, esc):
+    """Texto e facts de pelagem a partir do nível de escovação já calculado."""
+    at = r["atributos"]
+    pelo = at.get("pelagem_tipo", "curta")
+    subpelo = at.get("subpelo", "nenhum")
+    shed_est = at.get("shedding_estacao", "baixo")
+    need_tosa = at.get("necessita_tosa", "nao")
 
     esc_txt = {1:"escovação simples", 2:"escovação regular", 3:"escovação cuidadosa", 4:"escovação intensiva"}.get(esc, "escovação regular")
     freq_txt = freq_escovacao_from_pelo(pelo)
@@ -339,7 +713,7 @@ def score_grooming(r, rules):
     )
 
     facts = {"escovacao_txt": freq_txt, "queda_txt": f"{shed_nivel}{shed_saz}", "tosa_txt": tosa_txt}
-    return val, texto, facts
+    return texto, facts
 
 def calor_score(at):
     s = 3
@@ -373,16 +747,24 @@ def espaco_need(porte, atividade_val):
     return clamp_0_5(base + (atividade_val-3)*0.5)
 
 def score_clima(r, rules, atividade_val):
+    ctx = ScoringContext.of(rules)
     at = r["atributos"]
-    perfil = rules["perfil_ambiente"]
-    w = rules["pesos"]["clima_ambiente"][perfil]
+    perfil = ctx.perfil
+    wc, wu, wsp = ctx.w_clima
     s_calor = calor_score(at)
     s_umid = umidade_score(at)
     need = espaco_need(at.get("porte","medio"), atividade_val)
     s_espaco = clamp_0_5(5 - need)  # maior = adapta melhor a espaços menores
-    val = round_int(clamp_0_5(s_calor*w["calor"] + s_umid*w["umidade"] + s_espaco*w["espaco"]))
+    val = round_int(clamp_0_5(s_calor*wc + s_umid*wu + s_espaco*wsp))
+    return (val, *texto_clima(r, perfil, s_calor, s_umid, s_espaco))
 
-    perfil_hum = perfil.replace("-", " ")
+def perfil_clima_label(perfil):
+    """Nome do perfil de clima para exibição ("tropical-umido" → "tropical umido")."""
+    return perfil.replace("-", " ")
+
+def texto_clima(r, perfil, s_calor, s_umid, s_espaco):
+    """Texto e facts de clima/ambiente a partir dos sub-scores já calculados."""
+    perfil_hum = perfil_clima_label(perfil)
     ambiente = ambiente_label(s_espaco)
 
     texto = (
@@ -397,4 +779,331 @@ def score_clima(r, rules, atividade_val):
         "tolerancia_umidade_txt": nivel_txt(s_umid),
         "adaptacao_espaco_txt": ambiente
     }
-    return val, texto, facts
+    return texto, facts
+
+# ===== Scores em lote (colunar) =====
+
+def score_all(racas, rules):
+    """
+    Calcula atividade, grooming e clima para o catálogo inteiro de uma vez.
+    Os atributos são codificados em colunas (uma lista por campo) e as regras
+    viram tabelas de lookup resolvidas uma vez; cada score é então uma passada
+    por coluna. Os valores batem exatamente com score_atividade/_grooming/_clima
+    (mesma ordem de operações, round_int e clamp_0_5).
+
+    Retorna um dict coluna -> lista, alinhado com `racas`: intensidade, minutos,
+    estimulo, atividade, escovacao, shedding, tosa, grooming, s_calor, s_umid,
+    s_espaco, clima (perfil em vigor) e clima_perfis (tupla com o score de cada
+    perfil de ctx.perfis_clima — os sub-scores não dependem do perfil, só os pesos).
+    """
+    ctx = ScoringContext.of(rules)
+    ats = [r["atributos"] for r in racas]
+
+    # --- atividade ---
+    grupos = [str(at.get("fci_grupo") or "") for at in ats]
+    base_int = ctx.fci_base_intensidade
+    base_min = ctx.fci_base_minutos
+    mental = ctx.mental_funcoes
+    intensidade = [clamp_0_5(base_int.get(g, 3)) for g in grupos]
+    minutos = [base_min.get(g, 60) for g in grupos]
+    escala_min = {m: minutes_to_scale(m) for m in set(minutos)}
+    estimulo = [
+        clamp_0_5(max([mental.get(f, 2) for f in (at.get("funcoes", []) or [])] or [2]))
+        for at in ats
+    ]
+    wi, wd, we = ctx.w_atividade
+    atividade = [
+        round_int(clamp_0_5(i * wi + escala_min[m] * wd + e * we))
+        for i, m, e in zip(intensidade, minutos, estimulo)
+    ]
+
+    # --- grooming ---
+    esc_map = ctx.escovacao_pelo
+    shed_map = ctx.shedding_subpelo
+    tosa_map = ctx.tosa_necessidade
+    escovacao = [esc_map.get(at.get("pelagem_tipo", "curta"), 1) for at in ats]
+    shedding = [
+        clamp_0_5(shed_map.get(at.get("subpelo", "nenhum"), 1) + 1)
+        if at.get("shedding_estacao", "baixo") in SHEDDING_SAZONAL
+        else shed_map.get(at.get("subpelo", "nenhum"), 1)
+        for at in ats
+    ]
+    tosa = [tosa_map.get(at.get("necessita_tosa", "nao"), 1) for at in ats]
+    we, ws, wt = ctx.w_grooming
+    grooming = [
+        round_int(clamp_0_5(e * we + sh * ws + t * wt))
+        for e, sh, t in zip(escovacao, shedding, tosa)
+    ]
+
+    # --- clima / ambiente (todos os perfis na mesma passada) ---
+    s_calor = [calor_score(at) for at in ats]
+    s_umid = [umidade_score(at) for at in ats]
+    s_espaco = [
+        clamp_0_5(5 - espaco_need(at.get("porte", "medio"), a))
+        for at, a in zip(ats, atividade)
+    ]
+    pesos = ctx.w_clima_perfis
+    clima_perfis = [
+        tuple(round_int(clamp_0_5(c * wc + u * wu + sp * wsp)) for wc, wu, wsp in pesos)
+        for c, u, sp in zip(s_calor, s_umid, s_espaco)
+    ]
+    clima = [p[ctx.i_perfil] for p in clima_perfis]
+
+    return {
+        "intensidade": intensidade, "minutos": minutos, "estimulo": estimulo,
+        "atividade": atividade,
+        "escovacao": escovacao, "shedding": shedding, "tosa": tosa,
+        "grooming": grooming,
+        "s_calor": s_calor, "s_umid": s_umid, "s_espaco": s_espaco,
+        "clima": clima, "clima_perfis": clima_perfis,
+    }
+
+def score_row(cols, i):
+    """Linha i de score_all (dict pequeno e picklável)."""
+    return {k: col[i] for k, col in cols.items()}
+
+def scores_from_row(r, row, rules):
+    """(val, texto, facts) de atividade, grooming e clima a partir de uma linha de score_all."""
+    ctx = ScoringContext.of(rules)
+    return (
+        (row["atividade"], *texto_atividade(r, row["intensidade"], row["minutos"], row["estimulo"], ctx)),
+        (row["grooming"], *texto_grooming(r, row["escovacao"])),
+        (row["clima"], *texto_clima(r, ctx.perfil, row["s_calor"], row["s_umid"], row["s_espaco"])),
+    )
+
+def client_record(r, row, scoring, index, imagens=None):
+    """
+    Registro da raça no formato do comparador (data/breeds/*.json e páginas
+    comparar/<a>-vs-<b>/); `row` é a linha de score_all e `index` o BreedIndex.
+    Em clima.perfis vai o score de cada perfil de clima (ordem de
+    scoring.perfis_clima) e em clima.perfis_txt o perfil_txt de cada um — os
+    demais facts de clima não dependem do perfil —, para o comparador trocar
+    de perfil sem novo build.
+    Com `imagens` (load_img_manifest) e derivados da foto, inclui o srcset da
+    miniatura por formato em `foto_srcset`.
+    """
+    slug = index.add(r)
+    grupo = r["atributos"].get("fci_grupo")
+    porte_slug = (r["atributos"].get("porte") or "").lower()
+    porte_label = human_porte(porte_slug)
+
+    (atividade_val, _txtA, factsA), (grooming_val, _txtG, factsG), \
+        (clima_val, _txtC, factsC) = scores_from_row(r, row, scoring)
+
+    rec = {
+        "slug": slug,
+        "nome": r["nome"],
+        "foto": r.get("foto",""),
+        "origem": r.get("origem","—"),
+        "fci": {"grupo": grupo, "descricao": scoring.fci_grupos.get(str(grupo), "—")},
+        "porte": {"slug": porte_slug, "label": porte_label},
+        "medidas": {
+          "altura_cm": r["medidas"]["altura_cm"],
+          "peso_kg":   r["medidas"]["peso_kg"],
+          "expectativa_anos": r["medidas"].get("expectativa_anos","—")
+        },
+        "energia":  {"valor": atividade_val, **factsA},
+        "pelagem":  {"valor": grooming_val,  **factsG},
+        "clima":    {"valor": clima_val,     **factsC, "perfis": list(row["clima_perfis"]),
+                     "perfis_txt": list(scoring.perfis_clima_txt)},
+        "aliases":  index.aliases_for(slug),
+    }
+    fontes = img_fontes((imagens or {}).get(rec["foto"]), max_w=THUMB_MAX)
+    if fontes:
+        rec["foto_srcset"] = [list(f) for f in fontes]
+    return rec
+
+# ===== Validação do catálogo =====
+# Sobe quando as verificações mudam (invalida o cache de validação)
+VALIDACAO_VERSAO = 1
+_RE_SLUG = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+_RE_NUM = re.compile(r"\d+")
+
+class CatalogError(ValueError):
+    """Erros de validação do catálogo, todos de uma vez (em .erros)."""
+    MOSTRAR = 50
+
+    def __init__(self, erros):
+        self.erros = erros
+        linhas = [f"  {e}" for e in erros[:self.MOSTRAR]]
+        if len(erros) > self.MOSTRAR:
+            linhas.append(f"  … e mais {len(erros) - self.MOSTRAR}")
+        super().__init__(f"{len(erros)} erro(s) no catálogo:\n" + "\n".join(linhas))
+
+def faixa_valida(v) -> bool:
+    """Formatos que parse_minmax entende: "—" (ou vazio), "a–b" ou um único número."""
+    return isinstance(v, str) and (v in ("", "—") or rng.search(v) is not None
+                                   or len(_RE_NUM.findall(v)) == 1)
+
+def compile_validator(rules):
+    """
+    Monta uma vez, a partir dos vocabulários do rules.json, a verificação de
+    um registro do catálogo. Retorna check(r) -> [mensagens] (vazia = ok).
+    """
+    vocab = [
+        ("pelagem_tipo", frozenset(rules.get("escovacao_pelo", {})), "rules.escovacao_pelo"),
+        ("subpelo", frozenset(rules.get("shedding_subpelo", {})), "rules.shedding_subpelo"),
+        ("necessita_tosa", frozenset(rules.get("tosa_necessidade", {})), "rules.tosa_necessidade"),
+        ("shedding_estacao", frozenset(SHEDDING_ESTACOES), "/".join(SHEDDING_ESTACOES)),
+    ]
+    funcoes = frozenset(rules.get("mental_funcoes", {}))
+    grupos = frozenset(rules.get("fci_grupos", {}))
+    portes = frozenset(PORTES)
+    faixas = {}  # memo: as mesmas faixas se repetem muito no catálogo
+
+    def faixa(v):
+        ok = faixas.get(v) if isinstance(v, str) else False
+        if ok is None:
+            ok = faixas[v] = faixa_valida(v)
+        return ok
+
+    def check(r):
+        if not isinstance(r, dict):
+            return ["registro não é um objeto"]
+        erros = []
+        nome = r.get("nome")
+        if not isinstance(nome, str) or not nome.strip():
+            erros.append("nome ausente ou vazio")
+        slug = r.get("slug")
+        if slug is not None and not (isinstance(slug, str) and _RE_SLUG.fullmatch(slug)):
+            erros.append(f"slug inválido: {slug!r}")
+
+        med = r.get("medidas")
+        if not isinstance(med, dict):
+            erros.append("medidas ausente")
+        else:
+            for campo in ("altura_cm", "peso_kg"):
+                m = med.get(campo)
+                if not isinstance(m, dict):
+                    erros.append(f"medidas.{campo} ausente")
+                    continue
+                for sexo in ("macho", "femea"):
+                    v = m.get(sexo)
+                    if v is not None and not faixa(v):
+                        erros.append(f"medidas.{campo}.{sexo}: faixa inválida {v!r}")
+            v = med.get("expectativa_anos")
+            if v is not None and not faixa(v):
+                erros.append(f"medidas.expectativa_anos: faixa inválida {v!r}")
+
+        at = r.get("atributos")
+        if not isinstance(at, dict):
+            erros.append("atributos ausente")
+            return erros
+        g = at.get("fci_grupo")
+        if g is not None and (isinstance(g, bool) or str(g) not in grupos):
+            erros.append(f"atributos.fci_grupo: {g!r} não está em rules.fci_grupos")
+        p = at.get("porte")
+        if p is not None and not (isinstance(p, str) and p.lower() in portes):
+            erros.append(f"atributos.porte: {p!r} não é um de {'/'.join(PORTES)}")
+        for campo, valores, origem in vocab:
+            v = at.get(campo)
+            if v is not None and not (isinstance(v, str) and v in valores):
+                erros.append(f"atributos.{campo}: {v!r} não está em {origem}")
+        for campo in ("braquicefalico", "dobras_cutaneas"):
+            v = at.get(campo)
+            if v is not None and not isinstance(v, bool):
+                erros.append(f"atributos.{campo}: esperado true/false, veio {v!r}")
+        fs = at.get("funcoes")
+        if fs is not None:
+            if not isinstance(fs, list):
+                erros.append("atributos.funcoes: esperada uma lista")
+            else:
+                for f in fs:
+                    if not (isinstance(f, str) and f in funcoes):
+                        erros.append(f"atributos.funcoes: {f!r} não está em rules.mental_funcoes")
+        f = at.get("funcao_principal")
+        if f is not None and not (isinstance(f, str) and f in funcoes):
+            erros.append(f"atributos.funcao_principal: {f!r} não está em rules.mental_funcoes")
+        oc = at.get("origem_clima")
+        if oc is not None and not (isinstance(oc, list) and all(isinstance(c, str) for c in oc)):
+            erros.append("atributos.origem_clima: esperada uma lista de textos")
+
+        pop = r.get("popularidade")
+        if pop is not None:
+            if not isinstance(pop, dict):
+                erros.append("popularidade: esperado um objeto")
+            else:
+                for k, v in pop.items():
+                    if v is not None and (isinstance(v, bool) or not isinstance(v, (int, float))):
+                        erros.append(f"popularidade.{k}: esperado número, veio {v!r}")
+        return erros
+
+    return check
+
+def validate_racas(racas, rules, check=None) -> int:
+    """
+    Valida um iterável de raças em uma passada e levanta CatalogError com
+    todos os erros (prefixados pelo slug). Slugs repetidos também são erro:
+    duas raças escreveriam a mesma página. Retorna o nº de raças.
+    """
+    check = check or compile_validator(rules)
+    erros, vistos, n = [], {}, 0
+    for i, r in enumerate(racas, 1):
+        n = i
+        problemas = check(r)
+        nome = r.get("nome") if isinstance(r, dict) else None
+        slug = None
+        if isinstance(nome, str) and nome.strip():
+            slug = r.get("slug") if isinstance(r.get("slug"), str) and r["slug"] else slugify(nome)
+        rotulo = slug or f"registro {i}"
+        erros.extend(f"{rotulo}: {e}" for e in problemas)
+        if slug is not None:
+            if slug in vistos:
+                erros.append(f"{rotulo}: slug repetido (também no registro {vistos[slug]})")
+            else:
+                vistos[slug] = i
+    if erros:
+        raise CatalogError(erros)
+    return n
+
+def validate_catalog(path=None, rules=None, force=False) -> int:
+    """
+    Valida o catálogo antes do build. O resultado fica em cache pelo hash do
+    catálogo + regras (.build-cache/validacao.json): se nada mudou, não relê.
+    Retorna o nº de raças validadas (0 = resultado do cache).
+    """
+    path = Path(path) if path else catalog_path()
+    if rules is None:
+        rules = load_site_rules()[1]
+    chave = f"{VALIDACAO_VERSAO}:{file_hash(path)}:{json_hash(rules)}"
+    cache = CACHE_DIR / "validacao.json"
+    if not force and cache.exists():
+        try:
+            if json.loads(cache.read_text(encoding="utf-8")).get("chave") == chave:
+                return 0
+        except ValueError:
+            pass
+    n = validate_racas(iter_racas(path), rules)
+    CACHE_DIR.mkdir(exist_ok=True)
+    write_if_changed(cache, json.dumps({"chave": chave, "catalogo": path.name, "racas": n}))
+    return n
+
+# ===== Imagens: dimensões reais e derivados responsivos =====
+IMG_FONTES = ROOT / "assets" / "breeds"
+IMG_DIST = IMG_FONTES / "dist"
+IMG_MANIFEST = IMG_DIST / "imagens.json"
+IMG_MIME = {"avif": "image/avif", "webp": "image/webp", "jpg": "image/jpeg",
+            "png": "image/png", "gif": "image/gif"}
+# Miniatura do comparador (96×64): derivados até 2x bastam
+THUMB_MAX = 192
+
+def load_img_manifest() -> dict:
+    """
+    assets/breeds/dist/imagens.json (URL da foto -> {w, h, variantes}); {} se
+    ainda não gerado. `variantes` é [[formato, [[largura, url], ...]], ...],
+    dos formatos modernos ao do original (o último vai no <img>).
+    """
+    try:
+        return json.loads(IMG_MANIFEST.read_text(encoding="utf-8")).get("imagens", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def img_fontes(info, base="", max_w=None) -> list:
+    """[(mime, srcset)] dos derivados de uma foto (ver load_img_manifest); [] sem derivados."""
+    out = []
+    for fmt, lista in (info or {}).get("variantes", ()):
+        if max_w:
+            # a menor variante sempre entra (fonte menor que max_w)
+            lista = [v for v in lista if v[0] <= max_w] or lista[:1]
+        out.append((IMG_MIME[fmt], ", ".join(f"{base}{url} {w}w" for w, url in lista)))
+    return out
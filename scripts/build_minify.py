@@ -0,0 +1,410 @@
+# Minificação de HTML em streaming para o gerar_paginas.py --minificar.
+import json
+import re
+
+# ===== Minificação de HTML =====
+_HTML_WS = " \t\n\r\f"   # espaço do HTML (&nbsp; / U+00A0 não entra)
+# Elementos em que o espaço em volta não aparece na página
+HTML_BLOCOS = frozenset("""
+    html head body title meta link base script style noscript template main header footer nav
+    section article aside div p ul ol li dl dt dd h1 h2 h3 h4 h5 h6 figure figcaption blockquote
+    table caption thead tbody tfoot tr th td form fieldset legend details summary dialog
+    br hr pre datalist option optgroup source
+""".split())
+HTML_BRUTOS = ("pre", "textarea", "script", "style")   # conteúdo passa intacto
+# Abertura de trecho protegido: comentário (removido; condicionais ficam) ou
+# elemento bruto (nome em minúsculas ou maiúsculas)
+_RE_PROTEGIDO_ABRE = re.compile(r"<(?:!--(?!\[)|(?P<bn>%s)(?=[ \t\n\r\f/>]))"
+                                % "|".join(HTML_BRUTOS + tuple(n.upper() for n in HTML_BRUTOS)))
+_RE_ATTRS_FIM = re.compile(r"""(?:[^>"']|"[^"]*"|'[^']*')*>""")
+_RE_TAG_FECHA = {n: re.compile(rf"</(?i:{n})[ \t\n\r\f]*>") for n in HTML_BRUTOS}
+_RE_TAG_NOME = re.compile(r"</?([a-zA-Z][a-zA-Z0-9]*)(?=[ \t\n\r\f/>])")
+_RE_RUN = re.compile(r"  +")   # prefixo literal: a busca roda rápido no re
+_RE_RUN_TAB = re.compile(r"[ \t\f]*[\t\f][ \t\f]*|  +")
+_RE_FORA_ASPAS = re.compile(r"""(?:[^"']|"[^"]*"|'[^']*')*""")
+_RE_ATTR_OU_WS = re.compile(r"""("[^"]*"|'[^']*')|[ \t\n\r\f]+""")
+# Valor de atributo entre aspas que quebra linha (ex.: o content da CSP)
+_RE_VALOR_QUEBRADO = re.compile(r"""=[ \t\n\r\f]*(?:"[^"]*\n|'[^']*\n)""")
+_RE_LD_JSON = re.compile(r"""type[ \t\n\r\f]*=[ \t\n\r\f]*["']application/ld\+json["']""", re.I)
+
+def _min_tag(tag: str) -> str:
+    """Colapsa o espaço dentro da tag, fora dos valores de atributo."""
+    if not (_sujo(tag) or "\n" in tag or tag.endswith(" >")):
+        return tag
+    t = _RE_ATTR_OU_WS.sub(lambda m: m.group(1) or " ", tag)
+    return t[:-2] + ">" if t.endswith(" >") else t
+
+def _min_ld_json(texto: str) -> str:
+    try:
+        return json.dumps(json.loads(texto), ensure_ascii=False, separators=(",", ":"))
+    except ValueError:
+        return texto.strip(_HTML_WS)
+
+def _tag_bloco(linha: str, i: int) -> bool:
+    m = _RE_TAG_NOME.match(linha, i)
+    return m is not None and m.group(1).lower() in HTML_BLOCOS
+
+def _sujo(t: str) -> bool:
+    return "  " in t or "\t" in t or "\f" in t
+
+def _run(m):
+    s, i, j = m.string, m.start(), m.end()
+    if s[i-1] == ">" and s[j:j+1] == "<":   # entre tags
+        if _tag_bloco(s, j):
+            return ""
+        k = s.rfind("<", 0, i)
+        return "" if k >= 0 and _tag_bloco(s, k) else " "
+    k = s.rfind("<", 0, i)
+    if k < 0:   # pode ser o resto de uma tag que quebrou linha: não mexe
+        return m.group()
+    if k > s.rfind(">", 0, i):   # dentro de tag: só fora dos valores de atributo
+        if _RE_FORA_ASPAS.fullmatch(s, k, i) is None:
+            return m.group()
+        return "" if s[j:j+1] == ">" else " "
+    return " "
+
+# Linhas com espaço repetido já minificadas: cada card entra em várias
+# listagens (paginação e facetas)
+_LINHAS: dict = {}
+_LINHAS_MAX = 32_768
+
+def _min_linha(linha: str) -> str:
+    """
+    Espaço repetido dentro de uma linha (ex.: cards montados com f-strings):
+    entre tags some se uma delas for de bloco, senão vira um só; dentro da
+    tag, só fora dos valores de atributo.
+    """
+    m = _LINHAS.get(linha)
+    if m is None:
+        m = (_RE_RUN_TAB if "\t" in linha or "\f" in linha else _RE_RUN).sub(_run, linha)
+        if len(_LINHAS) >= _LINHAS_MAX:
+            _LINHAS.clear()
+        _LINHAS[linha] = m
+    return m
+
+def _min_texto(t: str) -> str:
+    """
+    Minifica um trecho sem comentários nem elementos brutos. Linha a linha
+    (split/strip em C): a indentação e as linhas em branco somem e a quebra
+    fica como o único espaço — mesmo tamanho de " " e equivalente também sob
+    white-space: pre-line. Espaço nas pontas vira um só caractere.
+    """
+    if "\n" not in t and not _sujo(t) and t[:1] not in _HTML_WS and t[-1:] not in _HTML_WS:
+        return t
+    if "\n" in t:   # a tag com valor de várias linhas vai inteira para _min_tag
+        for m in _RE_VALOR_QUEBRADO.finditer(t):
+            k = t.rfind("<", 0, m.start())
+            a = k >= 0 and t.rfind(">", k, m.start()) < 0 and _RE_ATTRS_FIM.match(t, k)
+            if a:
+                return _min_texto(t[:k]) + _min_tag(t[k:a.end()]) + _min_texto(t[a.end():])
+    linhas = [linha.strip(_HTML_WS) for linha in t.split("\n")]
+    miolo = "\n".join(filter(None, linhas))
+    if _sujo(miolo):
+        miolo = "\n".join(_min_linha(linha) if _sujo(linha) else linha for linha in miolo.split("\n"))
+    if not miolo:
+        return ("\n" if len(linhas) > 1 else " ") if t else ""
+    if t[0] in _HTML_WS:
+        miolo = ("\n" if not linhas[0] else " ") + miolo
+    if t[-1] in _HTML_WS:
+        miolo += "\n" if not linhas[-1] else " "
+    return miolo
+
+def _fecha_protegido(seg: str, m, fim: int):
+    """(fim do trecho protegido aberto em `m` ou None, fim da tag de abertura ou None)."""
+    bn = m.group("bn")
+    if bn is None:
+        j = seg.find("-->", m.end(), fim)
+        return (j + 3 if j >= 0 else None), None
+    a = _RE_ATTRS_FIM.match(seg, m.end(), fim)
+    f = a and _RE_TAG_FECHA[bn.lower()].search(seg, a.end(), fim)
+    return (f.end(), a.end()) if f else (None, None)
+
+def _protegidos(seg: str, ini: int = 0, fim: int = None):
+    """
+    Percorre os trechos protegidos de seg[ini:fim]: (início, fim, nome do
+    elemento bruto ou None p/ comentário, fim da tag de abertura); fim None =
+    trecho ainda aberto.
+    """
+    fim = len(seg) if fim is None else fim
+    pos = ini
+    while True:
+        m = _RE_PROTEGIDO_ABRE.search(seg, pos, fim)
+        if m is None:
+            return
+        pos, abre = _fecha_protegido(seg, m, fim)
+        yield m.start(), pos, m.group("bn"), abre
+        if pos is None:
+            return
+
+def _min_segmento(seg: str) -> str:
+    """Minifica um trecho com os comentários / elementos brutos completos."""
+    if "<" not in seg or _RE_PROTEGIDO_ABRE.search(seg) is None:
+        return _min_texto(seg)
+    out, pos, texto = [], 0, []
+    for ini, fim, bn, abre in _protegidos(seg):
+        if fim is None:   # HTML truncado: o resto vai como texto
+            break
+        texto.append(seg[pos:ini])
+        pos = fim
+        if bn is None:    # comentário: some (o texto em volta se junta)
+            continue
+        out.append(_min_texto("".join(texto)))
+        texto = []
+        tag, corpo = seg[ini:abre], seg[abre:fim]
+        j = corpo.rfind("</")
+        corpo, fecha = corpo[:j], corpo[j:]
+        if bn.lower() == "script" and _RE_LD_JSON.search(tag):
+            corpo = _min_ld_json(corpo)
+        out.append(_min_tag(tag) + corpo + fecha)
+    texto.append(seg[pos:])
+    out.append(_min_texto("".join(texto)))
+    return "".join(out)
+
+# Texto e tags completas até a próxima quebra de linha fora de tag; para num
+# comentário / elemento bruto, numa tag ainda aberta ou num "<" no fim
+_RE_LINHA_TEXTO = re.compile(r"""(?:[^<\n]+|<(?!!--(?!\[)|(?:%s)(?=[ \t\n\r\f/>]))[a-zA-Z/!?]"""
+                             r"""(?:[^>"']|"[^"]*"|'[^']*')*>|<(?![a-zA-Z/!?]|\Z))*"""
+                             % "|".join(HTML_BRUTOS + tuple(n.upper() for n in HTML_BRUTOS)))
+
+def _corte(seg: str, ini: int = 0, primeiro: bool = False):
+    """
+    Pontos de corte do streaming: inícios de linha de seg[ini:] em texto — fora
+    de tags (inclusive valores de atributo), comentários e elementos brutos —,
+    com seg[ini] também em texto. A minificação é por linha, então minificar
+    seg[:p] e seg[p:] separadamente dá o mesmo que minificar seg inteiro.
+    Devolve (o último ponto, ou o primeiro com `primeiro`, ou None; onde
+    retomar a busca quando chegar mais texto: início da tag / trecho ainda
+    aberto no fim de seg, senão len(seg)).
+    """
+    corte, pos, n = None, ini, len(seg)
+    while True:
+        k = _RE_LINHA_TEXTO.match(seg, pos).end()
+        if k == n:
+            return corte, n
+        if seg[k] == "\n":
+            pos = corte = k + 1
+            if primeiro:
+                return corte, corte
+            continue
+        m = _RE_PROTEGIDO_ABRE.match(seg, k)
+        pos = m and _fecha_protegido(seg, m, n)[0]
+        if pos is None:   # tag / trecho protegido ainda aberto, ou "<" no fim
+            return corte, k
+
+def _estado(seg: str, retoma: int):
+    """
+    Onde seg termina, dado o `retoma` de _corte: "texto", "tag", "bruto" (tag
+    de abertura de um elemento bruto) ou None (comentário, conteúdo de
+    elemento bruto, "<" no fim).
+    """
+    if retoma == len(seg):
+        return "texto"
+    if retoma == len(seg) - 1:
+        return None
+    m = _RE_PROTEGIDO_ABRE.match(seg, retoma)
+    if m is None:
+        return "tag"
+    if m.group("bn") and _RE_ATTRS_FIM.match(seg, m.end()) is None:
+        return "bruto"
+    return None
+
+# Valor "opaco": sem nada que abra ou feche tag, aspas, comentário ou linha, nem
+# espaço repetido ou nas pontas. Em texto ou dentro de uma tag (fora do nome),
+# minificar com um marcador no lugar dele dá o mesmo resultado: a linha
+# minificada com marcadores vale para qualquer valor.
+_RE_OPACO = re.compile(r"""[^\s<>"'=\x00-\x1f](?:[^<>"'=\x00-\x1f]*[^\s<>"'=\x00-\x1f])?""")
+_RE_NOME_ABERTO = re.compile(r"<[/!?]?[a-zA-Z0-9-]*")
+_MARCA = "\x00"
+
+def _opaco(v: str, estado: str) -> bool:
+    if _RE_OPACO.fullmatch(v) is None or "  " in v:
+        return False
+    # na tag de um elemento bruto, o valor não pode completar o type do JSON-LD
+    # (_RE_LD_JSON): isso mudaria como o corpo é minificado
+    return estado != "bruto" or not (v.lower() in "application/ld+json" or v.lower() in "type")
+
+# Trechos já minificados: (html até o último ponto de corte, bytes UTF-8,
+# ponto de corte, onde retomar a busca no resto, _estado_resto). As partes fixas dos
+# templates (e o cabeçalho, o rodapé, o CSS) chegam como os mesmos trechos em
+# todas as páginas.
+_TRECHOS: dict = {}
+_TRECHOS_MAX = 4096
+_TRECHO_CACHE_MAX = 16 * 1024
+
+def _guarda(cache: dict, chave, tam: int, valor):
+    if tam <= _TRECHO_CACHE_MAX:
+        if len(cache) >= _TRECHOS_MAX:
+            cache.clear()
+        cache[chave] = valor
+    return valor
+
+def _estado_resto(seg: str, retoma: int):
+    """(_estado, se seg termina no nome de uma tag — "<di": um valor colado ali completaria o nome)."""
+    estado = _estado(seg, retoma)
+    return estado, estado == "tag" and _RE_NOME_ABERTO.fullmatch(seg, max(seg.rfind("<"), 0)) is not None
+
+def _info_trecho(t: str):
+    corte, retoma = _corte(t)
+    corte = corte or 0
+    return _guarda(_TRECHOS, t, len(t), (
+        _min_segmento(t[:corte]) if corte else "",
+        len(t) if t.isascii() else len(t.encode("utf-8")), corte, retoma,
+        _estado_resto(t[corte:], retoma - corte) if corte < len(t) else None))
+
+# Linhas completadas por um trecho: (peças do molde da linha pendente...,
+# trecho) -> (html da linha partido nos marcadores, primeiro ponto de corte no
+# trecho, html do trecho dali até o último ponto, último ponto, onde retomar a
+# busca, _estado_resto); None se o trecho não fecha a linha.
+_MOLDES: dict = {}
+
+def _info_molde(chave: tuple, retoma: int):
+    molde, chunk = "".join(chave[:-1]), chave[-1]
+    buf = molde + chunk
+    corte = _corte(buf, retoma, primeiro=True)[0]
+    info = None
+    if corte is not None:
+        corte -= len(molde)
+        html, _, fim, retoma, resto = _TRECHOS.get(chunk[corte:]) or _info_trecho(chunk[corte:])
+        info = (_min_segmento(buf[:len(molde) + corte]).split(_MARCA), corte, html,
+                corte + fim, corte + retoma, resto)
+    return _guarda(_MOLDES, chave, len(buf), info)
+
+class HtmlMinifier:
+    """
+    Minificação de HTML em streaming: feed() recebe os trechos da página (ex.:
+    os de CompiledTemplate.parts_for) e devolve na hora o que já pode ser
+    emitido; close() devolve o resto. Remove comentários, indentação e linhas
+    em branco, colapsa espaço repetido e compacta o JSON-LD; o conteúdo de
+    <pre>, <textarea>, <script> e <style> passa intacto. O resultado não
+    depende de onde os trechos são cortados: cada trecho é minificado até o
+    seu último ponto de corte (_corte; cache por conteúdo) e o resto — a linha
+    incompleta, a tag, o comentário ou o elemento bruto ainda aberto — espera
+    pelos seguintes. A linha incompleta é guardada também como molde (valores
+    opacos trocados por _MARCA), que com o trecho seguinte forma a chave da
+    cache; só um caractere de espaço fica pendente entre o que já saiu e o
+    próximo trecho. `entrada` conta os bytes (UTF-8) recebidos.
+    """
+    def __init__(self):
+        self.entrada = 0
+        self.aberto = []     # trechos depois do último ponto de corte
+        self.molde = []      # os mesmos, com _MARCA no lugar dos valores opacos
+        self.valores = []    # os valores opacos, em ordem
+        self.retoma = 0      # onde retomar a busca de corte no molde
+        self.estado = None   # onde o molde termina (_estado); None = sem molde, só o caminho sem cache
+        self.nome = False    # o molde termina no nome de uma tag ("<di")
+        self.sep = ""        # espaço pendente entre o que já saiu e o próximo trecho
+        self.inicio = True
+
+    def _emite(self, html: str) -> str:
+        if not html:
+            return ""
+        if html[0] in _HTML_WS:
+            if self.sep != "\n":
+                self.sep = html[0]
+            html = html[1:]
+            if not html:
+                return ""
+        sep = "" if self.inicio else self.sep
+        self.inicio = False
+        if html[-1] in _HTML_WS:
+            html, self.sep = html[:-1], html[-1]
+        else:
+            self.sep = ""
+        return sep + html if sep else html
+
+    def _pendente(self, resto: str, retoma: int, estado=None):
+        """Guarda `resto` (começa num ponto de corte; `retoma` e `estado` como em _corte e _estado_resto)."""
+        self.aberto, self.molde, self.valores = [resto], [resto], []
+        self.retoma = retoma
+        self.estado, self.nome = estado or _estado_resto(resto, retoma)
+
+    def _trecho(self, t: str, final: bool):
+        """Trecho que começa num ponto de corte: (html, bytes de entrada)."""
+        html, n, corte, retoma, resto = _TRECHOS.get(t) or _info_trecho(t)
+        html = self._emite(html)
+        if corte < len(t):
+            if final:
+                html += self._emite(_min_segmento(t[corte:]))
+            else:
+                self._pendente(t[corte:], retoma - corte, resto)
+        return html, n
+
+    def _acrescenta(self, chunk: str):
+        """Trecho sem quebra de linha (sem ponto de corte novo): só atualiza o molde."""
+        if self.estado is None:
+            return
+        if not self.nome and _MARCA not in chunk and _opaco(chunk, self.estado):
+            self.molde.append(_MARCA)
+            self.valores.append(chunk)
+            return
+        self.molde.append(chunk)
+        m = "".join(self.molde)
+        self.retoma = _corte(m, self.retoma)[1]
+        self.estado, self.nome = _estado_resto(m, self.retoma)
+
+    def _linha(self, chunk: str) -> str:
+        """O trecho com quebra de linha completa a linha pendente: emite até o primeiro ponto de corte."""
+        if self.estado is not None:
+            chave = (*self.molde, chunk)
+            info = _MOLDES.get(chave, False)
+            if info is False:
+                info = _info_molde(chave, self.retoma)
+            if info is not None:
+                partes, corte, html, fim, retoma, resto = info
+                valores = self.valores
+                if len(partes) != len(valores) + 1:   # a minificação mexeu num marcador: sem cache
+                    linha = _min_segmento("".join(self.aberto[:-1]) + chunk[:corte])
+                elif not valores:
+                    linha = partes[0]
+                elif len(valores) == 1:
+                    linha = partes[0] + valores[0] + partes[1]
+                else:
+                    out = [partes[0]]
+                    for v, p in zip(valores, partes[1:]):
+                        out += (v, p)
+                    linha = "".join(out)
+                self.aberto = []
+                linha = self._emite(linha) + self._emite(html)
+                if fim < len(chunk):
+                    self._pendente(chunk[fim:], retoma - fim, resto)
+                return linha
+        buf = "".join(self.aberto)
+        corte, retoma = _corte(buf, 0, primeiro=True)
+        if corte is None:
+            self._pendente(buf, retoma)
+            return ""
+        self.aberto = []
+        html = self._emite(_min_segmento(buf[:corte]))
+        if corte < len(buf):
+            html += self._trecho(buf[corte:], False)[0]
+        return html
+
+    def feed(self, chunk: str, final: bool = False) -> str:
+        if not self.aberto:
+            if not chunk:
+                return ""
+            html, n = self._trecho(chunk, final)
+            self.entrada += n
+            return html
+        # resto de trechos anteriores: vai junto até o primeiro ponto de corte
+        self.entrada += len(chunk) if chunk.isascii() else len(chunk.encode("utf-8"))
+        self.aberto.append(chunk)
+        if final:
+            buf, self.aberto = "".join(self.aberto), []
+            return self._emite(_min_segmento(buf))
+        if "\n" not in chunk:
+            self._acrescenta(chunk)
+            return ""
+        return self._linha(chunk)
+
+    def close(self) -> str:
+        return self.feed("", final=True)
+
+    def minify(self, trechos) -> str:
+        """Minifica um iterável de trechos (str) de uma vez."""
+        out = [self.feed(t) for t in trechos]
+        out.append(self.close())
+        return "".join(out)
+
+def minify_html(html: str) -> str:
+    return HtmlMinifier().minify((html,))
@@ -0,0 +1,177 @@
+# Escrita transacional das saídas do build (staging + commit atômico por arquivo),
+# compartilhada pelos scripts/gerar_*.py e pelo generate_partials.py.
+from pathlib import Path
+import filecmp
+import json
+import os
+import shutil
+
+from build_lib import ROOT, CACHE_DIR
+
+# ===== Escrita transacional das saídas =====
+STAGING = ".build-staging"
+
+def stage_file(root: Path, stage: Path, rel: str, data: bytes) -> bool:
+    """
+    Compara `data` com root/rel e, se diferente, grava em stage/rel.
+    Retorna True se a saída mudou. Sem estado: pode rodar em workers.
+    """
+    try:
+        p = root/rel
+        if p.stat().st_size == len(data) and p.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    dst = stage/rel
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.write_bytes(data)
+    return True
+
+def _fsync(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # diretórios no Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+class OutputWriter:
+    """
+    Escrita das saídas em duas fases. write() compara com o arquivo publicado
+    e só grava o que mudou, numa árvore de staging (root/.build-staging/<nome>);
+    commit() faz o fsync em lote, registra um journal e move cada arquivo para
+    o lugar com os.replace (atômico por arquivo: nunca há arquivo pela metade).
+    Se o processo cair antes do commit, o site publicado não muda; se cair
+    durante, o próximo OutputWriter com o mesmo nome conclui o journal.
+    Ao final grava a lista de URLs alteradas (.build-cache/changed-<nome>.txt),
+    pronta para invalidação de CDN.
+    """
+    def __init__(self, name: str, root: Path = ROOT, url_base: str = "/",
+                 report=None, fsync: bool = True):
+        self.name = name
+        self.root = Path(root)
+        self.stage = self.root / STAGING / name
+        self.journal = self.root / STAGING / f"{name}.journal.json"
+        self.url_base = url_base
+        self.report = report
+        self.fsync = fsync
+        self.changed, self.deleted = [], []
+        self.recover()
+        shutil.rmtree(self.stage, ignore_errors=True)
+
+    def recover(self):
+        """Conclui um commit interrompido (roll-forward do journal)."""
+        if not self.journal.exists():
+            return
+        data = json.loads(self.journal.read_text(encoding="utf-8"))
+        self._apply(data["changed"], data["deleted"])
+        self.journal.unlink()
+
+    def write(self, rel: str, text) -> bool:
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        mudou = stage_file(self.root, self.stage, rel, data)
+        self.record(rel, mudou, len(data))
+        return mudou
+
+    def finish(self, rel: str) -> bool:
+        """Registra um arquivo gravado direto em stage/rel (ex.: em streaming)."""
+        staged = self.stage/rel
+        p = self.root/rel
+        mudou = not (p.exists() and filecmp.cmp(staged, p, shallow=False))
+        nbytes = staged.stat().st_size
+        if not mudou:
+            staged.unlink()
+        self.record(rel, mudou, nbytes)
+        return mudou
+
+    def record(self, rel: str, mudou: bool, nbytes: int = 0):
+        """Registra uma saída gravada por stage_file() em outro processo."""
+        if mudou:
+            self.changed.append(rel)
+        if self.report is not None:
+            if mudou:
+                self.report.count("arquivos_escritos")
+                self.report.count("bytes_escritos", nbytes)
+            else:
+                self.report.count("arquivos_inalterados")
+
+    def delete(self, rel: str):
+        if (self.root/rel).exists():
+            self.deleted.append(rel)
+            if self.report is not None:
+                self.report.count("arquivos_removidos")
+
+    def _apply(self, changed, deleted):
+        dirs = set()
+        for rel in changed:
+            src, dst = self.stage/rel, self.root/rel
+            if src.exists():
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(src, dst)
+                dirs.add(dst.parent)
+        for rel in deleted:
+            p = self.root/rel
+            p.unlink(missing_ok=True)
+            # remove diretórios que ficaram vazios
+            for d in p.parents:
+                if d == self.root or not d.exists() or any(d.iterdir()):
+                    break
+                d.rmdir()
+                dirs.add(d.parent)
+        if self.fsync:
+            for d in dirs:
+                if d.exists():
+                    _fsync(d)
+
+    def commit(self) -> list:
+        """Publica as mudanças; retorna as URLs alteradas/removidas."""
+        if self.fsync:
+            for rel in self.changed:
+                _fsync(self.stage/rel)
+        if self.changed or self.deleted:
+            self.journal.parent.mkdir(parents=True, exist_ok=True)
+            self.journal.write_text(json.dumps({"changed": self.changed, "deleted": self.deleted}),
+                                    encoding="utf-8")
+            if self.fsync:
+                _fsync(self.journal)
+            self._apply(self.changed, self.deleted)
+            self.journal.unlink()
+        self.abort()
+
+        urls = []
+        for rel in self.changed + self.deleted:
+            url = self.url_base + rel
+            urls.append(url)
+            if url.endswith("/index.html"):
+                urls.append(url[:-len("index.html")])
+        CACHE_DIR.mkdir(exist_ok=True)
+        (CACHE_DIR / f"changed-{self.name}.txt").write_text(
+            "".join(u + "\n" for u in urls), encoding="utf-8")
+        return urls
+
+    def abort(self):
+        """Descarta o staging (o site publicado fica como estava)."""
+        shutil.rmtree(self.stage, ignore_errors=True)
+        try:
+            (self.root / STAGING).rmdir()
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+def add_output_args(ap):
+    """Flags comuns da escrita das saídas."""
+    ap.add_argument("--sem-fsync", action="store_true",
+                    help="não força fsync no commit das saídas (mais rápido; menos durável)")
@@ -0,0 +1,109 @@
+# Relatório de build (tempo por fase, contadores, itens mais lentos) e
+# execução sob cProfile — as flags --relatorio / --profile dos scripts.
+from pathlib import Path
+from contextlib import contextmanager
+import cProfile
+import heapq
+import io
+import json
+import pstats
+import sys
+import time
+
+from build_lib import CACHE_DIR
+
+# ===== Relatório de build / Profiling =====
+class BuildReport:
+    """
+    Instrumentação do build: tempo de parede e de CPU por fase, contadores
+    e as N raças mais lentas. Gravado em JSON ao fim do build.
+    Fases executadas em workers somam o tempo de todos os processos.
+    """
+    def __init__(self, name: str, slowest: int = 10):
+        self.name = name
+        self.slowest = slowest
+        self.phases = {}     # fase -> [parede, cpu]
+        self.counters = {}
+        self._slow = []      # heap (segundos, item)
+        self.extra = {}      # seções adicionais do relatório (por script)
+        self._t0 = (time.perf_counter(), time.process_time())
+
+    @contextmanager
+    def phase(self, nome: str):
+        w0, c0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(nome, time.perf_counter() - w0, time.process_time() - c0)
+
+    def add(self, nome: str, wall: float, cpu: float = 0.0):
+        acc = self.phases.setdefault(nome, [0.0, 0.0])
+        acc[0] += wall
+        acc[1] += cpu
+
+    def timed_iter(self, nome: str, it):
+        """Itera `it` contabilizando o tempo de produção dos itens na fase `nome`."""
+        it = iter(it)
+        while True:
+            with self.phase(nome):
+                try:
+                    x = next(it)
+                except StopIteration:
+                    return
+            yield x
+
+    def count(self, chave: str, n: int = 1):
+        self.counters[chave] = self.counters.get(chave, 0) + n
+
+    def slow(self, item: str, seconds: float):
+        if len(self._slow) < self.slowest:
+            heapq.heappush(self._slow, (seconds, item))
+        elif seconds > self._slow[0][0]:
+            heapq.heapreplace(self._slow, (seconds, item))
+
+    def as_dict(self) -> dict:
+        wall = time.perf_counter() - self._t0[0]
+        cpu = time.process_time() - self._t0[1]
+        return {
+            "build": self.name,
+            "total": {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4)},
+            "fases": {k: {"wall_s": round(w, 4), "cpu_s": round(c, 4)}
+                      for k, (w, c) in self.phases.items()},
+            "contadores": dict(self.counters),
+            "mais_lentas": [{"item": i, "s": round(s, 5)}
+                            for s, i in sorted(self._slow, reverse=True)],
+            **self.extra,
+        }
+
+    def save(self, path: Path = None) -> Path:
+        path = path or CACHE_DIR / f"report-{self.name}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_dict(), ensure_ascii=False, indent=1), encoding="utf-8")
+        return path
+
+    def summary(self) -> str:
+        d = self.as_dict()
+        fases = ", ".join(f"{k} {v['wall_s']:.2f}s" for k, v in d["fases"].items())
+        cont = ", ".join(f"{v} {k.replace('_', ' ')}" for k, v in d["contadores"].items())
+        return f"{d['total']['wall_s']:.2f}s (CPU {d['total']['cpu_s']:.2f}s) — {cont}" + (f" — {fases}" if fases else "")
+
+def add_report_args(ap):
+    """Flags comuns de instrumentação (--relatorio / --profile)."""
+    ap.add_argument("--relatorio", type=Path, default=None, metavar="ARQ",
+                    help="onde gravar o relatório JSON do build (padrão: .build-cache/report-<script>.json)")
+    ap.add_argument("--profile", action="store_true",
+                    help="roda o build sob cProfile e grava .build-cache/<script>.pstats")
+
+def run_profiled(name: str, fn, *args, top: int = 25):
+    """Executa fn(*args) sob cProfile; grava o pstats e imprime as funções mais caras."""
+    prof = cProfile.Profile()
+    try:
+        return prof.runcall(fn, *args)
+    finally:
+        CACHE_DIR.mkdir(exist_ok=True)
+        out = CACHE_DIR / f"{name}.pstats"
+        prof.dump_stats(out)
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(top)
+        print(buf.getvalue(), file=sys.stderr)
+        print(f"[profile] {out}", file=sys.stderr)
@@ -0,0 +1,113 @@
+# sitemap.xml em streaming (com shards e índice) e datas de última mudança
+# por saída, usados pelo gerar_paginas.py.
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape as _xml_escape
+import gzip
+import json
+import os
+
+from build_lib import CACHE_DIR, write_if_changed
+
+# ===== Sitemap XML =====
+# Limites do protocolo (https://www.sitemaps.org/protocol.html), por arquivo
+SITEMAP_MAX_URLS = 50_000
+SITEMAP_MAX_BYTES = 50 * 1024 * 1024  # sem compressão
+_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+class LastmodStore:
+    """
+    Data da última mudança de cada saída: rel -> [chave, data]. A data só
+    avança quando a chave (hash das entradas, a mesma do BuildManifest) muda.
+    """
+    def __init__(self, name: str):
+        self.path = CACHE_DIR / f"lastmod-{name}.json"
+        self.hoje = datetime.now(timezone.utc).date().isoformat()
+        self.prev = {}
+        if self.path.exists():
+            try:
+                self.prev = json.loads(self.path.read_text(encoding="utf-8"))
+            except ValueError:
+                self.prev = {}
+        self.pages = {}
+
+    def get(self, rel: str, key) -> str:
+        old = self.prev.get(rel)
+        ent = old if old is not None and (key is None or old[0] == key) else [key, self.hoje]
+        self.pages[rel] = ent
+        return ent[1]
+
+    def save(self):
+        CACHE_DIR.mkdir(exist_ok=True)
+        write_if_changed(self.path, json.dumps(self.pages, ensure_ascii=False, separators=(",", ":")))
+        self.prev, self.pages = self.pages, {}
+
+class SitemapWriter:
+    """
+    sitemap.xml em streaming: cada URL vai direto para o arquivo no staging
+    do OutputWriter, sem acumular a lista. Ao atingir 50 mil URLs ou 50 MB
+    abre um novo shard (sitemap-<n>.xml); com mais de um shard (ou `gz`),
+    sitemap.xml vira o índice que aponta para eles.
+    """
+    def __init__(self, writer, base_url: str, gz: bool = False,
+                 max_urls: int = SITEMAP_MAX_URLS, max_bytes: int = SITEMAP_MAX_BYTES):
+        self.writer = writer
+        self.base = base_url.rstrip("/")
+        self.gz = gz
+        self.max_urls, self.max_bytes = max_urls, max_bytes
+        self.shards = []   # (rel, maior lastmod)
+        self._f = None
+
+    def _abrir(self):
+        rel = f"sitemap-{len(self.shards) + 1}.xml" + (".gz" if self.gz else "")
+        dst = self.writer.stage/rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        self._f = gzip.GzipFile(dst, "wb", mtime=0) if self.gz else open(dst, "wb")
+        head = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{_NS}">\n'.encode()
+        self._f.write(head)
+        self._rel, self._n, self._bytes, self._lastmod = rel, 0, len(head), ""
+
+    def _fechar(self):
+        self._f.write(b"</urlset>\n")
+        self._f.close()
+        self._f = None
+        self.shards.append((self._rel, self._lastmod))
+
+    def add(self, path: str, lastmod: str = None):
+        """`path` relativo ao site ("/", "/racas/x.html"); `lastmod` em AAAA-MM-DD."""
+        loc = _xml_escape(self.base + path)
+        entry = (f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>\n" if lastmod
+                 else f"<url><loc>{loc}</loc></url>\n").encode()
+        if self._f is not None and (self._n >= self.max_urls
+                                    or self._bytes + len(entry) + 11 > self.max_bytes):
+            self._fechar()
+        if self._f is None:
+            self._abrir()
+        self._f.write(entry)
+        self._n += 1
+        self._bytes += len(entry)
+        if lastmod and lastmod > self._lastmod:
+            self._lastmod = lastmod
+
+    def close(self):
+        """Fecha o último shard, escreve o índice se preciso e remove shards antigos."""
+        if self._f is None:
+            self._abrir()
+        self._fechar()
+        stage = self.writer.stage
+        if len(self.shards) == 1 and not self.gz:
+            os.replace(stage/self.shards[0][0], stage/"sitemap.xml")
+            validos = {"sitemap.xml"}
+        else:
+            linhas = [f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{_NS}">\n']
+            for rel, lastmod in self.shards:
+                mod = f"<lastmod>{lastmod}</lastmod>" if lastmod else ""
+                linhas.append(f"<sitemap><loc>{_xml_escape(self.base)}/{rel}</loc>{mod}</sitemap>\n")
+            linhas.append("</sitemapindex>\n")
+            (stage/"sitemap.xml").write_text("".join(linhas), encoding="utf-8")
+            validos = {"sitemap.xml", *(rel for rel, _ in self.shards)}
+            for rel, _ in self.shards:
+                self.writer.finish(rel)
+        self.writer.finish("sitemap.xml")
+        for p in self.writer.root.glob("sitemap-*.xml*"):
+            if p.name not in validos:
+                self.writer.delete(p.name)
@@ -4,6 +4,7 @@
 
   const MAX_COLS = 3;
   const STORAGE_KEY = "compare:selected";
+  const PERFIL_KEY = "compare:perfil-clima";
 
   const simplify = (s) =>
     (s || "")
@@ -17,10 +18,20 @@
       .replace(/[^a-z0-9]+/g, "-")
       .replace(/(^-|-$)/g, "");
 
+  // chave do mapa nome/alias -> slug; idêntica ao simplify() de build_lib.py
+  const lookupKey = (s) =>
+    simplify(s)
+      .replace(/[’'´`-]+/g, " ")
+      .replace(/[^a-z0-9]+/g, " ")
+      .replace(/\s+/g, " ")
+      .trim();
+
   const main = root.querySelector(".compare-main");
   const headgrid = root.querySelector(".cmp-headgrid");
   const chips = root.querySelector(".selected-chips");
   const datalist = root.querySelector("#breeds-datalist");
+  // options na ordem de clima.perfis dos registros (ausente com um perfil só)
+  const perfilSel = root.querySelector("#perfil-clima");
   const BASE_URL = document.body?.dataset?.baseurl || "";
   const breedUrl = (slug) => `${BASE_URL}/racas/${slug}.html`;
 
@@ -39,7 +50,16 @@
   };
   Object.values(sections).forEach((s) => main.appendChild(s));
 
+  // índice compacto (slug, nome, aliases, foto) + registros completos por slug,
+  // carregados sob demanda a partir dos shards do manifesto
   let data = [];
+  let shards = {};
+  // sem shards: catálogo em colunas (decodeColunar), registros montados sob demanda
+  let colunar = null;
+  // data/breeds-lookup.json: chaves ordenadas (prefixos por busca binária)
+  let lookup = {};
+  let lookupKeys = [];
+  const details = new Map();
   let selected = [];
   let dragIndex = -1;
 
@@ -54,6 +74,11 @@
     localStorage.setItem(STORAGE_KEY, JSON.stringify(selected.slice(0, MAX_COLS)));
   }
 
+  function loadPerfil() {
+    const p = localStorage.getItem(PERFIL_KEY);
+    if (perfilSel && p && [...perfilSel.options].some((o) => o.value === p)) perfilSel.value = p;
+  }
+
   function readURLAndMerge() {
     const p = new URLSearchParams(location.search);
     const adds = p.getAll("add");
@@ -72,10 +97,15 @@
     d.setAttribute("aria-hidden", "true");
     return d;
   }
-  function hThumb(img, alt = "") {
+  // fontes = foto_srcset do registro: [[mime, srcset], ...]; a última vai no <img>
+  function hThumb(img, alt = "", fontes = null) {
     if (!img) return "";
     const altText = alt || "Foto da raça";
-    return `<img src="${img}" alt="${altText}" loading="lazy" decoding="async" width="96" height="64" class="cmp-thumb">`;
+    const attrs = `alt="${altText}" loading="lazy" decoding="async" width="96" height="64" class="cmp-thumb"`;
+    if (!fontes?.length) return `<img src="${img}" ${attrs}>`;
+    const sources = fontes.slice(0, -1).map(([tipo, srcset]) =>
+      `<source type="${tipo}" srcset="${srcset}" sizes="96px">`).join("");
+    return `<picture>${sources}<img src="${img}" srcset="${fontes[fontes.length - 1][1]}" sizes="96px" ${attrs}></picture>`;
   }
   function cell(text, isLabel = false) {
     const d = document.createElement("div");
@@ -94,7 +124,7 @@
   function renderChips() {
     chips.innerHTML = "";
     selected.forEach((slug) => {
-      const b = data.find((d) => d.slug === slug);
+      const b = details.get(slug);
       if (!b) return;
       const chip = document.createElement("button");
       chip.type = "button";
@@ -132,7 +162,7 @@
 
         d.innerHTML = `
         <button type="button" class="cmp-colhead__remove" aria-label="Remover ${b.nome}">×</button>
-        ${hThumb(b.foto, `Foto da raça ${b.nome}`)}
+        ${hThumb(b.foto, `Foto da raça ${b.nome}`, b.foto_srcset)}
         <div class="cmp-colhead__txt">
           <a class="cmp-colhead__name" href="${breedUrl(b.slug)}">
             <strong>${b.nome}</strong>
@@ -239,13 +269,14 @@
           renderAll();
         });
 
-        form.addEventListener("submit", (e) => {
+        form.addEventListener("submit", async (e) => {
           e.preventDefault();
           const inp = form.querySelector(".cmp-add-input");
           const slug = resolveSlugByName(inp.value);
           if (!slug || selected.includes(slug) || selected.length >= MAX_COLS) return;
           selected.push(slug);
           saveSel();
+          await loadDetails([slug]);
           renderAll();
           requestAnimationFrame(() => headgrid.querySelector(".cmp-add-input")?.focus());
         });
@@ -314,11 +345,24 @@
 
   function renderG33(grid, breeds) {
     const row = makeRowAppender(grid, "g33", breeds);
+    // score e nome do perfil escolhido; shards antigos (sem perfis) ficam no perfil do build
+    row("Adequação ao clima", (b) => {
+      const c = b.clima;
+      const i = perfilSel && c.perfis ? perfilSel.selectedIndex : -1;
+      const v = i >= 0 ? c.perfis[i] : c.valor;
+      const perfil = i >= 0 ? c.perfis_txt?.[i] : c.perfil_txt;
+      if (v == null) return "—";
+      return perfil ? `${v}/5 (${perfil})` : `${v}/5`;
+    });
     row("Tolerância ao calor", (b) => b.clima.tolerancia_calor_txt || "—");
     row("Tolerância à umidade", (b) => b.clima.tolerancia_umidade_txt || "—");
     row("Adaptação ao espaço", (b) => b.clima.adaptacao_espaco_txt || "—");
   }
 
+  function selectedBreeds() {
+    return selected.map((slug) => details.get(slug)).filter(Boolean);
+  }
+
   function clearGrids() {
     Object.values(sections).forEach((sec) => {
       const g = sec.querySelector(".cmp-grid");
@@ -326,19 +370,43 @@
     });
   }
 
+  function setLookup(k) {
+    lookup = k;
+    lookupKeys = Object.keys(k);
+  }
+
+  // Sem breeds-lookup.json: monta o mesmo mapa uma vez (nome vence alias)
+  function buildLookup(list) {
+    const k = {};
+    list.forEach((d) => {
+      [d.slug, d.nome].forEach((t) => {
+        const key = lookupKey(t);
+        if (key && !(key in k)) k[key] = d.slug;
+      });
+    });
+    list.forEach((d) => {
+      (d.aliases || []).forEach((a) => {
+        const key = lookupKey(a);
+        if (key && !(key in k)) k[key] = d.slug;
+      });
+    });
+    return Object.fromEntries(Object.entries(k).sort(([a], [b]) => (a < b ? -1 : a > b ? 1 : 0)));
+  }
+
+  // exato em O(1); senão a primeira chave com o prefixo (busca binária)
   function resolveSlugByName(name) {
-    const norm = simplify(name);
+    const norm = lookupKey(name);
     if (!norm) return null;
-    const hit =
-      data.find(
-        (d) => simplify(d.nome) === norm || (d.aliases || []).some((a) => simplify(a) === norm)
-      ) ||
-      data.find(
-        (d) =>
-          simplify(d.nome).startsWith(norm) ||
-          (d.aliases || []).some((a) => simplify(a).startsWith(norm))
-      );
-    return hit?.slug || null;
+    if (lookup[norm]) return lookup[norm];
+    let lo = 0;
+    let hi = lookupKeys.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (lookupKeys[mid] < norm) lo = mid + 1;
+      else hi = mid;
+    }
+    const key = lookupKeys[lo];
+    return key && key.startsWith(norm) ? lookup[key] : null;
   }
 
   function renderAll() {
@@ -389,7 +457,7 @@
       tools.append(share, clear);
     }
 
-    const breeds = selected.map((slug) => data.find((d) => d.slug === slug)).filter(Boolean);
+    const breeds = selectedBreeds();
     renderHeadgrid(breeds);
 
     clearGrids();
@@ -400,13 +468,155 @@
     renderG33(sections.g33.querySelector(".cmp-grid"), breeds);
   }
 
+  async function fetchJSON(path, opts) {
+    const res = await fetch(`${BASE_URL}/${path}`, opts);
+    if (!res.ok) throw new Error(`${res.status} ${path}`);
+    return res.json();
+  }
+
+  // Shards têm hash do conteúdo no nome: podem ficar em cache indefinidamente.
+  async function loadDetails(slugs) {
+    if (colunar) {
+      slugs.forEach((s) => {
+        const i = colunar.indice(s);
+        if (i >= 0 && !details.has(s)) details.set(s, colunar.get(i));
+      });
+    }
+    const missing = slugs.filter((s) => !details.has(s) && shards[s]);
+    const recs = await Promise.all(
+      missing.map((s) =>
+        fetchJSON(shards[s]).catch((e) => {
+          console.error(e);
+          return null;
+        })
+      )
+    );
+    recs.forEach((b) => b && details.set(b.slug, b));
+  }
+
+  // Decodificador de data/breeds-client.bin (gerar_breeds_cliente.py --colunar):
+  // devolve { n, get(i), indice(slug), resumo() } — os registros são montados sob
+  // demanda a partir das colunas tipadas, sem materializar o catálogo inteiro.
+  function decodeColunar(buf) {
+    const u8 = new Uint8Array(buf);
+    const dv = new DataView(buf);
+    if (String.fromCharCode(u8[0], u8[1], u8[2], u8[3]) !== "BRC1") {
+      throw new Error("breeds-client.bin: formato desconhecido");
+    }
+    const nCab = dv.getUint32(4, true);
+    const cab = JSON.parse(new TextDecoder().decode(u8.subarray(8, 8 + nCab)));
+    const { n, strings } = cab;
+    const base = 8 + nCab;
+    const Idx = cab.w === 2 ? Uint16Array : Uint32Array;
+    const NULO_IDX = cab.w === 2 ? 0xffff : 0xffffffff;
+    const AUSENTE = undefined;
+
+    const cols = cab.cols.map((c) => {
+      const k = c.k || 1;
+      let get;
+      if (c.t === "u8" || c.t === "u16") {
+        const a = c.t === "u8" ? new Uint8Array(buf, base + c.o, n * k) : new Uint16Array(buf, base + c.o, n * k);
+        const nulo = c.t === "u8" ? 0xff : 0xffff;
+        get = k > 1 ? (i) => Array.from(a.subarray(i * k, (i + 1) * k)) : (i) => (a[i] === nulo ? null : a[i]);
+      } else if (c.t === "ls") {
+        const offs = new Uint32Array(buf, base + c.o2, n + 1);
+        const a = new Idx(buf, base + c.o, offs[n]);
+        get = (i) => Array.from(a.subarray(offs[i], offs[i + 1]), (j) => strings[j]);
+      } else {
+        const a = new Idx(buf, base + c.o, n);
+        get =
+          c.t === "s"
+            ? (i) => (a[i] === NULO_IDX ? null : strings[a[i]])
+            : (i) => (a[i] === NULO_IDX ? AUSENTE : JSON.parse(strings[a[i]]));
+      }
+      return { p: c.p, caminho: c.p.split("."), get };
+    });
+    const col = Object.fromEntries(cols.map((c) => [c.p, c.get]));
+
+    function get(i) {
+      const rec = {};
+      cols.forEach(({ caminho, get }) => {
+        const v = get(i);
+        if (v === AUSENTE) return;
+        let o = rec;
+        for (let j = 0; j < caminho.length - 1; j++) o = o[caminho[j]] ??= {};
+        o[caminho[caminho.length - 1]] = v;
+      });
+      return rec;
+    }
+
+    let slugs = null;
+    return {
+      n,
+      get,
+      // posição da raça pelo slug (-1 se não houver)
+      indice(slug) {
+        if (!slugs) slugs = new Map(Array.from({ length: n }, (_, i) => [col.slug(i), i]));
+        return slugs.get(slug) ?? -1;
+      },
+      // mesmos campos do breeds-index.json
+      resumo() {
+        return Array.from({ length: n }, (_, i) => ({
+          slug: col.slug(i),
+          nome: col.nome(i),
+          aliases: col.aliases(i),
+          foto: col.foto(i),
+        }));
+      },
+    };
+  }
+
+  async function loadIndex() {
+    try {
+      [data, shards] = await Promise.all([
+        fetchJSON("data/breeds-index.json", { cache: "no-cache" }),
+        fetchJSON("data/breeds-manifest.json", { cache: "no-cache" }),
+      ]);
+    } catch {
+      // build sem shards: cai para o catálogo completo (em colunas, se gerado)
+      shards = {};
+      try {
+        const res = await fetch(`${BASE_URL}/data/breeds-client.bin`, { cache: "no-store" });
+        if (!res.ok) throw new Error(`${res.status} data/breeds-client.bin`);
+        colunar = decodeColunar(await res.arrayBuffer());
+        data = colunar.resumo();
+      } catch {
+        const all = await fetchJSON("data/breeds-client.json", { cache: "no-store" });
+        data = all;
+        all.forEach((b) => details.set(b.slug, b));
+      }
+    }
+    try {
+      const l = await fetchJSON("data/breeds-lookup.json", { cache: "no-cache" });
+      setLookup(l.k);
+    } catch {
+      setLookup(buildLookup(data));
+    }
+  }
+
+  // ?add= aceita slug, nome ou alias
+  function resolveSelected() {
+    const known = (s) => s in shards || details.has(s) || (colunar !== null && colunar.indice(s) >= 0);
+    selected = [...new Set(selected.map((s) => (known(s) ? s : resolveSlugByName(s))).filter(Boolean))];
+    saveSel();
+  }
+
+  // troca de perfil: só a seção de ambiente é refeita, sem buscar nada
+  perfilSel?.addEventListener("change", () => {
+    localStorage.setItem(PERFIL_KEY, perfilSel.value);
+    const grid = sections.g33.querySelector(".cmp-grid");
+    grid.innerHTML = "";
+    renderG33(grid, selectedBreeds());
+  });
+
   async function init() {
     readURLAndMerge();
+    loadPerfil();
 
-    const BASE = document.body?.dataset?.baseurl || "";
     try {
-      const res = await fetch(`${BASE}/data/breeds-client.json`, { cache: "no-store" });
-      data = await res.json();
+      await loadIndex();
+      resolveSelected();
+      await loadDetails(selected);
     } catch (e) {
       console.error(e);
       data = [];
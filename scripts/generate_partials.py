@@ -4,8 +4,12 @@
 from pathlib import Path
 from html import escape as _e
 from datetime import datetime
+import argparse
 import json
 
+from build_output import OutputWriter, add_output_args
+from build_report import BuildReport, add_report_args, run_profiled
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA = ROOT / "data" / "site.json"
 TPL_DIR = ROOT / "templates"
@@ -41,6 +45,8 @@ def absolutize(base, href):
     return f"{base}/{href}".replace("//", "/") or "/"
 
 def render_head_base(site):
+    # ${CSS_HEAD}: CSS crítico + preload da folha do tipo de página (ou as três folhas),
+    # preenchido pelo gerar_paginas a partir de styles/dist/css-manifest.json
     base = site["base_url"].rstrip("/")
     theme = "#127a72"  # teal brand-700
     robots = "noindex, nofollow" if site.get("noindex") else "index, follow"
@@ -54,9 +60,7 @@ def render_head_base(site):
 <link rel="icon" href="{absolutize(base, '/public/favicon.svg')}" />
 <link rel="apple-touch-icon" href="{absolutize(base, '/public/apple-touch-180.png')}" />
 
-<link rel="stylesheet" href="{absolutize(base, '/styles/tokens.css')}" />
-<link rel="stylesheet" href="{absolutize(base, '/styles/base.css')}" />
-<link rel="stylesheet" href="{absolutize(base, '/styles/ui.css')}" />
+${{CSS_HEAD}}
 
 <link rel="preload" as="image" href="{absolutize(base, '/assets/icons/sprite.svg')}" />
 """.rstrip() + "\n"
@@ -95,12 +99,36 @@ def render_footer(site):
 </footer>
 """
 
+PARTIALS = [
+    ("head-base.html", render_head_base),
+    ("header.html", render_header),
+    ("footer.html", render_footer),
+]
+
+def build(report, writer):
+    with report.phase("load"):
+        site = load_site()
+    for nome, render in PARTIALS:
+        with report.phase("render"):
+            text = render(site)
+        report.count("renderizadas")
+        with report.phase("write"):
+            writer.write(nome, text)
+
 def main():
-    site = load_site()
-    (TPL_DIR / "head-base.html").write_text(render_head_base(site), encoding="utf-8")
-    (TPL_DIR / "header.html").write_text(render_header(site), encoding="utf-8")
-    (TPL_DIR / "footer.html").write_text(render_footer(site), encoding="utf-8")
-    print("[ok] templates/head-base.html, header.html, footer.html atualizados")
+    ap = argparse.ArgumentParser(description="Gera os partials de templates/ a partir de data/site.json.")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    report = BuildReport("partials")
+    with OutputWriter("partials", TPL_DIR, "/templates/", report, fsync=not args.sem_fsync) as writer:
+        if args.profile:
+            run_profiled("partials", build, report, writer)
+        else:
+            build(report, writer)
+    report.save(args.relatorio)
+    print(f"[ok] templates/head-base.html, header.html, footer.html atualizados — {report.summary()}")
 
 if __name__ == "__main__":
     main()
@@ -1,49 +1,273 @@
+from array import array
+from pathlib import Path
+import argparse
 import json
+import sys
+import time
 
 from build_lib import (
-    ROOT, load_all, load_aliases_map, slugify, human_porte,
-    score_atividade, score_grooming, score_clima, get_aliases_for_breed
+    ROOT, load_site_rules, iter_racas, iter_batches, load_aliases_map,
+    score_all, score_row, client_record, load_img_manifest, BreedIndex, ScoringContext,
+    content_hash, CatalogError, validate_catalog
 )
+from build_output import OutputWriter, add_output_args
+from build_report import BuildReport, add_report_args, run_profiled
+
+# Saídas (relativas a data/):
+# - breeds-client.json   catálogo completo (formato legado)
+# - breeds-index.json    índice compacto: slug, nome, aliases e foto (datalist / ?add=)
+# - breeds/<slug>.<hash>.json  um shard minificado por raça (cache longo)
+# - breeds-manifest.json slug -> URL do shard
+# - breeds-lookup.json   nome/alias/slug normalizado (simplify) -> slug
+# - breeds-client.bin    (--colunar) o catálogo completo em colunas (encode_colunar)
+SHARD_DIR = "breeds"
+BATCH_SIZE = 512
+COLUNAR = "breeds-client.bin"
+
+def minify(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def write_shard(writer, rec):
+    """Grava o shard da raça com hash do conteúdo no nome; retorna o caminho relativo ao site."""
+    data = minify(rec)
+    name = f"{rec['slug']}.{content_hash(data)[:10]}.json"
+    writer.write(f"{SHARD_DIR}/{name}", data)
+    return f"data/{SHARD_DIR}/{name}"
+
+def prune_shards(writer, manifest):
+    """Remove (no commit) shards de versões anteriores, não referenciados pelo manifesto."""
+    keep = {url.rsplit("/", 1)[-1] for url in manifest.values()}
+    shard_dir = writer.root/SHARD_DIR
+    if shard_dir.exists():
+        for p in shard_dir.glob("*.json"):
+            if p.name not in keep:
+                writer.delete(f"{SHARD_DIR}/{p.name}")
+
+# ===== Formato colunar (breeds-client.bin) =====
+# "BRC1" + tamanho do cabeçalho (u32) + cabeçalho JSON (UTF-8) e, alinhadas em
+# 4 bytes, as colunas em little-endian. Cabeçalho: {"v", "n" (registros),
+# "w" (2 ou 4: bytes do índice de string), "strings" (tabela única de
+# strings), "cols": [{"p": caminho "a.b", "t": tipo, "o": offset, "k"}]}.
+# Tipos: u8/u16 (inteiros; o máximo do tipo = null; "k" > 1 = lista de k
+# valores por registro), s (índice na tabela), ls (lista de strings: offsets
+# u32 em n+1 posições + índices) e j (JSON do valor, internado na tabela;
+# índice máximo = chave ausente). O decodificador está em compare.js.
+COL_MAGIC = b"BRC1"
+COL_VERSAO = 1
+_UINT = {"u8": ("B", 0xFF), "u16": ("H", 0xFFFF), "u32": ("I", 0xFFFFFFFF)}
+_AUSENTE = object()
+
+def _folhas(obj, prefixo=""):
+    for k, v in obj.items():
+        if isinstance(v, dict) and v:
+            yield from _folhas(v, f"{prefixo}{k}.")
+        else:
+            yield f"{prefixo}{k}", v
+
+def _inteiros(vals, maximo):
+    return all(v is None or (type(v) is int and 0 <= v < maximo) for v in vals)
+
+def _tipo_coluna(vals):
+    """(tipo, k) da coluna; j quando nenhum tipo compacto cabe."""
+    if _AUSENTE in vals:
+        return "j", 1
+    for t in ("u8", "u16"):
+        if _inteiros(vals, _UINT[t][1]):
+            return t, 1
+    if all(type(v) is list for v in vals):
+        k = len(vals[0]) if vals else 0
+        if k > 1 and all(len(v) == k and _inteiros(v, 0xFF) and None not in v for v in vals):
+            return "u8", k
+        if all(type(x) is str for v in vals for x in v):
+            return "ls", 1
+    if all(v is None or type(v) is str for v in vals):
+        return "s", 1
+    return "j", 1
+
+def _bytes(a: array) -> bytes:
+    if sys.byteorder != "little":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+def encode_colunar(recs) -> bytes:
+    """Codifica a lista de registros de client_record no formato colunar."""
+    linhas = [dict(_folhas(r)) for r in recs]
+    caminhos = list(dict.fromkeys(p for linha in linhas for p in linha))
+    strings, idx = [], {}
+
+    def intern(s):
+        i = idx.get(s)
+        if i is None:
+            i = idx[s] = len(strings)
+            strings.append(s)
+        return i
+
+    cols = []   # (caminho, tipo, k, valores: inteiros ou índices de string)
+    for p in caminhos:
+        vals = [linha.get(p, _AUSENTE) for linha in linhas]
+        t, k = _tipo_coluna(vals)
+        if t in ("u8", "u16"):
+            nulo = _UINT[t][1]
+            ints = [x for v in vals for x in v] if k > 1 else [nulo if v is None else v for v in vals]
+            cols.append((p, t, k, ints, None))
+        elif t == "ls":
+            offsets, itens = [0], []
+            for v in vals:
+                itens.extend(intern(x) for x in v)
+                offsets.append(len(itens))
+            cols.append((p, t, k, itens, offsets))
+        elif t == "s":
+            cols.append((p, t, k, [None if v is None else intern(v) for v in vals], None))
+        else:
+            cols.append((p, t, k, [None if v is _AUSENTE else
+                                   intern(json.dumps(v, ensure_ascii=False, separators=(",", ":")))
+                                   for v in vals], None))
+
+    w = 2 if len(strings) < 0xFFFF else 4
+    cod_idx, nulo_idx = ("H", 0xFFFF) if w == 2 else ("I", 0xFFFFFFFF)
+    corpo, meta = bytearray(), []
+    for p, t, k, vals, offsets in cols:
+        c = {"p": p, "t": t}
+        if k > 1:
+            c["k"] = k
+        if offsets is not None:
+            c["o2"] = len(corpo)
+            corpo += _bytes(array("I", offsets))
+        c["o"] = len(corpo)
+        if t in ("u8", "u16"):
+            corpo += _bytes(array(_UINT[t][0], vals))
+        else:
+            corpo += _bytes(array(cod_idx, [nulo_idx if v is None else v for v in vals]))
+        corpo += bytes(-len(corpo) % 4)
+        meta.append(c)
+
+    cab = minify({"v": COL_VERSAO, "n": len(recs), "w": w, "strings": strings, "cols": meta}).encode("utf-8")
+    cab += b" " * (-(8 + len(cab)) % 4)
+    return COL_MAGIC + _bytes(array("I", [len(cab)])) + cab + bytes(corpo)
+
+def decode_colunar(data: bytes) -> list:
+    """Inverso de encode_colunar (lista de registros); usado para conferir a ida e volta."""
+    if data[:4] != COL_MAGIC:
+        raise ValueError("breeds-client.bin: formato desconhecido")
+    n_cab = int.from_bytes(data[4:8], "little")
+    cab = json.loads(data[8:8 + n_cab])
+    base, n, strings = 8 + n_cab, cab["n"], cab["strings"]
+    cod_idx, nulo_idx = ("H", 0xFFFF) if cab["w"] == 2 else ("I", 0xFFFFFFFF)
+
+    def ler(cod, off, qtd):
+        a = array(cod)
+        a.frombytes(data[base + off: base + off + qtd * a.itemsize])
+        if sys.byteorder != "little":
+            a.byteswap()
+        return a
+
+    recs = [{} for _ in range(n)]
+    for c in cab["cols"]:
+        t, k = c["t"], c.get("k", 1)
+        if t in ("u8", "u16"):
+            cod, nulo = _UINT[t]
+            a = ler(cod, c["o"], n * k)
+            vals = ([a[i*k:(i+1)*k].tolist() for i in range(n)] if k > 1
+                    else [None if v == nulo else v for v in a])
+        elif t == "ls":
+            offs = ler("I", c["o2"], n + 1)
+            a = ler(cod_idx, c["o"], offs[-1])
+            vals = [[strings[j] for j in a[offs[i]:offs[i+1]]] for i in range(n)]
+        else:
+            a = ler(cod_idx, c["o"], n)
+            if t == "s":
+                vals = [None if v == nulo_idx else strings[v] for v in a]
+            else:
+                vals = [_AUSENTE if v == nulo_idx else json.loads(strings[v]) for v in a]
+        *pai, chave = c["p"].split(".")
+        for rec, v in zip(recs, vals):
+            if v is _AUSENTE:
+                continue
+            for p in pai:
+                rec = rec.setdefault(p, {})
+            rec[chave] = v
+    return recs
+
+def _writer_name(out):
+    """Nome do writer por diretório de saída (o padrão, data/, mantém o nome histórico)."""
+    out = Path(out).resolve()
+    return "breeds-cliente" if out == (ROOT/"data").resolve() else f"breeds-cliente-{content_hash(str(out))[:10]}"
+
+def build_client(racas, scoring, aliases_map, out, report=None, writer=None, colunar=False):
+    """
+    Gera os dados do comparador em `out` a partir de um iterável de raças.
+    Sem `writer`, as saídas são publicadas (commit) ao final. Com `colunar`,
+    grava também o catálogo completo em breeds-client.bin (encode_colunar).
+    """
+    report = report or BuildReport("breeds-cliente")
+    if writer is None:
+        with OutputWriter(_writer_name(out), out, "/data/", report) as writer:
+            return build_client(racas, scoring, aliases_map, out, report, writer, colunar)
+
+    breeds = BreedIndex(aliases_map)
+    imagens = load_img_manifest()   # srcset das miniaturas (scripts/gerar_imagens.py)
+    client, index, manifest = [], [], {}
+    for lote in iter_batches(report.timed_iter("load", racas), BATCH_SIZE):
+        with report.phase("score"):
+            cols = score_all(lote, scoring)
+        for i, r in enumerate(lote):
+            t0 = time.perf_counter()
+            with report.phase("render"):
+                rec = client_record(r, score_row(cols, i), scoring, breeds, imagens)
+                client.append(rec)
+                index.append({"slug": rec["slug"], "nome": rec["nome"],
+                              "aliases": rec["aliases"], "foto": rec["foto"]})
+            with report.phase("write"):
+                manifest[rec["slug"]] = write_shard(writer, rec)
+            report.slow(rec["slug"], time.perf_counter() - t0)
+            report.count("racas")
+
+    with report.phase("write"):
+        writer.write("breeds-client.json", json.dumps(client, ensure_ascii=False, indent=2))
+        writer.write("breeds-index.json", minify(index))
+        writer.write("breeds-manifest.json", minify(manifest))
+        writer.write("breeds-lookup.json", minify(breeds.client_lookup()))
+        prune_shards(writer, manifest)
+    if colunar:
+        with report.phase("colunar"):
+            writer.write(COLUNAR, encode_colunar(client))
+    else:   # um .bin antigo teria precedência sobre o breeds-client.json no comparador
+        writer.delete(COLUNAR)
+    # nome/alias que aponta para duas raças: o comparador resolve para a mantida
+    report.count("colisoes_alias", len(breeds.colisoes))
+    if breeds.colisoes:
+        report.extra["colisoes_alias"] = [
+            {"chave": k, "slug": mantido, "descartado": descartado}
+            for k, mantido, descartado in breeds.colisoes
+        ]
+    return report
 
 def main():
-    site, rules, racas = load_all()
-    aliases_map = load_aliases_map()
-
-    client = []
-    for r in racas:
-        slug = slugify(r["nome"])
-        grupo = r["atributos"].get("fci_grupo")
-        porte_slug = (r["atributos"].get("porte") or "").lower()
-        porte_label = human_porte(porte_slug)
-
-        atividade_val, _txtA, factsA = score_atividade(r, rules)
-        grooming_val,  _txtG, factsG = score_grooming(r, rules)
-        clima_val,     _txtC, factsC = score_clima(r, rules, atividade_val)
-
-        client.append({
-            "slug": slug,
-            "nome": r["nome"],
-            "foto": r.get("foto",""),
-            "origem": r.get("origem","—"),
-            "fci": {"grupo": grupo, "descricao": rules["fci_grupos"].get(str(grupo), "—")},
-            "porte": {"slug": porte_slug, "label": porte_label},
-            "medidas": {
-              "altura_cm": r["medidas"]["altura_cm"],
-              "peso_kg":   r["medidas"]["peso_kg"],
-              "expectativa_anos": r["medidas"].get("expectativa_anos","—")
-            },
-            "energia":  {"valor": atividade_val, **factsA},
-            "pelagem":  {"valor": grooming_val,  **factsG},
-            "clima":    {"valor": clima_val,     **factsC},
-            "aliases":  get_aliases_for_breed(r, aliases_map),
-        })
+    ap = argparse.ArgumentParser(description="Gera os dados do comparador em data/.")
+    ap.add_argument("--colunar", action="store_true",
+                    help=f"grava também data/{COLUNAR}: o catálogo em colunas tipadas com tabela de strings")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
 
+    site, rules = load_site_rules()
+    report = BuildReport("breeds-cliente")
+    with report.phase("validate"):
+        try:
+            report.count("validadas", validate_catalog(rules=rules))
+        except CatalogError as e:
+            print(f"[erro] {e}", file=sys.stderr)
+            sys.exit(1)
     out = ROOT/"data"
-    out.mkdir(exist_ok=True)
-    (out/"breeds-client.json").write_text(
-        json.dumps(client, ensure_ascii=False, indent=2),
-        encoding="utf-8"
-    )
+    with OutputWriter(_writer_name(out), out, "/data/", report, fsync=not args.sem_fsync) as writer:
+        build_args = (iter_racas(), ScoringContext(rules), load_aliases_map(), out, report, writer, args.colunar)
+        if args.profile:
+            run_profiled("breeds-cliente", build_client, *build_args)
+        else:
+            build_client(*build_args)
+    report.save(args.relatorio)
+    print(f"[ok] Dados do comparador gerados em data/ — {report.summary()}")
 
 if __name__ == "__main__":
     main()
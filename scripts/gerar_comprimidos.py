@@ -0,0 +1,191 @@
+# Gera irmãos pré-comprimidos (.gz e, se o módulo brotli estiver instalado,
+# .br) para os artefatos de texto do site — etapa pós-build.
+# Só recomprime arquivos cujo conteúdo mudou desde a última execução (inclusive
+# os que não ganham irmão por não encolher); os irmãos passam pelo staging do
+# OutputWriter e são publicados juntos.
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import gzip
+import os
+import time
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+from build_lib import ROOT, content_hash, BuildManifest
+from build_output import STAGING, stage_file, OutputWriter, add_output_args
+from build_report import BuildReport, add_report_args, run_profiled
+
+# Artefatos de texto publicados (relativos à raiz do site)
+GLOBS = [
+  "*.html",
+  "sitemap*.xml",
+  "*/index.html",
+  "racas/**/*.html",
+  "comparar/**/*.html",
+  "data/*.json",
+  "data/*.bin",
+  "data/breeds/*.json",
+  "styles/*.css",
+  "styles/dist/*.css",
+  "scripts/*.js",
+  "assets/**/*.js",
+  "assets/**/*.svg",
+]
+# Diretórios de fontes, não publicados (ex.: "*/index.html" casaria templates/index.html);
+# diretórios ocultos (.build-cache, .build-staging, .git) também ficam de fora
+IGNORAR_DIRS = {"templates", "partials", "tools", "tests", "docs", "node_modules", "__pycache__"}
+GZIP_NIVEL = 9
+BR_QUALIDADE = 11
+
+def _publicado(rel: str) -> bool:
+    return not any(d.startswith(".") or d in IGNORAR_DIRS for d in rel.split("/")[:-1])
+
+def artefatos():
+    out = set()
+    for pat in GLOBS:
+        rels = (p.relative_to(ROOT).as_posix() for p in ROOT.glob(pat) if p.is_file())
+        out.update(rel for rel in rels if _publicado(rel))
+    return sorted(out)
+
+STAGE = ROOT / STAGING / "comprimidos"
+
+def _chave(h):
+    """Chave do manifesto por arquivo de origem: conteúdo + codificações geradas."""
+    return f"{h}:{'gz+br' if brotli else 'gz'}"
+
+def _fresco(rel, chave, anterior):
+    """
+    A entrada do manifesto é "<chave>|<irmãos mantidos>": irmãos descartados
+    (não menores que o original) não contam como faltando, só os mantidos
+    precisam existir.
+    """
+    if anterior is None:
+        return False
+    chave_ant, _, mantidos = anterior.partition("|")
+    return chave_ant == chave and all((ROOT/f"{rel}.{enc}").exists() for enc in mantidos.split(",") if enc)
+
+def _sibling(rel, enc, data, comprimido):
+    """
+    Grava no staging o irmão comprimido se ele for menor que o original.
+    Retorna (caminho, tamanho ou None, mudou); tamanho None = o antigo deve ser removido.
+    """
+    irmao = f"{rel}.{enc}"
+    if comprimido is None or len(comprimido) >= len(data):
+        return irmao, None, False
+    return irmao, len(comprimido), stage_file(ROOT, STAGE, irmao, comprimido)
+
+def _comprimir(rel):
+    """Worker do pool: (rel, bytes, irmão .gz, irmão .br, segundos)."""
+    t0 = time.perf_counter()
+    data = (ROOT/rel).read_bytes()
+    gz = _sibling(rel, "gz", data, gzip.compress(data, compresslevel=GZIP_NIVEL, mtime=0))
+    # sem brotli, um .br antigo ficaria desatualizado: é removido
+    br = _sibling(rel, "br", data, brotli.compress(data, quality=BR_QUALIDADE) if brotli else None)
+    return rel, len(data), gz, br, time.perf_counter() - t0
+
+def _tamanho(p: Path):
+    try:
+        return p.stat().st_size
+    except FileNotFoundError:
+        return None
+
+def prune_orfaos(validos, writer):
+    """
+    Remove (no commit) .gz/.br cujo arquivo de origem não existe mais ou não é
+    publicado (ex.: sobras de execuções antigas em templates/).
+    """
+    n = 0
+    for pat in GLOBS:
+        for enc in (".gz", ".br"):
+            for p in ROOT.glob(pat + enc):
+                rel = p.relative_to(ROOT).as_posix()
+                if rel[:-len(enc)] not in validos:
+                    writer.delete(rel)
+                    n += 1
+    return n
+
+def comprimir(report, writer, jobs=0, completo=False):
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    manifest = BuildManifest("comprimidos", enabled=not completo)
+    rels = artefatos()
+
+    linhas, pendentes, chaves = {}, [], {}
+    with report.phase("hash"):
+        for rel in rels:
+            chaves[rel] = _chave(content_hash((ROOT/rel).read_bytes()))
+            if _fresco(rel, chaves[rel], manifest.previous(rel)):
+                manifest.keep(rel)
+                report.count("puladas")
+                linhas[rel] = ((ROOT/rel).stat().st_size,
+                               _tamanho(ROOT/f"{rel}.gz"), _tamanho(ROOT/f"{rel}.br"))
+            else:
+                pendentes.append(rel)
+
+    with report.phase("comprimir"):
+        if jobs > 1 and len(pendentes) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                chunksize = max(1, len(pendentes) // (jobs * 4))
+                res = list(pool.map(_comprimir, pendentes, chunksize=chunksize))
+        else:
+            res = [_comprimir(rel) for rel in pendentes]
+    for rel, n, *irmaos, secs in res:
+        for irmao, tam, mudou in irmaos:
+            if tam is None:
+                writer.delete(irmao)
+            else:
+                writer.record(irmao, mudou, tam)
+        linhas[rel] = (n, irmaos[0][1], irmaos[1][1])
+        mantidos = ",".join(irmao.rsplit(".", 1)[1] for irmao, tam, _ in irmaos if tam is not None)
+        manifest.record(rel, f"{chaves[rel]}|{mantidos}")
+        report.count("comprimidas")
+        report.slow(rel, secs)
+
+    report.count("orfaos_removidos", prune_orfaos(set(rels), writer))
+    with report.phase("commit"):
+        writer.commit()
+    manifest.save()
+
+    # Razões por arquivo e totais (bytes comprimidos / originais)
+    arquivos, tot = [], {"bytes": 0, "gz": 0, "br": 0}
+    for rel in rels:
+        n, gz, br = linhas[rel]
+        arquivos.append({"arquivo": rel, "bytes": n, "gz": gz, "br": br,
+                         "razao_gz": round(gz / n, 4) if gz and n else None,
+                         "razao_br": round(br / n, 4) if br and n else None})
+        tot["bytes"] += n
+        tot["gz"] += gz or n   # sem irmão, o host serve o original
+        tot["br"] += br or gz or n
+    totais = {**tot,
+              "razao_gz": round(tot["gz"] / tot["bytes"], 4) if tot["bytes"] else None,
+              "razao_br": round(tot["br"] / tot["bytes"], 4) if tot["bytes"] and brotli else None}
+    report.extra["compressao"] = {"brotli": brotli is not None, "totais": totais, "arquivos": arquivos}
+    return totais
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera .gz/.br ao lado dos artefatos de texto do site.")
+    ap.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                    help="processos para comprimir (padrão: 0 = nº de CPUs)")
+    ap.add_argument("--completo", action="store_true",
+                    help="recomprime tudo, ignorando o manifesto de hashes")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    report = BuildReport("comprimidos")
+    writer = OutputWriter("comprimidos", ROOT, "/", report, fsync=not args.sem_fsync)
+    if args.profile:
+        tot = run_profiled("comprimidos", comprimir, report, writer, args.jobs, args.completo)
+    else:
+        tot = comprimir(report, writer, args.jobs, args.completo)
+    report.save(args.relatorio)
+    br = f", br {tot['br']:,} B ({tot['razao_br']:.1%})" if brotli else " (brotli indisponível)"
+    print(f"[ok] Comprimidos: {tot['bytes']:,} B → gzip {tot['gz']:,} B ({tot['razao_gz']:.1%}){br}"
+          f" — {report.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Gera o CSS por tipo de página (detalhe, lista, comparar, estática):
+# - uma folha podada e com hash no nome (styles/dist/<tipo>.<hash>.css),
+#   só com os seletores cujas classes o tipo usa (templates, JS carregado e
+#   helpers de render do gerar_paginas) + a SAFELIST das classes injetadas;
+# - um bloco de CSS crítico (header e topo da página, antes do <main>),
+#   embutido no head-base pelo gerar_paginas.
+# O manifesto (styles/dist/css-manifest.json) liga cada tipo aos dois.
+# Rode antes do gerar_paginas.py; sem manifesto as páginas usam as três folhas.
+
+import argparse
+import inspect
+import json
+import re
+
+from build_lib import ROOT, content_hash
+from build_css import (
+    CSS_DIST, CSS_MANIFEST, parse_css, prune_css, extract_used_from_html, extract_used_from_js
+)
+from build_output import OutputWriter, add_output_args
+from build_report import BuildReport, add_report_args, run_profiled
+
+# Folhas de origem, na ordem da cascata
+FOLHAS = ("styles/tokens.css", "styles/base.css", "styles/ui.css")
+PARCIAIS = ("head-base.html", "header.html", "footer.html")
+
+# tipo -> templates, JS carregados pelas páginas e helpers de render (gerar_paginas)
+TIPOS = {
+  "detalhe": {
+    "templates": ("detalhe-raca.html",),
+    "js": ("scripts/main.js",),
+    "render": ("render_pop_block", "render_foto_block", "fmt_mf", "detail_vars"),
+  },
+  "lista": {
+    "templates": ("lista-racas.html",),
+    "js": ("scripts/main.js",),
+    "render": ("render_card", "render_options_grupo", "render_pagination", "render_list"),
+  },
+  "comparar": {
+    "templates": ("comparar.html", "comparar-par.html"),
+    "js": ("scripts/compare.js",),
+    "render": ("render_compare", "render_pair_colhead", "render_pair_sections", "render_pair"),
+  },
+  "estatica": {
+    "templates": ("index.html", "sobre.html", "guia-responsavel.html", "acessibilidade.html",
+                  "privacidade.html", "404.html", "sitemap.html"),
+    "js": ("scripts/main.js",),
+    "render": ("render_home", "_rank_items_html", "render_static"),
+  },
+}
+
+def _tpl(nome):
+    return (ROOT/"templates"/nome).read_text(encoding="utf-8")
+
+def classes_do_tipo(tipo, gp):
+    """(usadas, acima da dobra) de um tipo de página."""
+    cfg = TIPOS[tipo]
+    usadas, topo = set(), set()
+    for nome in PARCIAIS:
+        html = _tpl(nome)
+        usadas |= extract_used_from_html(html)
+        if nome != "footer.html":
+            topo |= extract_used_from_html(html)
+    for nome in cfg["templates"]:
+        html = _tpl(nome)
+        usadas |= extract_used_from_html(html)
+        # o que vem antes do <main> pinta antes da folha da página (ver CSS_PAGINA)
+        topo |= extract_used_from_html(re.split(r"<main\b", html, maxsplit=1)[0])
+    for rel in cfg["js"]:
+        usadas |= extract_used_from_js((ROOT/rel).read_text(encoding="utf-8"))
+    for fn in cfg["render"]:
+        usadas |= extract_used_from_html(inspect.getsource(getattr(gp, fn)))
+    # classe posta no <html> pelo script inline do head-base
+    topo.add("js")
+    return usadas, topo
+
+def prune_orfas(writer, manter):
+    """Remove (no commit) folhas de versões anteriores."""
+    for p in CSS_DIST.glob("*.*.css"):
+        if p.name not in manter:
+            writer.delete(p.name)
+
+def build(report, writer):
+    import gerar_paginas as gp   # só os helpers de render (fontes das classes)
+
+    with report.phase("load"):
+        fonte = "\n".join((ROOT/f).read_text(encoding="utf-8") for f in FOLHAS)
+        regras = parse_css(fonte)
+    report.count("regras", len(regras))
+
+    tipos, manter = {}, set()
+    for tipo in TIPOS:
+        with report.phase("classes"):
+            usadas, topo = classes_do_tipo(tipo, gp)
+        with report.phase("prune"):
+            css = prune_css(regras, usadas)
+            critico = prune_css(regras, topo, safelist=False)
+        nome = f"{tipo}.{content_hash(css)[:10]}.css"
+        manter.add(nome)
+        with report.phase("write"):
+            writer.write(nome, css)
+        tipos[tipo] = {"href": f"/styles/dist/{nome}", "bytes": len(css.encode("utf-8")),
+                       "critico": critico}
+        report.count("folhas")
+        report.extra.setdefault("tipos", {})[tipo] = {
+            "bytes": tipos[tipo]["bytes"], "critico_bytes": len(critico.encode("utf-8"))}
+    report.extra["origem_bytes"] = len(fonte.encode("utf-8"))
+
+    prune_orfas(writer, manter)
+    writer.write(CSS_MANIFEST.name, json.dumps({"v": 1, "tipos": tipos}, ensure_ascii=False, indent=2) + "\n")
+    with report.phase("commit"):
+        writer.commit()
+    return tipos
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera CSS crítico e folhas podadas por tipo de página.")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    report = BuildReport("css")
+    writer = OutputWriter("css", CSS_DIST, "/styles/dist/", report, fsync=not args.sem_fsync)
+    if args.profile:
+        tipos = run_profiled("css", build, report, writer)
+    else:
+        tipos = build(report, writer)
+    report.save(args.relatorio)
+    resumo = ", ".join(f"{t} {d['bytes']:,} B" for t, d in tipos.items())
+    print(f"[ok] CSS por tipo ({resumo}; origem {report.extra['origem_bytes']:,} B) — {report.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+# Gera os derivados responsivos das fotos de assets/breeds/:
+# - dimensões reais de cada foto, lidas do cabeçalho (PNG, JPEG com EXIF,
+#   WebP, GIF), sem decodificar a imagem;
+# - variantes por largura (sem ampliar) em AVIF/WebP (se o Pillow suportar) e
+#   no formato do original, em assets/breeds/dist/<nome>.<hash>-<largura>.<ext>;
+# - o manifesto assets/breeds/dist/imagens.json, usado pelo gerar_paginas
+#   (width/height, srcset e sizes) e pelo gerar_breeds_cliente (miniaturas).
+# Dimensões e derivados ficam em cache pelo hash da foto
+# (.build-cache/imagens.json): só fotos novas ou alteradas são processadas.
+# Sem Pillow (pip install pillow) só as dimensões são geradas.
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import io
+import json
+import os
+import struct
+import time
+
+try:
+    from PIL import Image, ImageOps, features  # opcional: pip install pillow
+except ImportError:
+    Image = None
+
+from build_lib import (
+    ROOT, CACHE_DIR, IMG_FONTES, IMG_DIST, IMG_MANIFEST, content_hash, write_if_changed
+)
+from build_output import STAGING, stage_file, OutputWriter, add_output_args
+from build_report import BuildReport, add_report_args, run_profiled
+
+EXTENSOES = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+# Larguras das variantes (px); 96/192 atendem a miniatura do comparador
+LARGURAS = (96, 192, 320, 480, 640, 960, 1280, 1600)
+QUALIDADE = {"avif": 55, "webp": 80, "jpg": 82}
+CACHE_PATH = CACHE_DIR / "imagens.json"
+
+def _suporta(fmt):
+    try:
+        return Image is not None and features.check_module(fmt)
+    except ValueError:  # módulo desconhecido nesta versão do Pillow
+        return False
+
+MODERNOS = tuple(f for f in ("avif", "webp") if _suporta(f))
+
+# Mudou o código ou os formatos disponíveis: refaz tudo
+CODE_HASH = content_hash(
+    Path(__file__).read_bytes()
+    + repr((Image.__version__ if Image else None, MODERNOS)).encode()
+)
+
+# staging do OutputWriter("imagens", IMG_DIST): os workers gravam direto nele
+STAGE = IMG_DIST / STAGING / "imagens"
+
+# ===== Dimensões pelo cabeçalho =====
+def _exif_orientacao(seg: bytes) -> int:
+    """Tag Orientation (0x0112) do IFD0 de um segmento APP1 Exif; 1 se ausente."""
+    if not seg.startswith(b"Exif\0\0"):
+        return 1
+    tiff = seg[6:]
+    e = {b"II": "<", b"MM": ">"}.get(tiff[:2])
+    if e is None or len(tiff) < 8:
+        return 1
+    ifd = struct.unpack(e + "I", tiff[4:8])[0]
+    if ifd + 2 > len(tiff):
+        return 1
+    n = struct.unpack(e + "H", tiff[ifd:ifd+2])[0]
+    for i in range(n):
+        off = ifd + 2 + 12*i
+        if off + 12 > len(tiff):
+            break
+        if struct.unpack(e + "H", tiff[off:off+2])[0] == 0x0112:
+            return struct.unpack(e + "H", tiff[off+8:off+10])[0]
+    return 1
+
+def _jpeg_size(f):
+    orient = 1
+    f.seek(2)
+    while True:
+        b = f.read(1)
+        while b and b != b"\xff":
+            b = f.read(1)
+        while b == b"\xff":
+            b = f.read(1)
+        if not b:
+            raise ValueError("JPEG sem SOF")
+        m = b[0]
+        if m == 0x01 or 0xD0 <= m <= 0xD8:   # marcadores sem comprimento
+            continue
+        n = struct.unpack(">H", f.read(2))[0]
+        if m == 0xE1 and orient == 1:
+            orient = _exif_orientacao(f.read(n - 2))
+        elif 0xC0 <= m <= 0xCF and m not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">xHH", f.read(5))
+            # orientações 5–8 giram 90°: o navegador exibe w×h trocados
+            return (h, w) if 5 <= orient <= 8 else (w, h)
+        else:
+            f.seek(n - 2, 1)
+
+def image_size(path: Path):
+    """(largura, altura, formato) lidos do cabeçalho da imagem; ValueError se não reconhecido."""
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return (*struct.unpack(">II", head[16:24]), "png")
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return (*struct.unpack("<HH", head[6:10]), "gif")
+        if head.startswith(b"\xff\xd8"):
+            return (*_jpeg_size(f), "jpg")
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            chunk = head[12:16]
+            if chunk == b"VP8 ":
+                w, h = struct.unpack("<HH", head[26:30])
+                return w & 0x3FFF, h & 0x3FFF, "webp"
+            if chunk == b"VP8L":
+                b = int.from_bytes(head[21:25], "little")
+                return (b & 0x3FFF) + 1, ((b >> 14) & 0x3FFF) + 1, "webp"
+            if chunk == b"VP8X":
+                return (int.from_bytes(head[24:27], "little") + 1,
+                        int.from_bytes(head[27:30], "little") + 1, "webp")
+    raise ValueError(f"formato de imagem não reconhecido: {path.name}")
+
+# ===== Derivados =====
+def larguras_de(w):
+    """Larguras das variantes de uma foto de largura `w` (nunca amplia)."""
+    out = [l for l in LARGURAS if l < w]
+    if w <= LARGURAS[-1]:
+        out.append(w)
+    return out
+
+def _salvar(im, fmt):
+    buf = io.BytesIO()
+    if fmt == "jpg":
+        im.convert("RGB").save(buf, "JPEG", quality=QUALIDADE["jpg"], optimize=True, progressive=True)
+    elif fmt == "png":
+        im.save(buf, "PNG", optimize=True)
+    else:
+        im.save(buf, fmt.upper(), quality=QUALIDADE[fmt])
+    return buf.getvalue()
+
+def _derivar(rel, data, h, w, fmt):
+    """Grava as variantes no staging; ([[formato, [[largura, url], ...]], ...], gravados)."""
+    if Image is None or fmt == "gif":   # GIF pode ser animado: fica como está
+        return [], []
+    im = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if "transparency" in im.info or im.mode in ("LA", "PA") else "RGB")
+    stem = Path(rel).stem
+    tamanhos = [(l, im if l == im.width else im.resize((l, round(im.height * l / im.width)), Image.LANCZOS))
+                for l in larguras_de(w)]
+    variantes, gravados = [], []
+    for f in (*[m for m in MODERNOS if m != fmt], fmt):
+        lista = []
+        for l, v in tamanhos:
+            out = f"{stem}.{h[:10]}-{l}.{f}"
+            data_v = _salvar(v, f)
+            gravados.append((out, stage_file(IMG_DIST, STAGE, out, data_v), len(data_v)))
+            lista.append([l, f"/{IMG_DIST.relative_to(ROOT).as_posix()}/{out}"])
+        variantes.append([f, lista])
+    return variantes, gravados
+
+def _processar(job):
+    """
+    Worker do pool: (rel, hash, (w, h, formato, variantes, gravados, segundos));
+    o terceiro item é None se o conteúdo é o mesmo do cache.
+    """
+    rel, h_ant = job
+    t0 = time.perf_counter()
+    p = ROOT/rel
+    data = p.read_bytes()
+    h = content_hash(data)
+    if h == h_ant:   # tocada, mas com o mesmo conteúdo
+        return rel, h, None
+    w, alt, fmt = image_size(p)
+    variantes, gravados = _derivar(rel, data, h, w, fmt)
+    return rel, h, (w, alt, fmt, variantes, gravados, time.perf_counter() - t0)
+
+# ===== Cache e build =====
+class DimCache:
+    """
+    Dimensões e derivados por foto entre execuções:
+    {rel: [mtime_ns, tamanho, hash, w, h, formato, variantes]}.
+    Fotos com mtime/tamanho iguais nem são lidas; só as vistas na execução
+    atual são gravadas (fotos removidas saem).
+    """
+    def __init__(self, path=CACHE_PATH, enabled=True):
+        self.path = path
+        self.prev = {}
+        if enabled and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("code") == CODE_HASH:
+                    self.prev = data["fotos"]
+            except (ValueError, KeyError):
+                self.prev = {}
+        self.atual = {}
+
+    def save(self):
+        CACHE_DIR.mkdir(exist_ok=True)
+        write_if_changed(self.path, json.dumps(
+            {"code": CODE_HASH, "fotos": self.atual}, ensure_ascii=False, separators=(",", ":")))
+
+def fontes():
+    return sorted(p for p in IMG_FONTES.iterdir() if p.is_file() and p.suffix.lower() in EXTENSOES)
+
+def _completa(ent):
+    """Todas as variantes de uma entrada do cache ainda existem em disco."""
+    return all((ROOT/url.lstrip("/")).exists() for _, lista in ent[6] for _, url in lista)
+
+def prune_orfaos(writer, manter):
+    """Remove (no commit) derivados que nenhuma foto atual referencia."""
+    for p in IMG_DIST.iterdir() if IMG_DIST.exists() else ():
+        if p.is_file() and p != IMG_MANIFEST and p.name not in manter:
+            writer.delete(p.name)
+
+def build(report, writer, jobs=0, completo=False):
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    cache = DimCache(enabled=not completo)
+
+    pendentes = []
+    with report.phase("stat"):
+        for p in fontes():
+            rel = p.relative_to(ROOT).as_posix()
+            st = p.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+            ent = cache.prev.get(rel)
+            ok = ent is not None and _completa(ent)
+            if ok and ent[:2] == stamp:
+                cache.atual[rel] = ent
+                report.count("puladas")
+            else:
+                pendentes.append((rel, ent[2] if ok else None))
+            report.count("fotos")
+
+    with report.phase("derivar"):
+        if jobs > 1 and len(pendentes) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                res = list(pool.map(_processar, pendentes))
+        else:
+            res = [_processar(job) for job in pendentes]
+    for rel, h, novo in res:
+        st = (ROOT/rel).stat()
+        if novo is None:
+            cache.atual[rel] = [st.st_mtime_ns, st.st_size, *cache.prev[rel][2:]]
+            report.count("puladas")
+            continue
+        w, alt, fmt, variantes, gravados, secs = novo
+        for out, mudou, nbytes in gravados:
+            writer.record(out, mudou, nbytes)
+        cache.atual[rel] = [st.st_mtime_ns, st.st_size, h, w, alt, fmt, variantes]
+        report.count("processadas")
+        report.count("variantes", len(gravados))
+        report.slow(rel, secs)
+
+    imagens, manter = {}, set()
+    for rel, (_m, _t, _h, w, alt, _fmt, variantes) in sorted(cache.atual.items()):
+        imagens[f"/{rel}"] = {"w": w, "h": alt, "variantes": variantes}
+        manter.update(url.rsplit("/", 1)[-1] for _, lista in variantes for _, url in lista)
+    prune_orfaos(writer, manter)
+    writer.write(IMG_MANIFEST.name, json.dumps({"v": 1, "imagens": imagens}, ensure_ascii=False, indent=2) + "\n")
+    with report.phase("commit"):
+        writer.commit()
+    cache.save()
+    report.extra["formatos"] = [*MODERNOS, "original"] if Image else []
+    return imagens
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera dimensões e derivados responsivos das fotos das raças.")
+    ap.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                    help="processos para gerar os derivados (padrão: 0 = nº de CPUs)")
+    ap.add_argument("--completo", action="store_true",
+                    help="reprocessa todas as fotos, ignorando o cache")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    report = BuildReport("imagens")
+    writer = OutputWriter("imagens", IMG_DIST, "/assets/breeds/dist/", report, fsync=not args.sem_fsync)
+    if args.profile:
+        imagens = run_profiled("imagens", build, report, writer, args.jobs, args.completo)
+    else:
+        imagens = build(report, writer, args.jobs, args.completo)
+    report.save(args.relatorio)
+    extra = "" if Image else " (Pillow indisponível: só dimensões)"
+    print(f"[ok] Imagens: {len(imagens)} fotos{extra} — {report.summary()}")
+
+if __name__ == "__main__":
+    main()
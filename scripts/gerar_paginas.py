@@ -2,14 +2,29 @@
 # (Home/Lista/Detalhe/Comparar/Sobre/Guia Responsável/
 # Acessibilidade/Privacidade/Sitemap/404)
 
-from string import Template
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import heapq
 import json
+import math
+import os
+import sys
+import time
 
 from build_lib import (
-    ROOT, load_all, load_aliases_map, slugify, attr, join_pt,
-    parse_minmax, human_porte, score_atividade, score_grooming, score_clima,
-    get_aliases_for_breed
+    ROOT, load_site_rules, catalog_path, iter_racas, iter_batches, load_aliases_map, breed_slug, attr, join_pt,
+    slugify, parse_minmax, human_porte, PORTES, score_all, score_row, scores_from_row, client_record, ScoringContext, perfil_clima_label,
+    BreedIndex, build_search_index, content_hash, json_hash, BuildManifest,
+    CatalogError, compile_validator, validate_racas, validate_catalog, CompiledTemplate,
+    IMG_MANIFEST, load_img_manifest, img_fontes, THUMB_MAX
 )
+from build_output import OutputWriter, stage_file, add_output_args
+from build_sitemap import LastmodStore, SitemapWriter
+from build_report import BuildReport, add_report_args, run_profiled
+from build_css import CSS_MANIFEST, load_css_manifest
+from build_minify import HtmlMinifier
 
 # ===== JSON-LD helpers =====
 def jsonld_breadcrumb(nome, url, BASE):
@@ -74,55 +89,159 @@ def jsonld_breed(d, url):
         "additionalProperty": props
     }, ensure_ascii=False)
 
+# ===== Header: aria-current por caminho =====
+def mark_current(header_html: str, base_url: str, current_path: str) -> str:
+    """
+    Marca aria-current=\"page\" no link do header cujo href corresponde ao caminho informado.
+    Ex.: current_path='/racas/' marca o item 'Raças'.
+    """
+    base = (base_url or "").rstrip("/")
+    # normaliza caminho (mantém '/' para home)
+    path = current_path if current_path == "/" else current_path.rstrip("/") + "/"
+    target = f'href="{base}{path}"'
+    return header_html.replace(target, f'{target} aria-current="page"')
+
+def header_for(current_path: str) -> str:
+    """Header com aria-current; as variantes são calculadas uma vez por caminho."""
+    h = HEADER_VARIANTES.get(current_path)
+    if h is None:
+        h = HEADER_VARIANTES[current_path] = mark_current(SITE_HEADER, BASE, current_path)
+    return h
+
 # ===== Carregamento de dados e templates =====
-site, rules, racas = load_all()
-BASE = site.get("base_url", "")
-
-tpl_head = Template((ROOT/"templates/head-base.html").read_text(encoding="utf-8"))
-tpl_hdr  = Template((ROOT/"templates/header.html").read_text(encoding="utf-8"))
-tpl_ftr  = Template((ROOT/"templates/footer.html").read_text(encoding="utf-8"))
-
-HEAD_BASE   = tpl_head.safe_substitute(baseUrl=BASE)
-SITE_HEADER = tpl_hdr.safe_substitute(baseUrl=BASE)
-SITE_FOOTER = tpl_ftr.safe_substitute(baseUrl=BASE)
-
-# Templates de páginas
-tpl_home    = Template((ROOT/"templates/index.html").read_text(encoding="utf-8"))
-tpl_list    = Template((ROOT/"templates/lista-racas.html").read_text(encoding="utf-8"))
-tpl_detail  = Template((ROOT/"templates/detalhe-raca.html").read_text(encoding="utf-8"))
-tpl_compare = Template((ROOT/"templates/comparar.html").read_text(encoding="utf-8"))
-tpl_sobre   = Template((ROOT/"templates/sobre.html").read_text(encoding="utf-8"))
-tpl_guia    = Template((ROOT/"templates/guia-responsavel.html").read_text(encoding="utf-8"))
-tpl_a11y    = Template((ROOT/"templates/acessibilidade.html").read_text(encoding="utf-8"))
-tpl_priv    = Template((ROOT/"templates/privacidade.html").read_text(encoding="utf-8"))
-tpl_404     = Template((ROOT/"templates/404.html").read_text(encoding="utf-8"))
-tpl_map     = Template((ROOT/"templates/sitemap.html").read_text(encoding="utf-8"))
+# O catálogo de raças não é carregado aqui: build() o percorre em streaming.
+# Estado do gerador (site, regras, aliases, templates e diretório de saída);
+# configure() o (re)define — no import, em build() e no modo watch.
+PARTIALS = ("head-base.html", "header.html", "footer.html")
+TEMPLATES = PARTIALS + (
+    "index.html", "lista-racas.html", "detalhe-raca.html", "comparar.html", "sobre.html",
+    "guia-responsavel.html", "acessibilidade.html", "privacidade.html", "404.html", "sitemap.html",
+    "comparar-par.html",
+)
+TPL = {}       # nome do arquivo -> CompiledTemplate
+TPL_HASH = {}  # nome do arquivo -> hash do conteúdo
+
+def load_templates(nomes=TEMPLATES):
+    """(Re)lê templates de templates/ e recompõe os parciais."""
+    for nome in nomes:
+        text = (ROOT/"templates"/nome).read_text(encoding="utf-8")
+        TPL[nome] = CompiledTemplate(text)
+        TPL_HASH[nome] = content_hash(text)
+    compose_partials()
+
+# Tipos de página do CSS (scripts/gerar_css.py): cada um tem CSS crítico
+# embutido no head e uma folha podada, ligada antes do <main> (${CSS_PAGINA}).
+CSS_TIPOS = ("detalhe", "lista", "comparar", "estatica")
+CSS_FOLHAS = ("tokens.css", "base.css", "ui.css")
+
+def css_head(tipo):
+    c = CSS.get(tipo)
+    if not c:   # sem styles/dist/css-manifest.json: as folhas completas
+        return "\n".join(f'<link rel="stylesheet" href="{BASE}/styles/{n}" />' for n in CSS_FOLHAS)
+    return (f"<style>{c['critico']}</style>\n"
+            f'<link rel="preload" as="style" href="{BASE}{c["href"]}" />')
+
+def css_pagina(tipo):
+    c = CSS.get(tipo)
+    return f'<link rel="stylesheet" href="{BASE}{c["href"]}" />\n    ' if c else ""
+
+def compose_partials():
+    """Parciais com a base_url já aplicada (dependem dos templates, do site e do CSS)."""
+    global HEAD_BASES, CSS_PAGINAS, SITE_HEADER, SITE_FOOTER, PARTIALS_HASH, HEADER_VARIANTES
+    HEAD_BASES  = {t: TPL["head-base.html"].safe_substitute(baseUrl=BASE, CSS_HEAD=css_head(t)) for t in CSS_TIPOS}
+    CSS_PAGINAS = {t: css_pagina(t) for t in CSS_TIPOS}
+    SITE_HEADER = TPL["header.html"].safe_substitute(baseUrl=BASE)
+    SITE_FOOTER = TPL["footer.html"].safe_substitute(baseUrl=BASE)
+    PARTIALS_HASH = content_hash("".join(TPL_HASH[n] for n in PARTIALS) + json_hash(CSS))
+    # header com aria-current para cada item do nav (e a home)
+    HEADER_VARIANTES = {}
+    for path in ["/"] + [it.get("href") for it in site.get("nav", []) if it.get("href")]:
+        header_for(path)
+
+def configure(site_, rules_, aliases=None, outdir=ROOT, stage=None, minify=False):
+    """
+    Define site, regras, aliases (None = data/aliases_oficiais.json), saída,
+    staging do OutputWriter (onde os workers gravam as páginas de raça) e se
+    o HTML gravado é minificado.
+    Templates são lidos só na primeira vez; após editá-los, chame load_templates().
+    """
+    global site, rules, BASE, SCORING, aliases_map, INDEX, SITE_HASH, RULES_HASH, OUT, STAGE, CSS, IMAGENS, MINIFY
+    site, rules = site_, rules_
+    MINIFY = minify
+    CSS = load_css_manifest()
+    IMAGENS = load_img_manifest()
+    BASE = site.get("base_url", "")
+    SCORING = ScoringContext(rules)
+    aliases_map = load_aliases_map() if aliases is None else aliases
+    INDEX = BreedIndex(aliases_map)
+    SITE_HASH  = json_hash(site)
+    RULES_HASH = json_hash(rules)
+    OUT = Path(outdir)
+    STAGE = stage
+    if TPL:
+        compose_partials()
+    else:
+        load_templates()
+
+configure(*load_site_rules())
 
 # ===== Helpers de render =====
-aliases_map = load_aliases_map()
+FOTO_PADRAO = "/assets/breeds/_placeholder.jpg"
+# Largura exibida da foto em cada uso (atributo sizes; ver .breed-grid e .breed__layout)
+IMG_SIZES = {
+  "card":    "(min-width: 75rem) 23rem, (min-width: 64rem) 33vw, (min-width: 48rem) 50vw, 100vw",
+  "detalhe": "(min-width: 75rem) 35rem, (min-width: 48rem) 50vw, 100vw",
+  "thumb":   "96px",
+}
+
+def foto_info(foto):
+    """Entrada da foto no manifesto de imagens (dimensões reais e derivados) ou None."""
+    return IMAGENS.get(foto)
+
+def foto_dims(foto, w, h):
+    """Dimensões reais da foto (scripts/gerar_imagens.py); senão (w, h)."""
+    info = IMAGENS.get(foto)
+    return (info["w"], info["h"]) if info else (w, h)
+
+def foto_html(foto, uso, resto):
+    """
+    <img> da foto; `resto` são os atributos após o src, com o fecho da tag.
+    Com derivados, ganha srcset/sizes no formato do original e um <source>
+    por formato moderno, dentro de um <picture>.
+    """
+    src = f"{BASE}{foto}" if foto.startswith("/") else foto
+    fontes = img_fontes(IMAGENS.get(foto), BASE, THUMB_MAX if uso == "thumb" else None)
+    if not fontes:
+        return f"<img src='{src}' {resto}"
+    *modernos, (_, srcset) = fontes
+    sizes = IMG_SIZES[uso]
+    return ("<picture>"
+            + "".join(f"<source type='{t}' srcset='{s}' sizes='{sizes}'>" for t, s in modernos)
+            + f"<img src='{src}' srcset='{srcset}' sizes='{sizes}' {resto}</picture>")
 
 def render_card(r):
     """Card da listagem — compatível com o CSS 'A2 teal' e com main.js (filtros)."""
-    slug  = r.get("slug") or slugify(r["nome"])
+    slug  = INDEX.slug(r)
     grupo = r["atributos"].get("fci_grupo")
     porte = (r["atributos"].get("porte") or "").lower()
-    foto  = r.get("foto","") or "/assets/breeds/_placeholder.jpg"
-    if foto.startswith("/"):
-        foto = f"{BASE}{foto}"
+    foto  = r.get("foto","") or FOTO_PADRAO
+    w, h  = foto_dims(foto, 480, 320)
+    img   = foto_html(foto, "card", f"alt='' loading='lazy' decoding='async' width='{w}' height='{h}' />")
 
-    aliases = get_aliases_for_breed(r, aliases_map)
+    aliases = INDEX.aliases_for(slug)
     alias_attr = " | ".join(a for a in aliases if a)
 
     badge = f"Grupo {grupo}" if grupo else "—"
 
     return (
       f"<li class='breed-card' "
+      f" data-slug='{attr(slug)}'"
       f" data-name='{attr(r['nome'])}'"
       f" data-porte='{attr(porte)}'"
       f" data-grupo='{attr(str(grupo or ''))}'"
       f" data-alias='{attr(alias_attr)}'>"
       f"  <div class='breed-card__media'>"
-      f"    <img src='{foto}' alt='' loading='lazy' decoding='async' width='480' height='320' />"
+      f"    {img}"
       f"  </div>"
       f"  <div class='breed-card__body'>"
       f"    <h3 class='breed-card__title'><a href='{BASE}/racas/{slug}.html'>{attr(r['nome'])}</a></h3>"
@@ -163,20 +282,34 @@ def render_pop_block(r):
         )
     return "<section class='pop'><h2 class='visually-hidden'>Popularidade</h2><div class='pop__bars'>" + "".join(rows) + "</div></section>"
 
-def _top5_by(key):
-    # key: "br" ou "global"
-    usable = []
-    for r in racas:
-        v = (r.get("popularidade") or {}).get(key)
-        if isinstance(v, (int, float)):
-            usable.append((r, int(max(0, min(100, v)))))
-    usable.sort(key=lambda t: t[1], reverse=True)
-    return usable[:5]
+class Top5:
+    """Top 5 por popularidade (key: "br" ou "global") acumulado em streaming."""
+
+    def __init__(self, key):
+        self.key = key
+        self.heap = []   # (valor, -ordem, registro) — mínimo no topo
+        self.seq = 0
+
+    def push(self, r):
+        v = (r.get("popularidade") or {}).get(self.key)
+        self.seq += 1
+        if not isinstance(v, (int, float)):
+            return
+        v = int(max(0, min(100, v)))
+        # empate mantém o primeiro do catálogo (igual a sort estável): um
+        # registro posterior só entra com valor estritamente maior
+        if len(self.heap) < 5:
+            heapq.heappush(self.heap, (v, -self.seq, {"slug": INDEX.slug(r), "nome": r["nome"]}))
+        elif v > self.heap[0][0]:
+            heapq.heapreplace(self.heap, (v, -self.seq, {"slug": INDEX.slug(r), "nome": r["nome"]}))
+
+    def items(self):
+        return [(r, v) for v, _, r in sorted(self.heap, key=lambda t: (-t[0], -t[1]))]
 
 def _rank_items_html(items):
     out = []
     for r, v in items:
-        slug = r.get("slug") or slugify(r["nome"])
+        slug = r["slug"]
         out.append(
             f"<li class='rank'>"
             f"  <a href='{BASE}/racas/{slug}.html'>{attr(r['nome'])}</a>"
@@ -186,22 +319,16 @@ def _rank_items_html(items):
         )
     return '\n'.join(out)
 
-br_top5 = _rank_items_html(_top5_by("br"))
-gl_top5 = _rank_items_html(_top5_by("global"))
-
 def render_foto_block(r):
-    src = r.get("foto","") or "/assets/breeds/_placeholder.jpg"
-    if src.startswith("/"):
-        src = f"{BASE}{src}"
-    w = r.get("foto_w") or 640
-    h = r.get("foto_h") or 426
+    foto = r.get("foto","") or FOTO_PADRAO
+    w, h = foto_dims(foto, r.get("foto_w") or 640, r.get("foto_h") or 426)
     credito = r.get("foto_credito", "")
     cap = f"<figcaption class='photo__cap'>{attr(credito)}</figcaption>" if credito else ""
     return (
       "<section class='breed__photo' aria-labelledby='foto-title'>"
       "<h2 id='foto-title' class='visually-hidden'>Foto da raça</h2>"
-      f"<img src='{src}' alt='Foto ilustrativa de {attr(r['nome'])}' loading='lazy' width='{w}' height='{h}' />"
-      f"{cap}</section>"
+      + foto_html(foto, "detalhe", f"alt='Foto ilustrativa de {attr(r['nome'])}' loading='lazy' width='{w}' height='{h}' />")
+      + f"{cap}</section>"
     )
 
 def fmt_mf(macho_txt, femea_txt, unidade):
@@ -209,26 +336,63 @@ def fmt_mf(macho_txt, femea_txt, unidade):
     f = femea_txt or "—"
     return f"{m} <span class='sex sex--m' aria-hidden='true'>♂</span> / {f} <span class='sex sex--f' aria-hidden='true'>♀</span> {unidade}"
 
-def mark_current(header_html: str, base_url: str, current_path: str) -> str:
-    """
-    Marca aria-current=\"page\" no link do header cujo href corresponde ao caminho informado.
-    Ex.: current_path='/racas/' marca o item 'Raças'.
-    """
-    base = (base_url or "").rstrip("/")
-    # normaliza caminho (mantém '/' para home)
-    path = current_path if current_path == "/" else current_path.rstrip("/") + "/"
-    target = f'href="{base}{path}"'
-    return header_html.replace(target, f'{target} aria-current="page"')
+# ===== Build incremental: chaves de entrada por página =====
+# Cada saída depende do código do gerador, do site.json, dos parciais e do
+# seu template; páginas de raça dependem também do registro e dos aliases.
+CODE_HASH = content_hash(
+    b"".join((ROOT/"scripts"/f).read_bytes() for f in ("gerar_paginas.py", "build_lib.py", "build_minify.py"))
+)
 
-def header_for(current_path: str) -> str:
-    return mark_current(SITE_HEADER, BASE, current_path)
+def page_key(tpl_nome, *deps):
+    # minificar muda os bytes: entra na chave (sem ela, as chaves não mudam)
+    minify = ("minify",) if MINIFY else ()
+    return content_hash("|".join((CODE_HASH, SITE_HASH, PARTIALS_HASH, TPL_HASH[tpl_nome], *deps, *minify)))
+
+def breed_key(r):
+    """Chave da página de detalhe: registro + aliases + regras + derivados da foto."""
+    return page_key("detalhe-raca.html", RULES_HASH,
+                    json_hash(r), INDEX.aliases_hash(INDEX.slug(r)),
+                    json_hash(foto_info(r.get("foto") or FOTO_PADRAO)))
+
+def card_record(r):
+    """Projeção do registro com somente os campos usados em render_card."""
+    at = r.get("atributos", {})
+    return {"slug": r.get("slug"), "nome": r["nome"], "foto": r.get("foto", ""),
+            "origem": r.get("origem", "—"),
+            "atributos": {"fci_grupo": at.get("fci_grupo"), "porte": at.get("porte")}}
+
+def card_inputs(c):
+    """Entradas do card (a partir de card_record), incluindo os aliases e a foto."""
+    return [c, INDEX.aliases_of(c), foto_info(c["foto"] or FOTO_PADRAO)]
+
+def data_key(*deps):
+    """Chave de saídas de dados (sem template)."""
+    return content_hash("|".join((CODE_HASH, *deps)))
+
+def home_inputs(r):
+    """Somente os campos usados no top 5 e no datalist da home."""
+    return [r.get("slug"), r["nome"], r.get("popularidade")]
 
 # ===== Geração: páginas por raça =====
-out_breeds = ROOT / "racas"
-out_breeds.mkdir(exist_ok=True)
+def detail_url(r):
+    return f"{BASE}/racas/{INDEX.slug(r)}.html"
+
+def detail_jsonld(r):
+    """Blocos JSON-LD da página de raça."""
+    url = detail_url(r)
+    return dict(jsonld_breadcrumb=jsonld_breadcrumb(r["nome"], url, BASE),
+                jsonld_breed=jsonld_breed(r, url))
 
-for r in racas:
-    slug = slugify(r["nome"])
+def detail_vars(r, row=None, ld=None):
+    """
+    Variáveis do template de detalhe; `row` é a linha de score_all e `ld` o
+    resultado de detail_jsonld (ambos calculados aqui se ausentes).
+    """
+    if row is None:
+        row = score_row(score_all([r], SCORING), 0)
+    if ld is None:
+        ld = detail_jsonld(r)
+    slug = INDEX.slug(r)
     url  = f"{BASE}/racas/{slug}.html"
 
     # textos e métricas
@@ -239,9 +403,8 @@ for r in racas:
     peso_texto_html = fmt_mf(peso.get("macho"), peso.get("femea"), "kg")
     vida_texto = f"{r['medidas'].get('expectativa_anos','—')} anos"
 
-    atividade_val, detA_txt, _factsA = score_atividade(r, rules)
-    grooming_val,  detG_txt, _factsG = score_grooming(r, rules)
-    clima_val,     detC_txt, _factsC = score_clima(r, rules, atividade_val)
+    (atividade_val, detA_txt, _factsA), (grooming_val, detG_txt, _factsG), \
+        (clima_val, detC_txt, _factsC) = scores_from_row(r, row, SCORING)
 
     grupo = r["atributos"].get("fci_grupo")
     fci_grupo_txt = f"Grupo {grupo}" if grupo else "—"
@@ -250,11 +413,11 @@ for r in racas:
     porte_label = human_porte(porte_slug)
 
     # AKA somente texto
-    aliases = get_aliases_for_breed(r, aliases_map)
+    aliases = INDEX.aliases_for(slug)
     aka_html = attr(join_pt(aliases)) if aliases else ""
 
-    page_html = tpl_detail.safe_substitute(
-        HEAD_BASE=HEAD_BASE, baseUrl=BASE, url=url, slug=slug,
+    return dict(
+        HEAD_BASE=HEAD_BASES["detalhe"], CSS_PAGINA=CSS_PAGINAS["detalhe"], baseUrl=BASE, url=url, slug=slug,
         SITE_HEADER=header_for("/racas/"), SITE_FOOTER=SITE_FOOTER,
         nome=r["nome"], lead=lead,
         origem=r.get("origem","—"),
@@ -267,76 +430,807 @@ for r in racas:
         aka_html=aka_html,
         POPULARIDADE_BLOCK=render_pop_block(r),
         FOTO_BLOCK=render_foto_block(r),
-        jsonld_breadcrumb=jsonld_breadcrumb(r["nome"], url, BASE),
-        jsonld_breed=jsonld_breed(r, url)
+        **ld
     )
-    (out_breeds/f"{slug}.html").write_text(page_html, encoding="utf-8")
-
-# ===== Página: /racas/index.html =====
-cards_html = "\n".join(render_card(r) for r in sorted(racas, key=lambda x: x["nome"]))
-html_list = tpl_list.safe_substitute(
-    HEAD_BASE=HEAD_BASE, baseUrl=BASE,
-    SITE_HEADER=header_for("/racas/"), SITE_FOOTER=SITE_FOOTER,
-    LISTA_RACAS_ITEMS=cards_html,
-    jsonld_breadcrumb_list=jsonld_breadcrumb_list(BASE)
-)
-(out_breeds/"index.html").write_text(html_list, encoding="utf-8")
+
+def page_bytes(trechos):
+    """
+    (bytes gravados, bytes sem minificar) de uma página dada em trechos
+    (ex.: CompiledTemplate.parts_for); com MINIFY os trechos passam em
+    streaming pelo HtmlMinifier, sem montar a página inteira antes.
+    """
+    if not MINIFY:
+        data = "".join(trechos).encode("utf-8")
+        return data, len(data)
+    m = HtmlMinifier()
+    data = m.minify(trechos).encode("utf-8")
+    return data, m.entrada
+
+def render_detail(r, row=None):
+    return TPL["detalhe-raca.html"].safe_substitute(detail_vars(r, row))
+
+def _write_detail(item):
+    """
+    Worker do pool: renderiza uma página de raça e a grava no staging se mudou.
+    Retorna (escreveu, bytes, tempos, bytes sem minificar) com parede/CPU de
+    jsonld, render (inclui a minificação) e write.
+    """
+    rel, r, row = item
+    w0, c0 = time.perf_counter(), time.process_time()
+    ld = detail_jsonld(r)
+    w1, c1 = time.perf_counter(), time.process_time()
+    data, antes = page_bytes(TPL["detalhe-raca.html"].parts_for(detail_vars(r, row, ld)))
+    w2, c2 = time.perf_counter(), time.process_time()
+    wrote = stage_file(OUT, STAGE, rel, data)
+    w3, c3 = time.perf_counter(), time.process_time()
+    tempos = (w1 - w0, c1 - c0, w2 - w1, c2 - c1, w3 - w2, c3 - c2)
+    return wrote, len(data), tempos, antes
+
+def write_details(items, pool=None, jobs=1, worker=_write_detail):
+    """
+    Renderiza/grava as páginas de raça (ou, com `worker`, outras páginas por
+    item); com um pool distribui em lotes entre os processos. Cada página
+    depende só das suas entradas, então a saída é idêntica byte a byte para
+    qualquer número de workers.
+    """
+    if pool is None or len(items) < 2:
+        return [worker(it) for it in items]
+    chunksize = max(1, len(items) // (jobs * 4))
+    return list(pool.map(worker, items, chunksize=chunksize))
+
+# ===== Páginas: /racas/ (paginada) e facetas /racas/porte/<p>/, /racas/grupo/<n>/ =====
+LIST_PAGE_SIZE = 48
+
+def list_dir(facet=None, value=None, page=1):
+    """Diretório (relativo ao site) de uma página da listagem."""
+    d = "racas/" + (f"{facet}/{value}/" if facet else "")
+    return d + (f"pagina/{page}/" if page > 1 else "")
+
+def list_buckets(cards):
+    """
+    Uma passada pelo catálogo ordenado por nome: cada card vai para a lista
+    geral e para as facetas de porte e de grupo FCI. Todas as facetas
+    conhecidas existem (mesmo vazias), para que os links sejam estáveis.
+    Retorna {(faceta, valor): [cards]}.
+    """
+    buckets = {(None, None): []}
+    buckets.update({("porte", p): [] for p in PORTES})
+    buckets.update({("grupo", g): [] for g in sorted(rules["fci_grupos"], key=int)})
+    for c in sorted(cards, key=lambda x: x["nome"]):
+        at = c["atributos"]
+        buckets[(None, None)].append(c)
+        porte = (at.get("porte") or "").lower()
+        if porte:
+            buckets.setdefault(("porte", porte), []).append(c)
+        grupo = at.get("fci_grupo")
+        if grupo:
+            buckets.setdefault(("grupo", str(grupo)), []).append(c)
+    return buckets
+
+def render_options_grupo(buckets):
+    """<option> do filtro de grupo FCI, com a contagem de raças."""
+    out = []
+    for (facet, g), bucket in buckets.items():
+        if facet == "grupo":
+            out.append(f"<option value='{attr(g)}'>Grupo {attr(g)} ({len(bucket)})</option>")
+    return "\n".join(out)
+
+def facet_label(facet, value):
+    if facet == "porte":
+        return f"Porte {human_porte(value)}"
+    if facet == "grupo":
+        return f"Grupo {value}"
+    return ""
+
+def render_pagination(facet, value, page, pages):
+    """(links rel=prev/next para o <head>, <nav> de paginação)."""
+    if pages <= 1:
+        return "", ""
+    head, nav = [], []
+    if page > 1:
+        prev = f"{BASE}/{list_dir(facet, value, page - 1)}"
+        head.append(f"<link rel='prev' href='{prev}' />")
+        nav.append(f"<a class='btn btn--ghost' rel='prev' href='{prev}'>← Anterior</a>")
+    nav.append(f"<span class='pagination__status'>Página {page} de {pages}</span>")
+    if page < pages:
+        nxt = f"{BASE}/{list_dir(facet, value, page + 1)}"
+        head.append(f"<link rel='next' href='{nxt}' />")
+        nav.append(f"<a class='btn btn--ghost' rel='next' href='{nxt}'>Próxima →</a>")
+    return ("".join(head),
+            "<nav class='pagination' aria-label='Paginação'>" + "".join(nav) + "</nav>")
+
+def render_list(cards, facet=None, value=None, page=1, pages=1, options_grupo=""):
+    """Uma página da listagem; `cards` já ordenados por nome."""
+    if cards:
+        cards_html = "\n".join(render_card(c) for c in cards)
+    else:
+        cards_html = "<li class='meta-note'>Nenhuma raça cadastrada neste filtro.</li>"
+    label = facet_label(facet, value)
+    titulo = f"Raças — {label}" if label else "Raças"
+    titulo_pagina = f"Lista de Raças — {label}" if label else "Lista de Raças"
+    if page > 1:
+        titulo_pagina += f" — página {page}"
+    pag_head, pag_nav = render_pagination(facet, value, page, pages)
+    return TPL["lista-racas.html"].safe_substitute(
+        HEAD_BASE=HEAD_BASES["lista"], CSS_PAGINA=CSS_PAGINAS["lista"], baseUrl=BASE,
+        SITE_HEADER=header_for("/racas/"), SITE_FOOTER=SITE_FOOTER,
+        titulo=titulo, titulo_pagina=titulo_pagina,
+        canonical=f"{BASE}/{list_dir(facet, value, page)}",
+        facet=facet or "", facet_value=value or "",
+        PAGINACAO_HEAD=pag_head, PAGINACAO_NAV=pag_nav,
+        OPTIONS_GRUPO=options_grupo,
+        LISTA_RACAS_ITEMS=cards_html,
+        jsonld_breadcrumb_list=jsonld_breadcrumb_list(BASE)
+    )
+
+def list_pages(cards, per_page):
+    """(rel, render) de todas as páginas da listagem e das facetas."""
+    buckets = list_buckets(cards)
+    options_grupo = render_options_grupo(buckets)
+    for (facet, value), bucket in buckets.items():
+        pages = max(1, math.ceil(len(bucket) / per_page))
+        for page in range(1, pages + 1):
+            chunk = bucket[(page - 1) * per_page: page * per_page]
+            yield (list_dir(facet, value, page) + "index.html",
+                   lambda chunk=chunk, facet=facet, value=value, page=page, pages=pages:
+                       render_list(chunk, facet, value, page, pages, options_grupo))
+
+def prune_list_pages(keep, writer):
+    """Remove (no commit) páginas de listagem/faceta que não existem mais (ex.: menos páginas)."""
+    racas_dir = OUT/"racas"
+    for pat in ("pagina/*/index.html", "porte/**/index.html", "grupo/**/index.html"):
+        for p in racas_dir.glob(pat):
+            rel = p.relative_to(OUT).as_posix()
+            if rel not in keep:
+                writer.delete(rel)
+
+# ===== Índice de busca: /data/search-index.json =====
+def render_search_index(cards):
+    entries = []
+    for c in sorted(cards, key=lambda x: x["nome"]):
+        at = c["atributos"]
+        entries.append((INDEX.slug(c), c["nome"], INDEX.aliases_of(c),
+                        (at.get("porte") or "").lower(), at.get("fci_grupo")))
+    return json.dumps(build_search_index(entries), ensure_ascii=False, separators=(",", ":"))
 
 # ===== Página: /comparar/index.html =====
-out_cmp = ROOT / "comparar"
-out_cmp.mkdir(exist_ok=True)
-html_cmp = tpl_compare.safe_substitute(
-    HEAD_BASE=HEAD_BASE, baseUrl=BASE,
-    SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER,
-    jsonld_breadcrumb_compare=jsonld_breadcrumb_compare(BASE)
+def render_perfil_clima():
+    """
+    Seletor do perfil de clima do comparador (um option por perfil do rules.json,
+    na ordem de clima.perfis dos registros); com um perfil só, nada.
+    """
+    if len(SCORING.perfis_clima) < 2:
+        return ""
+    opts = "".join(
+        f"<option value='{p}'{' selected' if p == SCORING.perfil else ''}>{attr(perfil_clima_label(p))}</option>"
+        for p in SCORING.perfis_clima
+    )
+    return ("<div class='field cmp-perfil'><label for='perfil-clima'>Perfil de clima</label>"
+            f"<select id='perfil-clima' class='input select'>{opts}</select></div>")
+
+def render_compare():
+    return TPL["comparar.html"].safe_substitute(
+        HEAD_BASE=HEAD_BASES["comparar"], CSS_PAGINA=CSS_PAGINAS["comparar"], baseUrl=BASE,
+        SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER, PERFIL_CLIMA=render_perfil_clima(),
+        jsonld_breadcrumb_compare=jsonld_breadcrumb_compare(BASE)
+    )
+
+# ===== Páginas: /comparar/<a>-vs-<b>/ (pares populares pré-renderizados) =====
+# Os K pares mais populares entre raças do mesmo grupo FCI ou do mesmo porte
+# ganham uma página estática, com as seções do compare.js já no HTML.
+COMPARE_TOP_K = 50
+
+def _top_somas(vals, k):
+    """
+    Índices (i, j), i < j, das k maiores somas vals[i] + vals[j] de uma lista
+    em ordem decrescente — fronteira em heap, O(k log k) em vez de todos os pares.
+    """
+    if len(vals) < 2:
+        return []
+    fila, vistos, out = [(-(vals[0] + vals[1]), 0, 1)], {(0, 1)}, []
+    while fila and len(out) < k:
+        _, i, j = heapq.heappop(fila)
+        out.append((i, j))
+        for a, b in ((i, j + 1), (i + 1, j)):
+            if a < b < len(vals) and (a, b) not in vistos:
+                vistos.add((a, b))
+                heapq.heappush(fila, (-(vals[a] + vals[b]), a, b))
+    return out
+
+class TopPares:
+    """
+    Seleção em streaming dos K pares mais populares (soma da popularidade "br",
+    senão "global") que compartilham grupo FCI ou porte. Cada grupo/porte
+    guarda só as K+1 raças mais populares (heap, como o Top5) — nenhum par do
+    top K usa uma raça fora delas — e os K melhores pares de cada um saem de
+    _top_somas: O(n log K + buckets·K log K), sem comparar todos contra todos.
+    """
+
+    def __init__(self, k):
+        self.k = max(0, k)
+        self.m = self.k + 1
+        self.buckets = {}   # ("grupo"|"porte", valor) -> heap (pop, -ordem, registro)
+        self.seq = 0
+
+    def push(self, r):
+        self.seq += 1
+        if not self.k:
+            return
+        pop = r.get("popularidade") or {}
+        v = pop.get("br")
+        if not isinstance(v, (int, float)):
+            v = pop.get("global")
+        if not isinstance(v, (int, float)):
+            return
+        at = r.get("atributos", {})
+        grupo = at.get("fci_grupo")
+        porte = (at.get("porte") or "").lower()
+        ent = (int(max(0, min(100, v))), -self.seq, r)
+        for b in ((("grupo", str(grupo)),) if grupo else ()) + ((("porte", porte),) if porte else ()):
+            heap = self.buckets.setdefault(b, [])
+            if len(heap) < self.m:
+                heapq.heappush(heap, ent)
+            elif ent[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, ent)
+
+    def pares(self):
+        """[(ra, rb)] por popularidade (soma; empate: mesmo grupo e porte, depois slugs)."""
+        cand = {}
+        for heap in self.buckets.values():
+            ents = sorted(heap, key=lambda t: t[:2], reverse=True)
+            for i, j in _top_somas([t[0] for t in ents], self.k):
+                (va, _, ra), (vb, _, rb) = ents[i], ents[j]
+                sa, sb = INDEX.slug(ra), INDEX.slug(rb)
+                if sb < sa:
+                    sa, sb, ra, rb = sb, sa, rb, ra
+                c = cand.get((sa, sb))
+                if c is None:
+                    cand[(sa, sb)] = [va + vb, 1, ra, rb]
+                else:
+                    c[1] += 1   # par presente nos dois buckets (grupo e porte)
+        top = heapq.nsmallest(self.k, cand.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))
+        return [(ra, rb) for _, (_, _, ra, rb) in top]
+
+def pair_rel(ra, rb):
+    return f"comparar/{INDEX.slug(ra)}-vs-{INDEX.slug(rb)}/index.html"
+
+def pair_key(ra, rb):
+    """Chave da página do par: os dois registros + regras (scores e textos) + fotos."""
+    return page_key("comparar-par.html", RULES_HASH, json_hash(ra), json_hash(rb),
+                    json_hash([foto_info(ra.get("foto")), foto_info(rb.get("foto"))]))
+
+def _ou(v):
+    return "—" if v is None else v
+
+def _mf(m, unidade):
+    m = m or {}
+    return f"{attr(str(m.get('macho') or '—'))} ♂ / {attr(str(m.get('femea') or '—'))} ♀ {unidade}"
+
+def _minutos(m):
+    return f"<data value='{m}'>{m}</data> min/dia" if m else "—"
+
+# (id, título, linhas) — mesmas seções e linhas de renderG1…renderG33 do compare.js
+PAR_SECOES = (
+    ("g1", "Classificação", (
+        ("Grupo FCI", lambda b: attr(f"Grupo {_ou(b['fci']['grupo'])} — {_ou(b['fci']['descricao'])}")),
+        ("Porte", lambda b: attr(str(_ou(b["porte"]["label"])))),
+        ("Origem", lambda b: attr(str(_ou(b["origem"])))),
+    )),
+    ("g2", "Medidas", (
+        ("Altura", lambda b: _mf(b["medidas"]["altura_cm"], "cm")),
+        ("Peso", lambda b: _mf(b["medidas"]["peso_kg"], "kg")),
+        ("Expectativa de vida", lambda b: f"{attr(str(b['medidas']['expectativa_anos'] or '—'))} anos"),
+    )),
+    ("g31", "Energia Física & Mental", (
+        ("Nível de energia física", lambda b: attr(b["energia"].get("nivel_fisico_txt") or "—")),
+        ("Duração das atividades", lambda b: _minutos(b["energia"].get("minutos_dia"))),
+        ("Exigência cognitiva", lambda b: attr(b["energia"].get("exigencia_cog_txt") or "—")),
+    )),
+    ("g32", "Cuidados & Pelagem", (
+        ("Frequência de escovação", lambda b: attr(b["pelagem"].get("escovacao_txt") or "—")),
+        ("Queda de pelos", lambda b: attr(b["pelagem"].get("queda_txt") or "—")),
+        ("Frequência de tosa", lambda b: attr(b["pelagem"].get("tosa_txt") or "—")),
+    )),
+    ("g33", "Ambiente & Espaço", (
+        ("Adequação ao clima", lambda b: f"{b['clima']['valor']}/5 ({attr(b['clima']['perfil_txt'])})"),
+        ("Tolerância ao calor", lambda b: attr(b["clima"].get("tolerancia_calor_txt") or "—")),
+        ("Tolerância à umidade", lambda b: attr(b["clima"].get("tolerancia_umidade_txt") or "—")),
+        ("Adaptação ao espaço", lambda b: attr(b["clima"].get("adaptacao_espaco_txt") or "—")),
+    )),
 )
-(out_cmp/"index.html").write_text(html_cmp, encoding="utf-8")
+# colTemplate(2) do compare.js: coluna de rótulos + uma por raça
+PAR_COLUNAS = "minmax(180px, 1fr)" + " minmax(200px, 1fr)" * 2
+
+def render_pair_colhead(b, i):
+    foto = b.get("foto") or ""
+    thumb = foto_html(foto, "thumb", f"alt='Foto da raça {attr(b['nome'])}' loading='lazy' decoding='async'"
+                                     " width='96' height='64' class='cmp-thumb'>") if foto else ""
+    return (
+        f"<div class='cmp-colhead' role='columnheader' id='col-{i}'>{thumb}"
+        f"<div class='cmp-colhead__txt'><a class='cmp-colhead__name' href='{BASE}/racas/{b['slug']}.html'>"
+        f"<strong>{attr(b['nome'])}</strong></a></div></div>"
+    )
+
+def render_pair_sections(breeds):
+    out = []
+    for gid, titulo, linhas in PAR_SECOES:
+        cells = []
+        for label, fn in linhas:
+            lid = f"{gid}-{slugify(label)}"
+            cells.append(f"<div class='cmp-cell cmp-cell--label' id='{lid}' role='rowheader'>{attr(label)}</div>")
+            for i, b in enumerate(breeds, 1):
+                cells.append(f"<div class='cmp-cell' role='cell' aria-labelledby='{lid} col-{i}'>{fn(b)}</div>")
+        out.append(
+            f"<section class='cmp-card card'><h2 class='cmp-card__title'>{attr(titulo)}</h2>"
+            f"<div class='cmp-grid' data-group='{gid}' style='grid-template-columns:{PAR_COLUNAS}'>"
+            + "".join(cells) + "</div></section>"
+        )
+    return "\n".join(out)
+
+def render_pair(a, b):
+    """Página estática do par; `a` e `b` são registros de client_record."""
+    url = f"{BASE}/comparar/{a['slug']}-vs-{b['slug']}/"
+    titulo = f"{a['nome']} vs {b['nome']}"
+    return TPL["comparar-par.html"].safe_substitute(
+        HEAD_BASE=HEAD_BASES["comparar"], CSS_PAGINA=CSS_PAGINAS["comparar"], baseUrl=BASE,
+        SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER,
+        url=url, titulo=attr(titulo),
+        descricao=attr(f"Compare {a['nome']} e {b['nome']} lado a lado: porte, medidas, energia, "
+                       "cuidados com a pelagem e adaptação ao clima e ao espaço."),
+        personalizar=f"{BASE}/comparar/?add={a['slug']}&amp;add={b['slug']}",
+        colunas=PAR_COLUNAS,
+        CABECALHO="<div class='cmp-spacer' aria-hidden='true'></div>"
+                  + render_pair_colhead(a, 1) + render_pair_colhead(b, 2),
+        SECOES=render_pair_sections((a, b)),
+        jsonld_breadcrumb_par=json.dumps({
+            "@context":"https://schema.org","@type":"BreadcrumbList",
+            "itemListElement":[
+              {"@type":"ListItem","position":1,"name":"Início","item":f"{BASE}/"},
+              {"@type":"ListItem","position":2,"name":"Comparar","item":f"{BASE}/comparar/"},
+              {"@type":"ListItem","position":3,"name":titulo,"item":url}
+            ]
+        }, ensure_ascii=False)
+    )
+
+def _write_pair(item):
+    """Worker do pool: renderiza a página de um par e a grava no staging se mudou."""
+    rel, a, b = item
+    t0 = time.perf_counter()
+    data, antes = page_bytes((render_pair(a, b),))
+    wrote = stage_file(OUT, STAGE, rel, data)
+    return wrote, len(data), time.perf_counter() - t0, antes
+
+def pair_records(pares):
+    """Registros do comparador (client_record) das raças dos pares, com scores em lote."""
+    racas = {}
+    for ra, rb in pares:
+        racas.setdefault(INDEX.slug(ra), ra)
+        racas.setdefault(INDEX.slug(rb), rb)
+    lista = list(racas.values())
+    cols = score_all(lista, SCORING)
+    return {INDEX.slug(r): client_record(r, score_row(cols, i), SCORING, INDEX, IMAGENS)
+            for i, r in enumerate(lista)}
+
+def prune_pair_pages(keep, writer):
+    """Remove (no commit) páginas de pares que saíram do top K."""
+    for p in (OUT/"comparar").glob("*-vs-*/index.html"):
+        rel = p.relative_to(OUT).as_posix()
+        if rel not in keep:
+            writer.delete(rel)
 
 # ===== Páginas estáticas =====
-ROOT.write_text("", encoding="utf-8") if not ROOT.exists() else None  # no-op
+def render_home(top_br, top_gl, nomes):
+    br_top5 = _rank_items_html(top_br.items())
+    gl_top5 = _rank_items_html(top_gl.items())
+    datalist = "<datalist id='racas-list'>" + "".join(
+        f"<option value='{attr(nome)}'></option>" for nome in sorted(nomes)
+    ) + "</datalist>"
+    return TPL["index.html"].safe_substitute(HEAD_BASE=HEAD_BASES["estatica"], CSS_PAGINA=CSS_PAGINAS["estatica"], baseUrl=BASE, SITE_HEADER=header_for("/"), SITE_FOOTER=SITE_FOOTER, BR_TOP5_ITEMS=br_top5, GLOBAL_TOP5_ITEMS=gl_top5, DATALIST_BREEDS=datalist)
 
-# Home
-datalist = "<datalist id='racas-list'>" + "".join(
-    f"<option value='{attr(r['nome'])}'></option>" for r in sorted(racas, key=lambda x: x['nome'])
-) + "</datalist>"
+def render_static(tpl_nome, current_path=None):
+    hdr = header_for(current_path) if current_path else SITE_HEADER
+    return TPL[tpl_nome].safe_substitute(HEAD_BASE=HEAD_BASES["estatica"], CSS_PAGINA=CSS_PAGINAS["estatica"],
+                                         baseUrl=BASE, SITE_HEADER=hdr, SITE_FOOTER=SITE_FOOTER)
 
-(ROOT/"index.html").write_text(
-    tpl_home.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=header_for("/"), SITE_FOOTER=SITE_FOOTER, BR_TOP5_ITEMS=br_top5, GLOBAL_TOP5_ITEMS=gl_top5, DATALIST_BREEDS=datalist),
-    encoding="utf-8"
-)
-# Sobre
-(out_dir:=ROOT/"sobre").mkdir(exist_ok=True)
-(out_dir/"index.html").write_text(
-    tpl_sobre.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=header_for("/sobre/"), SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
-# Guia Responsável
-(out_dir:=ROOT/"guia-responsavel").mkdir(exist_ok=True)
-(out_dir/"index.html").write_text(
-    tpl_guia.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=header_for("/guia-responsavel/"), SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
-# Acessibilidade
-(out_dir:=ROOT/"acessibilidade").mkdir(exist_ok=True)
-(out_dir/"index.html").write_text(
-    tpl_a11y.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
-# Privacidade
-(out_dir:=ROOT/"privacidade").mkdir(exist_ok=True)
-(out_dir/"index.html").write_text(
-    tpl_priv.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
-# Sitemap (HTML)
-(ROOT/"sitemap.html").write_text(
-    tpl_map.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
-# 404
-(ROOT/"404.html").write_text(
-    tpl_404.safe_substitute(HEAD_BASE=HEAD_BASE, baseUrl=BASE, SITE_HEADER=SITE_HEADER, SITE_FOOTER=SITE_FOOTER),
-    encoding="utf-8"
-)
+# (saída relativa ao site, template, caminho do nav marcado com aria-current)
+STATIC_PAGES = [
+    ("sobre/index.html",            "sobre.html",            "/sobre/"),
+    ("guia-responsavel/index.html", "guia-responsavel.html", "/guia-responsavel/"),
+    ("acessibilidade/index.html",   "acessibilidade.html",   None),
+    ("privacidade/index.html",      "privacidade.html",      None),
+    ("sitemap.html",                "sitemap.html",          None),
+    ("404.html",                    "404.html",              None),
+]
+
+# raças por lote (scoring em colunas + envio ao pool)
+BATCH_SIZE = 512
+
+def _manifest_name(outdir):
+    """Manifesto por diretório de saída (o padrão, ROOT, mantém o nome histórico)."""
+    outdir = Path(outdir).resolve()
+    return "paginas" if outdir == ROOT else f"paginas-{content_hash(str(outdir))[:10]}"
+
+def build(site, rules, racas, outdir=ROOT, only=None, *, aliases=None, incremental=False,
+          jobs=1, por_pagina=LIST_PAGE_SIZE, report=None, manifest=None, memo=None, fsync=True,
+          sitemap_gz=False, pares=COMPARE_TOP_K, minify=False):
+    """
+    Gera o site em `outdir` a partir de `site`, `rules` e de um iterável de raças.
+
+    `only`: slugs das raças cujas páginas de detalhe devem ser avaliadas; as
+    demais ficam como estão (None = todas). Listagens, índice de busca, home e
+    páginas estáticas são sempre avaliados pelas suas chaves de entrada.
+    `manifest`: BuildManifest reaproveitado entre builds (modo watch); por
+    padrão um por diretório de saída, ativo se `incremental`.
+    `memo`: dict mantido entre builds com card e hashes por registro (mesmo
+    objeto => mesmos valores); só faz sentido com um catálogo em memória.
+    As saídas passam por um OutputWriter: nada é publicado se o build falhar,
+    e as URLs alteradas ficam em .build-cache/changed-<manifesto>.txt.
+    O sitemap.xml é escrito em streaming junto com as páginas (`sitemap_gz`:
+    índice + shards .xml.gz); <lastmod> avança quando a chave da página muda.
+    `pares`: quantos pares populares ganham página comparar/<a>-vs-<b>/ (0 = nenhum).
+    `minify`: grava o HTML minificado (HtmlMinifier); a economia por tipo de
+    página vai para o relatório (extra "minificacao").
+    Retorna o BuildReport.
+    """
+    report = report or BuildReport("paginas")
+    writer = OutputWriter(_manifest_name(outdir), outdir, "/", report, fsync=fsync)
+    configure(site, rules, aliases, outdir, writer.stage, minify)
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    if manifest is None:
+        manifest = BuildManifest(_manifest_name(OUT), enabled=incremental, root=OUT)
+    only = None if only is None else set(only)
+    lastmod = LastmodStore(_manifest_name(OUT))
+    sitemap = SitemapWriter(writer, BASE, gz=sitemap_gz)
+
+    def sitemap_add(rel):
+        path = "/" + rel.removesuffix("index.html")
+        sitemap.add(path, lastmod.get(rel, manifest.pages.get(rel)))
+        report.count("urls_sitemap")
+
+    minificacao = {}
+    def conta_min(tipo, antes, depois):
+        if MINIFY:
+            t = minificacao.setdefault(tipo, {"paginas": 0, "bytes_antes": 0, "bytes_depois": 0})
+            t["paginas"] += 1
+            t["bytes_antes"] += antes
+            t["bytes_depois"] += depois
+
+    def emit(rel, key, render, indexar=True, tipo=None):
+        """`tipo`: tipo de página HTML (minificável); None para saídas de dados."""
+        fresh = manifest.is_fresh(rel, key)
+        if indexar:
+            sitemap_add(rel)
+        if fresh:
+            report.count("puladas")
+            return
+        with report.phase("render"):
+            text = render()
+            if tipo is not None:
+                text, antes = page_bytes((text,))
+                conta_min(tipo, antes, len(text))
+        report.count("renderizadas")
+        with report.phase("write"):
+            writer.write(rel, text)
+
+    # Uma passada em streaming pelo catálogo: páginas de raça são gravadas
+    # lote a lote; só os agregados da lista e da home ficam em memória.
+    cards, nomes = [], []
+    top_br, top_gl = Top5("br"), Top5("global")
+    top_pares = TopPares(pares)
+    cards_h, home_h = hashlib.sha256(), hashlib.sha256()
+    memo_novo = {}
+
+    pool = None
+    if jobs > 1:
+        # workers recebem o mesmo estado (vale também para o start method "spawn")
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=configure,
+                                   initargs=(site, rules, aliases_map, OUT, STAGE, MINIFY))
+    try:
+        for lote in report.timed_iter("load", iter_batches(racas, BATCH_SIZE)):
+            pendentes = []
+            with report.phase("index"):
+                for r in lote:
+                    m = memo.get(id(r)) if memo is not None else None
+                    if m is None or m[0] is not r:
+                        c = card_record(r)
+                        m = (r, c, json_hash(card_inputs(c)).encode(), json_hash(home_inputs(r)).encode(),
+                             INDEX.slug(r))
+                    if memo is not None:
+                        memo_novo[id(r)] = m
+                    _, c, card_h, h, slug = m
+                    cards.append(c)
+                    nomes.append(r["nome"])
+                    top_br.push(r)
+                    top_gl.push(r)
+                    top_pares.push(r)
+                    cards_h.update(card_h)
+                    home_h.update(h)
+
+                    rel = f"racas/{slug}.html"
+                    if only is not None and slug not in only:
+                        manifest.keep(rel)
+                    elif manifest.is_fresh(rel, breed_key(r)):
+                        report.count("puladas")
+                    else:
+                        pendentes.append((rel, r))
+                    sitemap_add(rel)
+            # scores só das raças pendentes, em lote
+            with report.phase("score"):
+                cols = score_all([r for _, r in pendentes], SCORING)
+                pendentes = [(rel, r, score_row(cols, i)) for i, (rel, r) in enumerate(pendentes)]
+            for (rel, _r, _row), (wrote, nbytes, t, antes) in zip(pendentes, write_details(pendentes, pool, jobs)):
+                conta_min("detalhe", antes, nbytes)
+                report.add("jsonld", t[0], t[1])
+                report.add("render", t[2], t[3])
+                report.add("write", t[4], t[5])
+                report.slow(rel, t[0] + t[2] + t[4])
+                report.count("renderizadas")
+                writer.record(rel, wrote, nbytes)
+
+        # páginas dos pares populares: só os pares cuja chave mudou são renderizados
+        pair_rels, pendentes = [], []
+        with report.phase("pares"):
+            for ra, rb in top_pares.pares():
+                rel = pair_rel(ra, rb)
+                pair_rels.append(rel)
+                fresh = manifest.is_fresh(rel, pair_key(ra, rb))
+                sitemap_add(rel)   # depois do is_fresh: o lastmod usa a chave nova
+                if fresh:
+                    report.count("puladas")
+                else:
+                    pendentes.append((rel, ra, rb))
+            recs = pair_records([(ra, rb) for _, ra, rb in pendentes])
+            pendentes = [(rel, recs[INDEX.slug(ra)], recs[INDEX.slug(rb)]) for rel, ra, rb in pendentes]
+        for (rel, _a, _b), (wrote, nbytes, secs, antes) in zip(pendentes, write_details(pendentes, pool, jobs, _write_pair)):
+            conta_min("par", antes, nbytes)
+            report.slow(rel, secs)
+            report.count("pares")
+            report.count("renderizadas")
+            writer.record(rel, wrote, nbytes)
+        prune_pair_pages(set(pair_rels), writer)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    lista = memo.get("lista") if memo is not None else None
+    if memo is not None:
+        memo.clear()
+        memo.update(memo_novo)
+
+    list_key = page_key("lista-racas.html", cards_h.hexdigest(), str(por_pagina))
+    if lista and lista[0] == list_key and all(manifest.is_fresh(rel, list_key) for rel in lista[1]):
+        # mesmas páginas do build anterior (modo watch): dispensa ordenar/agrupar os cards
+        report.count("puladas", len(lista[1]))
+        for rel in lista[1]:
+            sitemap_add(rel)
+    else:
+        list_rels = []
+        for rel, render in list_pages(cards, por_pagina):
+            list_rels.append(rel)
+            emit(rel, list_key, render, tipo="lista")
+        prune_list_pages(set(list_rels), writer)
+        lista = (list_key, list_rels)
+    if memo is not None:
+        memo["lista"] = lista
+    emit("data/search-index.json", data_key(cards_h.hexdigest()), lambda: render_search_index(cards),
+         indexar=False)
+    emit("comparar/index.html", page_key("comparar.html", RULES_HASH), render_compare, tipo="comparar")
+    emit("index.html",
+         page_key("index.html", home_h.hexdigest()), lambda: render_home(top_br, top_gl, nomes), tipo="home")
+    for rel, tpl_nome, current in STATIC_PAGES:
+        emit(rel, page_key(tpl_nome), lambda tpl_nome=tpl_nome, current=current: render_static(tpl_nome, current),
+             indexar=rel != "404.html", tipo="estatica")
+    with report.phase("write"):
+        sitemap.close()
+
+    with report.phase("commit"):
+        report.count("urls_alteradas", len(writer.commit()))
+    manifest.save()
+    lastmod.save()
+    if minificacao:
+        for t in minificacao.values():
+            t["economia"] = t["bytes_antes"] - t["bytes_depois"]
+            t["razao"] = round(t["bytes_depois"] / t["bytes_antes"], 4) if t["bytes_antes"] else None
+            report.count("bytes_economizados", t["economia"])
+        report.extra["minificacao"] = minificacao
+    return report
+
+# ===== Modo watch =====
+# Entradas observadas: data/ (exceto os JSON gerados) e templates/ (inclui os parciais).
+WATCH_DATA = ("site.json", "rules.json", "aliases_oficiais.json")
+
+class WarmCatalog:
+    """
+    Catálogo mantido em memória entre rebuilds. Registros que não mudaram
+    continuam sendo o mesmo objeto (o memo de build() depende disso); em
+    NDJSON só as linhas alteradas são decodificadas.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        self.racas, self.slugs, self.novos = [], [], []
+        self._linhas = {}
+        self.reload()
+
+    @staticmethod
+    def _slug(r):
+        nome = r.get("nome") if isinstance(r, dict) else None
+        return breed_slug(r) if isinstance(nome, str) else ""
+
+    def reload(self):
+        """Relê o arquivo; retorna os slugs de registros novos ou alterados."""
+        mudou, novos, slugs = set(), [], []
+        if self.path.suffix == ".ndjson":
+            linhas, racas = {}, []
+            text = self.path.read_text(encoding="utf-8")
+            for n, line in enumerate(text.splitlines(), 1):
+                line = line.strip()
+                if not line:
+                    continue
+                ent = self._linhas.get(line)
+                if ent is None:
+                    try:
+                        r = json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"{self.path.name}:{n}: {e}") from None
+                    ent = (r, self._slug(r))
+                    mudou.add(ent[1])
+                    novos.append(r)
+                linhas[line] = ent
+                racas.append(ent[0])
+                slugs.append(ent[1])
+            self._linhas = linhas
+        else:
+            antes = dict(zip(self.slugs, self.racas))
+            racas = []
+            for r in iter_racas(self.path):
+                slug = self._slug(r)
+                old = antes.get(slug)
+                if old is not None and old == r:
+                    r = old
+                else:
+                    mudou.add(slug)
+                    novos.append(r)
+                racas.append(r)
+                slugs.append(slug)
+        self.racas, self.slugs, self.novos = racas, slugs, novos
+        return mudou
+
+    def validate(self, rules, check):
+        """
+        Valida só os registros novos/alterados; a passada completa (que levanta
+        CatalogError com todos os erros) só acontece se algo estiver errado.
+        """
+        if any(check(r) for r in self.novos) or len(set(self.slugs)) != len(self.slugs):
+            validate_racas(self.racas, rules, check)
+
+def _mtimes(paths):
+    out = {}
+    for p in paths:
+        try:
+            out[p] = p.stat().st_mtime_ns
+        except FileNotFoundError:
+            out[p] = None
+    return out
+
+def watch(args, intervalo=0.05):
+    """
+    Rebuild contínuo: templates, regras, catálogo e cards ficam em memória e,
+    a cada mudança, só as saídas afetadas são avaliadas (edição de uma raça →
+    sua página de detalhe + agregados cujas chaves mudaram).
+    """
+    site, rules = load_site_rules()
+    validate_catalog(args.catalogo, rules)
+    catalogo = WarmCatalog(args.catalogo or catalog_path())
+    aliases = load_aliases_map()
+    check = compile_validator(rules)
+    memo = {}
+    manifest = BuildManifest(_manifest_name(ROOT), enabled=True)
+    opts = dict(jobs=args.jobs, por_pagina=args.por_pagina, manifest=manifest, memo=memo,
+                fsync=not args.sem_fsync, sitemap_gz=args.sitemap_gz, pares=args.pares, minify=args.minificar)
+
+    report = build(site, rules, catalogo.racas, aliases=aliases, **opts)
+    print(f"[watch] build inicial — {report.summary()}")
+
+    arquivos = ([ROOT/"data"/n for n in WATCH_DATA] + [catalogo.path, CSS_MANIFEST, IMG_MANIFEST]
+                + [ROOT/"templates"/n for n in TEMPLATES])
+    vistos = _mtimes(arquivos)
+    print(f"[watch] observando {len(arquivos)} arquivos (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(intervalo)
+            agora = _mtimes(arquivos)
+            if agora == vistos:
+                continue
+            # espera a gravação terminar (mtimes estáveis)
+            while True:
+                time.sleep(intervalo / 2)
+                depois = _mtimes(arquivos)
+                if depois == agora:
+                    break
+                agora = depois
+            mudou = [p for p in arquivos if agora[p] != vistos[p]]
+            vistos = agora
+            t0 = time.perf_counter()
+            nomes = {p.name for p in mudou}
+            only = set()
+            try:
+                if CSS_MANIFEST in mudou:
+                    only = None   # CSS crítico/folhas mudaram: todas as páginas
+                if IMG_MANIFEST in mudou:
+                    memo.clear()  # cards dependem dos derivados das fotos
+                    only = None
+                if nomes & set(WATCH_DATA):
+                    site, rules = load_site_rules()
+                    aliases = load_aliases_map()
+                    check = compile_validator(rules)
+                    memo.clear()  # cards dependem dos aliases
+                    only = None
+                if catalogo.path in mudou:
+                    alteradas = catalogo.reload()
+                    if only is not None:
+                        only |= alteradas
+                if only is None:
+                    validate_racas(catalogo.racas, rules, check)
+                elif catalogo.path in mudou:
+                    catalogo.validate(rules, check)
+                tpls = [n for n in TEMPLATES if ROOT/"templates"/n in mudou]
+                if tpls:
+                    load_templates(tpls)
+                    if set(tpls) & set(PARTIALS + ("detalhe-raca.html",)):
+                        only = None
+                report = build(site, rules, catalogo.racas, only=only, aliases=aliases, **opts)
+            except (ValueError, KeyError, OSError) as e:
+                # JSON inválido / arquivo removido: espera a próxima gravação
+                print(f"[watch] erro em {', '.join(sorted(nomes))}: {e}")
+                continue
+            ms = (time.perf_counter() - t0) * 1000
+            print(f"[watch] {', '.join(sorted(nomes))} → {ms:.0f} ms — {report.summary()}")
+    except KeyboardInterrupt:
+        pass
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera as páginas HTML a partir de data/ e templates/.")
+    ap.add_argument("--incremental", action="store_true",
+                    help="re-renderiza só as páginas cujas entradas mudaram desde o último build")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="processos para renderizar as páginas de raça (0 = nº de CPUs)")
+    ap.add_argument("--por-pagina", type=int, default=LIST_PAGE_SIZE, metavar="N",
+                    help=f"raças por página na listagem e nas facetas (padrão: {LIST_PAGE_SIZE})")
+    ap.add_argument("--catalogo", type=Path, default=None, metavar="ARQ",
+                    help="catálogo de raças (.json ou .ndjson); padrão: data/racas.ndjson se existir, senão data/racas.json")
+    ap.add_argument("--watch", action="store_true",
+                    help="observa data/ e templates/ e refaz só as saídas afetadas (mantém tudo em memória)")
+    ap.add_argument("--sitemap-gz", action="store_true",
+                    help="grava o sitemap como índice + shards .xml.gz")
+    ap.add_argument("--pares", type=int, default=COMPARE_TOP_K, metavar="K",
+                    help=f"pares populares com página comparar/<a>-vs-<b>/ (padrão: {COMPARE_TOP_K}; 0 = nenhum)")
+    ap.add_argument("--minificar", action="store_true",
+                    help="grava o HTML minificado (espaços, comentários e JSON-LD compactos)")
+    add_report_args(ap)
+    add_output_args(ap)
+    args = ap.parse_args()
+
+    try:
+        if args.watch:
+            watch(args)
+            return
+        site, rules = load_site_rules()
+        report = BuildReport("paginas")
+        with report.phase("validate"):
+            report.count("validadas", validate_catalog(args.catalogo, rules))
+    except CatalogError as e:
+        print(f"[erro] {e}", file=sys.stderr)
+        sys.exit(1)
+    build_args = (site, rules, iter_racas(args.catalogo))
+    build_opts = dict(incremental=args.incremental, jobs=args.jobs,
+                      por_pagina=args.por_pagina, report=report, fsync=not args.sem_fsync,
+                      sitemap_gz=args.sitemap_gz, pares=args.pares, minify=args.minificar)
+    if args.profile:
+        run_profiled("paginas", lambda: build(*build_args, **build_opts))
+    else:
+        build(*build_args, **build_opts)
+    report.save(args.relatorio)
+    print("[ok] Páginas geradas: Home, Raças (lista paginada+facetas+detalhes), Comparar (+pares), Sobre, Guia, Acessibilidade, Privacidade, Sitemap, 404, sitemap.xml"
+          f" — {report.summary()}")
 
-print("[ok] Páginas geradas: Home, Raças (lista+detalhes), Comparar, Sobre, Guia, Acessibilidade, Privacidade, Sitemap, 404")
+if __name__ == "__main__":
+    main()
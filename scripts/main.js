@@ -73,6 +73,8 @@ document.addEventListener("DOMContentLoaded", () => {
 
   const items = Array.from(list.querySelectorAll(".breed-card"));
 
+  // Enquanto o índice de busca (gerado no build) não chega, filtra por
+  // varredura dos cards; depois, por interseção de postings do índice.
   const normTextCache = new Map();
   items.forEach((li) => {
     const nameNorm = simplify(li.dataset.name || "");
@@ -80,6 +82,129 @@ document.addEventListener("DOMContentLoaded", () => {
     normTextCache.set(li, (nameNorm + " " + aliasNorm).trim());
   });
 
+  let index = null;
+
+  // A listagem é paginada e há páginas estáticas por faceta (porte / grupo FCI)
+  const baseUrl = document.body?.dataset?.baseurl || "";
+  const facet = document.body?.dataset?.facet || "";
+  const facetValue = document.body?.dataset?.facetValue || "";
+  const OFFPAGE_MAX = 48;
+
+  function undelta(gaps) {
+    let acc = 0;
+    return gaps.map((g) => (acc += g));
+  }
+
+  function lowerBound(arr, x) {
+    let lo = 0;
+    let hi = arr.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >> 1;
+      if (arr[mid] < x) lo = mid + 1;
+      else hi = mid;
+    }
+    return lo;
+  }
+
+  // ids das raças com algum termo que começa com `tok`
+  function prefixIds(tok) {
+    const out = new Set();
+    for (let i = lowerBound(index.terms, tok); i < index.terms.length; i++) {
+      if (!index.terms[i].startsWith(tok)) break;
+      index.postings[i].forEach((id) => out.add(id));
+    }
+    return out;
+  }
+
+  function intersect(a, b) {
+    if (a === null) return b;
+    const [small, large] = a.size <= b.size ? [a, b] : [b, a];
+    return new Set([...small].filter((id) => large.has(id)));
+  }
+
+  // ids das raças que atendem à consulta, ou null (= todas)
+  function queryIds(qTokens, porte, grupo) {
+    let ids = null;
+    if (porte) ids = intersect(ids, new Set(index.porte[porte] || []));
+    if (grupo) ids = intersect(ids, new Set(index.grupo[grupo] || []));
+    for (const t of qTokens) {
+      if (ids && !ids.size) break;
+      ids = intersect(ids, prefixIds(t));
+    }
+    return ids;
+  }
+
+  // Resultados que não estão nesta página da listagem: card simples (nome + ações)
+  function offPageCard(id) {
+    const slug = index.slugs[id];
+    const li = document.createElement("li");
+    li.className = "breed-card js-offpage";
+    li.dataset.slug = slug;
+
+    const body = document.createElement("div");
+    body.className = "breed-card__body";
+    const h3 = document.createElement("h3");
+    h3.className = "breed-card__title";
+    const a = document.createElement("a");
+    a.href = `${baseUrl}/racas/${slug}.html`;
+    a.textContent = index.nomes[id];
+    h3.appendChild(a);
+    body.appendChild(h3);
+
+    const actions = document.createElement("div");
+    actions.className = "breed-card__actions";
+    const add = document.createElement("a");
+    add.className = "btn btn--full js-compare-add";
+    add.dataset.slug = slug;
+    add.href = `${baseUrl}/comparar/?add=${slug}`;
+    add.textContent = "+ Comparar";
+    actions.appendChild(add);
+
+    li.append(body, actions);
+    return li;
+  }
+
+  function renderOffPage(hits, onPage) {
+    list.querySelectorAll(".js-offpage").forEach((el) => el.remove());
+    if (!hits) return 0;
+    let n = 0;
+    [...hits]
+      .sort((a, b) => a - b)
+      .forEach((id) => {
+        if (onPage.has(id)) return;
+        if (n < OFFPAGE_MAX) list.appendChild(offPageCard(id));
+        n++;
+      });
+    return n;
+  }
+
+  // Página estática equivalente ao filtro (só para uma faceta e sem busca)
+  function facetURL(q, porte, grupo) {
+    if (q || (porte && grupo)) return null;
+    if (porte) return `${baseUrl}/racas/porte/${porte}/`;
+    if (grupo) return `${baseUrl}/racas/grupo/${grupo}/`;
+    return `${baseUrl}/racas/`;
+  }
+
+  async function loadIndex() {
+    try {
+      const res = await fetch(`${baseUrl}/data/search-index.json`);
+      if (!res.ok) return;
+      const raw = await res.json();
+      const facet = (m) => Object.fromEntries(Object.entries(m).map(([k, v]) => [k, undelta(v)]));
+      index = {
+        slugs: raw.slugs,
+        nomes: raw.nomes,
+        idOf: new Map(raw.slugs.map((s, i) => [s, i])),
+        terms: raw.terms.map((t) => t[0]),
+        postings: raw.terms.map((t) => undelta(t[1])),
+        porte: facet(raw.porte),
+        grupo: facet(raw.grupo),
+      };
+      applyFilter();
+    } catch {}
+  }
+
   const status = root.querySelector("#results-status");
   const inputQ = form.querySelector("#q");
   const selPorte = form.querySelector("#porte");
@@ -91,6 +216,8 @@ document.addEventListener("DOMContentLoaded", () => {
     if (inputQ) inputQ.value = p.get("q") || "";
     if (selPorte) selPorte.value = p.get("porte") || "";
     if (selGrupo) selGrupo.value = p.get("grupo") || "";
+    if (facet === "porte" && selPorte && !p.has("porte")) selPorte.value = facetValue;
+    if (facet === "grupo" && selGrupo && !p.has("grupo")) selGrupo.value = facetValue;
     lastState = {
       q: (inputQ?.value || "").trim().toLowerCase(),
       porte: selPorte?.value || "",
@@ -120,18 +247,35 @@ document.addEventListener("DOMContentLoaded", () => {
     const grupo = selGrupo?.value || "";
 
     let visible = 0;
-    items.forEach((li) => {
-      const searchable = normTextCache.get(li) || "";
-      const p = li.dataset.porte || "";
-      const g = li.dataset.grupo || "";
-
-      const okQ = !qTokens.length || qTokens.every((t) => searchable.includes(t));
-      const okP = !porte || p === porte;
-      const okG = !grupo || g === grupo;
-
-      li.hidden = !(okQ && okP && okG);
-      if (!li.hidden) visible++;
-    });
+    if (index) {
+      // filtro igual ao da própria página (faceta/paginação): nada a filtrar
+      const pageView =
+        !qTokens.length &&
+        porte === (facet === "porte" ? facetValue : "") &&
+        grupo === (facet === "grupo" ? facetValue : "");
+      const hits = pageView ? null : queryIds(qTokens, porte, grupo);
+      const onPage = new Set();
+      items.forEach((li) => {
+        const id = index.idOf.get(li.dataset.slug);
+        onPage.add(id);
+        li.hidden = hits !== null && !hits.has(id);
+        if (!li.hidden) visible++;
+      });
+      visible += renderOffPage(hits, onPage);
+    } else {
+      items.forEach((li) => {
+        const searchable = normTextCache.get(li) || "";
+        const p = li.dataset.porte || "";
+        const g = li.dataset.grupo || "";
+
+        const okQ = !qTokens.length || qTokens.every((t) => searchable.includes(t));
+        const okP = !porte || p === porte;
+        const okG = !grupo || g === grupo;
+
+        li.hidden = !(okQ && okP && okG);
+        if (!li.hidden) visible++;
+      });
+    }
 
     if (status) status.textContent = `${visible} raça(s) encontrada(s)`;
     writeURL(qRaw.trim().toLowerCase(), porte, grupo);
@@ -139,6 +283,11 @@ document.addEventListener("DOMContentLoaded", () => {
 
   form.addEventListener("submit", (e) => {
     e.preventDefault();
+    const target = facetURL(simplify(inputQ?.value || ""), selPorte?.value || "", selGrupo?.value || "");
+    if (target && new URL(target, location.href).pathname !== location.pathname) {
+      location.href = target;
+      return;
+    }
     applyFilter();
   });
   selPorte?.addEventListener("change", applyFilter);
@@ -171,6 +320,7 @@ document.addEventListener("DOMContentLoaded", () => {
 
   readURL();
   applyFilter();
+  loadIndex();
 })();
 
 // ======= SELEÇÃO PARA COMPARAR =======
@@ -0,0 +1,59 @@
+# tests/test_determinismo.py
+# O build em paralelo (jobs=4) tem de gerar exatamente os mesmos bytes que o
+# serial (jobs=1) para o mesmo catálogo sintético — com e sem --minificar.
+#
+#   python -m unittest discover tests        (ou: python -m pytest tests)
+import sys
+import tempfile
+from contextlib import ExitStack
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import build_lib  # noqa: E402
+import build_output  # noqa: E402
+import build_report  # noqa: E402
+import build_sitemap  # noqa: E402
+import gerar_paginas  # noqa: E402
+from catalogo_sintetico import gerar_catalogo, gerar_aliases  # noqa: E402
+
+N_RACAS = 300
+
+def arquivos(raiz: Path) -> dict:
+    """caminho relativo -> bytes de tudo o que o build publicou em `raiz`."""
+    return {p.relative_to(raiz).as_posix(): p.read_bytes()
+            for p in sorted(raiz.rglob("*")) if p.is_file()}
+
+class DeterminismoTest(unittest.TestCase):
+    def test_serial_e_paralelo_identicos(self):
+        site, rules = build_lib.load_site_rules()
+        racas = list(gerar_catalogo(N_RACAS, rules, seed=7))
+        aliases = gerar_aliases(racas, seed=7)
+
+        for minify in (False, True):
+            with self.subTest(minify=minify), tempfile.TemporaryDirectory(prefix="determinismo-") as tmp:
+                tmp = Path(tmp)
+                # manifestos, lastmod e relatórios ficam no temporário, não no .build-cache do repo
+                with ExitStack() as stack:
+                    for mod in (build_lib, build_output, build_report, build_sitemap):
+                        stack.enter_context(mock.patch.object(mod, "CACHE_DIR", tmp / "cache"))
+                    saidas = {}
+                    for jobs in (1, 4):
+                        out = tmp / f"jobs{jobs}"
+                        out.mkdir()
+                        gerar_paginas.build(site, rules, iter(racas), out, aliases=aliases,
+                                            jobs=jobs, fsync=False, minify=minify)
+                        saidas[jobs] = arquivos(out)
+
+                serial, paralelo = saidas[1], saidas[4]
+                self.assertGreater(len(serial), N_RACAS)
+                self.assertEqual(sorted(serial), sorted(paralelo))
+                diferentes = [rel for rel in serial if serial[rel] != paralelo[rel]]
+                self.assertEqual(diferentes, [], f"{len(diferentes)} arquivo(s) diferem entre jobs=1 e jobs=4")
+
+if __name__ == "__main__":
+    unittest.main()
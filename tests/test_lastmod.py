@@ -0,0 +1,74 @@
+# tests/test_lastmod.py
+# O <lastmod> do sitemap só avança para as saídas cuja chave de entrada mudou —
+# inclusive as páginas dos pares populares (comparar/<a>-vs-<b>/).
+#
+#   python -m unittest discover tests        (ou: python -m pytest tests)
+import json
+import re
+import sys
+import tempfile
+import unittest
+from contextlib import ExitStack
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+import build_lib  # noqa: E402
+import build_output  # noqa: E402
+import build_report  # noqa: E402
+import build_sitemap  # noqa: E402
+import gerar_paginas  # noqa: E402
+from catalogo_sintetico import gerar_catalogo, gerar_aliases  # noqa: E402
+
+ANTIGA = "2000-01-01"
+
+def lastmods(out: Path) -> dict:
+    """loc -> lastmod do sitemap.xml (um shard só)."""
+    xml = (out / "sitemap.xml").read_text(encoding="utf-8")
+    return dict(re.findall(r"<loc>([^<]+)</loc><lastmod>([^<]+)</lastmod>", xml))
+
+class LastmodTest(unittest.TestCase):
+    def test_par_com_chave_nova_ganha_lastmod_novo(self):
+        site, rules = build_lib.load_site_rules()
+        racas = list(gerar_catalogo(60, rules, seed=3))
+        aliases = gerar_aliases(racas, seed=3)
+
+        with tempfile.TemporaryDirectory(prefix="lastmod-") as tmp, ExitStack() as stack:
+            tmp = Path(tmp)
+            for mod in (build_lib, build_output, build_report, build_sitemap):
+                stack.enter_context(mock.patch.object(mod, "CACHE_DIR", tmp / "cache"))
+            out = tmp / "site"
+            out.mkdir()
+
+            def build():
+                gerar_paginas.build(site, rules, iter(racas), out, aliases=aliases,
+                                    incremental=True, fsync=False)
+                return lastmods(out)
+
+            build()
+            # envelhece todas as datas: só o que mudar no próximo build volta para hoje
+            store = next((tmp / "cache").glob("lastmod-*.json"))
+            datas = json.loads(store.read_text(encoding="utf-8"))
+            store.write_text(json.dumps({rel: [k, ANTIGA] for rel, (k, _) in datas.items()}),
+                             encoding="utf-8")
+
+            pares = [rel for rel in datas if rel.startswith("comparar/") and "-vs-" in rel]
+            self.assertTrue(pares)
+            alvo = pares[0]
+            slug_a = alvo.split("/")[1].split("-vs-")[0]
+            ra = next(r for r in racas if r["slug"] == slug_a)
+            ra["notas"] = {**ra["notas"], "resumo": ra["notas"]["resumo"] + " Revisada."}
+
+            depois = build()
+            base = site["base_url"].rstrip("/") + "/"
+            self.assertNotEqual(depois[base + alvo.removesuffix("index.html")], ANTIGA)
+            intactos = [rel for rel in pares if slug_a not in rel.split("/")[1].split("-vs-")]
+            self.assertTrue(intactos)
+            for rel in intactos:
+                self.assertEqual(depois[base + rel.removesuffix("index.html")], ANTIGA, rel)
+
+if __name__ == "__main__":
+    unittest.main()
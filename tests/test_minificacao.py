@@ -0,0 +1,95 @@
+# tests/test_minificacao.py
+# HtmlMinifier (streaming) tem de dar exatamente o mesmo que minify_html na
+# página inteira, onde quer que os trechos sejam cortados — no meio de uma
+# tag, de um valor de atributo, de um comentário ou de um <script>.
+#
+#   python -m unittest discover tests        (ou: python -m pytest tests)
+import random
+import re
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from build_minify import HtmlMinifier, minify_html  # noqa: E402
+
+PAGINA = """<!doctype html>
+<html>
+  <head>
+    <meta http-equiv="Content-Security-Policy" content="default-src 'self';
+      img-src 'self' data:">
+    <title>  Teste   de   página </title>
+    <script type="application/ld+json">
+      { "a": 1,   "b": [1, 2] }
+    </script>
+    <style>
+      .x  { color: red }
+    </style>
+  </head>
+  <body class="a   b">
+    <!-- comentário
+         de várias linhas -->
+    <p>texto   com    espaços <em>e  ênfase</em>   fim</p>
+    <pre>
+   pré   formatado
+    </pre>
+    <a href="/x"
+       title='a > b'   >link</a>	tab	aqui
+    <textarea name="t">  a
+  b </textarea>
+    1 < 2 e 3 > 2
+    <!--[if IE]><p>ie</p><![endif]-->
+    <div
+      data-x="1"
+      data-y="2">  x  </div>
+  </body>
+</html>
+"""
+
+def stream(trechos) -> str:
+    return HtmlMinifier().minify(trechos)
+
+class MinificacaoTest(unittest.TestCase):
+    def assertCortes(self, s: str):
+        """Todo corte em dois trechos dá o mesmo que minify_html(s)."""
+        ref = minify_html(s)
+        for i in range(len(s) + 1):
+            self.assertEqual(stream((s[:i], s[i:])), ref, f"corte em {i}: {s[max(i - 20, 0):i]!r}|")
+
+    def test_corte_em_qualquer_posicao(self):
+        self.assertCortes(PAGINA)
+
+    def test_corte_dentro_da_tag(self):
+        self.assertEqual(stream(("<m", 'eta content="a\n   b">')), minify_html('<meta content="a\n   b">'))
+        self.assertEqual(stream(("<p>a", "   b\n  c</p>")), "<p>a b\nc</p>")
+
+    def test_varios_cortes(self):
+        ref = minify_html(PAGINA)
+        rnd = random.Random(1)
+        for _ in range(2000):
+            cortes = sorted(rnd.sample(range(len(PAGINA) + 1), 6))
+            trechos = [PAGINA[a:b] for a, b in zip([0] + cortes, cortes + [len(PAGINA)])]
+            self.assertEqual(stream(trechos), ref, cortes)
+
+    def test_valores_trocados(self):
+        # palavra a palavra, como os valores dos templates, com outros valores
+        # nos mesmos lugares (o cache de moldes não pode misturar as páginas)
+        for valor in ("x", "application/ld+json", "type", "a  b", "<b>", "1'", "div"):
+            s = PAGINA.replace("página", valor).replace("/x", valor).replace("ld+json", valor)
+            trechos = [t for t in re.split(r"(\w+)", s) if t]
+            self.assertEqual(stream(trechos), minify_html(s), valor)
+            self.assertEqual(stream(trechos), minify_html(s), valor)   # já com cache
+        # o type do <script> decide se o corpo é compactado como JSON-LD
+        for valor in ("text/plain", "application/ld+json", "ld+json", "application/ld", "x"):
+            trechos = ('<script type="', valor, '">\n  { "a":   1 }\n</script>\n<p>fim</p>')
+            self.assertEqual(stream(trechos), minify_html("".join(trechos)), valor)
+
+    def test_templates(self):
+        for arq in sorted((ROOT / "templates").glob("*.html")):
+            with self.subTest(template=arq.name):
+                self.assertCortes(arq.read_text(encoding="utf-8"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,27 @@
 # tools/audita_css.py
-import re
+# Auditoria de classes CSS: declaradas (styles/*.css) × usadas (HTML + JS).
+#
+#   python tools/audita_css.py              # só reescaneia arquivos que mudaram
+#   python tools/audita_css.py --completo   # ignora o cache
+#
+# Cada arquivo é escaneado de forma independente (em paralelo, num pool de
+# processos) e suas classes ficam em cache em .build-cache/audita-css.json,
+# validadas por mtime+tamanho e, se estes mudarem, pelo hash do conteúdo.
+# Os conjuntos por arquivo são unidos à medida que chegam do pool.
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
+import os
 import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from build_lib import CACHE_DIR, content_hash, write_if_changed
+from build_css import (
+    extract_css_classes, extract_used_from_html, extract_used_from_js, is_safelisted
+)
 
 CSS_GLOBS = ["styles/*.css"]
 HTML_GLOBS = [
@@ -16,18 +34,6 @@ HTML_GLOBS = [
 ]
 JS_GLOBS = ["scripts/**/*.js"]
 
-# ---- Config (ajuste aqui se mudar convenções) ----
-SAFELIST = {
-  # utilitários/core
-  "visually-hidden","sr-only-focusable","skip-link","js", "bg-surface", "shadow-1", "shadow-2",
-  # header/nav
-  "header","header__inner","logo","nav","nav__list","footer","footer__inner",
-  # comparador (injetadas por JS)
-  "chip","card","cmp-card","cmp-card__title","cmp-grid","cmp-cell","cmp-cell--label",
-  "cmp-colhead","cmp-colhead__box","cmp-colhead__txt","cmp-thumb","cmp-add-col","cmp-add-input","cmp-spacer", "compare-main", "page-compare"
-}
-SAFE_PREFIXES = ("is-","js-","cmp-")  # estados, hooks e família do comparador
-
 # Sugerir rename (HTML ↔ CSS)
 RENAME_SUGGESTIONS = {
   "breed-card__meta": "breed-card__body",
@@ -41,77 +47,147 @@ def glob(paths):
         out.extend(ROOT.glob(pat))
     return [p for p in out if p.exists()]
 
-def load_files(paths) -> str:
-    return "\n".join(p.read_text(encoding="utf-8", errors="ignore") for p in paths)
-
-def _norm(c: str) -> str:
-    """Normaliza nome de classe: remove ponto, pseudo, separadores."""
-    c = (c or "").strip()
-    if c.startswith("."):
-        c = c[1:]
-    c = re.split(r"[:\s,>+~]", c)[0]
-    return c
-
-def extract_css_classes(text: str) -> set[str]:
-    """Extrai classes definidas no CSS (sem pseudo)."""
-    raw = re.findall(r"\.[a-zA-Z0-9_-]+", text)
-    cleaned = []
-    for t in raw:
-        name = t[1:]
-        if not name or name[0].isdigit():
-            continue
-        if re.match(r"^\d*(rem|em|vw|vh|ms|s|px)$", name):
-            continue
-        name = re.split(r"[:\s]", name)[0]
-        cleaned.append(_norm(name))
-    return set(cleaned)
-
-def extract_used_from_html(text: str) -> set[str]:
-    """Extrai classes usadas do HTML estático (class="a b")."""
-    used = set()
-    for m in re.findall(r'class=(["\'])(.*?)\1', text, flags=re.S):
-        for cls in re.split(r"\s+", m[1].strip()):
-            if cls:
-                used.add(_norm(cls))
-    return used
-
-# ---- dentro de extract_used_from_js(text) ----
-def extract_used_from_js(text: str) -> set[str]:
-    """Extrai classes usadas em JS (classList, className, setAttribute, seletores CSS)."""
-    used = set()
-
-    # 1) classList.add/remove/toggle('a','b',"c")
-    for call in re.findall(r'classList\.(?:add|remove|toggle)\((.*?)\)', text, flags=re.S):
-        for token in re.findall(r'["\']([a-zA-Z0-9_-]+)["\']', call):
-            used.add(_norm(token))
-
-    # 2) Atribuição direta: el.className = "a b"
-    for value in re.findall(r'\.className\s*=\s*(["\'])(.*?)\1', text, flags=re.S):
-        for token in re.findall(r'[a-zA-Z0-9_-]+', value[1]):
-            used.add(_norm(token))
-
-    # 3) setAttribute('class', 'a b')
-    for value in re.findall(r'setAttribute\(\s*["\']class["\']\s*,\s*(["\'])(.*?)\1\)', text, flags=re.S):
-        for token in re.findall(r'[a-zA-Z0-9_-]+', value[1]):
-            used.add(_norm(token))
-
-    # 4) Template strings: class=`a b` (com crase)
-    for content in re.findall(r'class\s*=\s*`([^`]+)`', text, flags=re.S):
-        for token in re.findall(r'[a-zA-Z0-9_-]+', content):
-            used.add(_norm(token))
-
-    # 5) Seletores em querySelector/All, matches e closest: extrai .minhas-classe(s)
-    for sel in re.findall(r'(?:querySelector(?:All)?|matches|closest)\(\s*([\'"`])([^\'"`]+)\1\s*\)', text):
-        for token in re.findall(r'\.([a-zA-Z0-9_-]+)', sel[1]):
-            used.add(_norm(token))
-
-    return used
-
-
-def is_safelisted(cls: str) -> bool:
-    return cls in SAFELIST or any(cls.startswith(pref) for pref in SAFE_PREFIXES)
+# ---- Escaneamento por arquivo (com cache) ----
+EXTRATORES = {"css": extract_css_classes, "html": extract_used_from_html, "js": extract_used_from_js}
+CACHE_PATH = CACHE_DIR / "audita-css.json"
+# extratores/regras mudaram => cache inválido (os extratores ficam em build_css)
+CODE_HASH = content_hash(Path(__file__).read_bytes() + (ROOT/"scripts/build_css.py").read_bytes())
+
+def _scan(item):
+    """Worker do pool: (chave, tipo, caminho, hash anterior) -> (chave, hash, classes ou None se igual)."""
+    chave, tipo, path, h_ant = item
+    data = Path(path).read_bytes()
+    h = content_hash(data)
+    if h == h_ant:
+        return chave, h, None
+    return chave, h, sorted(EXTRATORES[tipo](data.decode("utf-8", errors="ignore")))
+
+class ClassCache:
+    """
+    Classes por arquivo entre execuções: {chave: [tipo, mtime_ns, tamanho, hash, classes]}.
+    No disco os conjuntos de classes são internados (páginas geradas do mesmo
+    template repetem o mesmo conjunto) e cada entrada guarda só o índice.
+    Só as entradas vistas na execução atual são gravadas (arquivos removidos saem).
+    """
+    def __init__(self, path=CACHE_PATH, enabled=True):
+        self.path = path
+        self.prev = {}
+        if enabled and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+                if data.get("code") == CODE_HASH:
+                    conjuntos = data["conjuntos"]
+                    self.prev = {k: [*e[:4], conjuntos[e[4]]] for k, e in data["arquivos"].items()}
+            except (ValueError, KeyError, IndexError, TypeError):
+                self.prev = {}
+        self.atual = {}
+
+    def save(self):
+        idx, conjuntos, arquivos = {}, [], {}
+        for chave, (*ent, classes) in self.atual.items():
+            t = tuple(classes)
+            i = idx.get(t)
+            if i is None:
+                i = idx[t] = len(conjuntos)
+                conjuntos.append(classes)
+            arquivos[chave] = [*ent, i]
+        CACHE_DIR.mkdir(exist_ok=True)
+        write_if_changed(self.path, json.dumps(
+            {"code": CODE_HASH, "conjuntos": conjuntos, "arquivos": arquivos},
+            ensure_ascii=False, separators=(",", ":")))
+
+def _chave(p: Path) -> str:
+    try:
+        return p.relative_to(ROOT).as_posix()
+    except ValueError:
+        return str(p.absolute())
+
+def scan(css_files, html_files, js_files, jobs=1, cache=None, stats=None):
+    """
+    (declaradas, usadas): união das classes de cada arquivo. Arquivos com
+    mtime/tamanho iguais aos do cache nem são lidos; os demais vão ao pool
+    (um arquivo tocado mas com o mesmo conteúdo não é reescaneado).
+    """
+    cache = cache or ClassCache(enabled=False)
+    declared, used = set(), set()
+    pendentes, tipos, stamps = [], {}, {}
+    for tipo, files in (("css", css_files), ("html", html_files), ("js", js_files)):
+        for p in files:
+            chave = _chave(p)
+            st = p.stat()
+            stamp = [st.st_mtime_ns, st.st_size]
+            ent = cache.prev.get(chave)
+            tipos[chave], stamps[chave] = tipo, stamp
+            if ent is not None and ent[0] == tipo and ent[1:3] == stamp:
+                cache.atual[chave] = ent
+                (declared if tipo == "css" else used).update(ent[4])
+            else:
+                pendentes.append((chave, tipo, str(p), ent[3] if ent is not None and ent[0] == tipo else None))
+
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(pendentes) > 1 else None
+    try:
+        res = (pool.map(_scan, pendentes, chunksize=max(1, len(pendentes) // (jobs * 4)))
+               if pool else map(_scan, pendentes))
+        reescaneados = 0
+        for chave, h, classes in res:
+            if classes is None:
+                classes = cache.prev[chave][4]
+            else:
+                reescaneados += 1
+            cache.atual[chave] = [tipos[chave], *stamps[chave], h, classes]
+            (declared if tipos[chave] == "css" else used).update(classes)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if stats is not None:
+        stats.update(arquivos=len(tipos), lidos=len(pendentes), reescaneados=reescaneados)
+    return declared, used
+
+def format_report(declared, used) -> str:
+    """Monta o texto do relatório de auditoria a partir dos conjuntos de classes."""
+    # Classificação
+    keep    = sorted([c for c in declared if (c in used) or is_safelisted(c)])
+    remove  = sorted([c for c in declared if (c not in used) and not is_safelisted(c)])
+    missing = sorted([u for u in used     if (u not in declared) and not is_safelisted(u)])
+
+    # Renames sugeridos
+    renames = []
+    for src, dst in RENAME_SUGGESTIONS.items():
+        if src in declared and (dst in used or dst in declared):
+            renames.append((src, dst))
+
+    out = []
+    out.append("=== AUDITORIA DE CSS (HTML + JS) ===\n\n")
+    out.append(f"Declaradas: {len(declared)} • Usadas: {len(used)} • KEEP: {len(keep)} • REMOVE: {len(remove)} • MISSING: {len(missing)}\n\n")
+    if renames:
+        out.append("---- RENAME SUGERIDO ----\n")
+        for s,d in renames:
+            out.append(f"{s}  →  {d}\n")
+        out.append("\n")
+    out.append("---- REMOVE (candidatas) ----\n")
+    for c in remove:
+        out.append(c + "\n")
+    out.append("\n---- MISSING (HTML/JS usa e não tem no CSS) ----\n")
+    for m in missing:
+        out.append(m + "\n")
+    out.append("\n---- KEEP (usadas/safelisted) ----\n")
+    for k in keep:
+        out.append(k + "\n")
+    return "".join(out)
+
+def build_report(css_files, html_files, js_files, jobs=1, cache=None, stats=None) -> str:
+    """Relatório de auditoria a partir das listas de arquivos (ver scan)."""
+    return format_report(*scan(css_files, html_files, js_files, jobs, cache, stats))
 
 def main():
+    ap = argparse.ArgumentParser(description="Auditoria de classes CSS (declaradas × usadas em HTML + JS).")
+    ap.add_argument("--jobs", "-j", type=int, default=0, metavar="N",
+                    help="processos para escanear os arquivos (padrão: 0 = nº de CPUs)")
+    ap.add_argument("--completo", action="store_true",
+                    help="reescaneia tudo, ignorando o cache de classes por arquivo")
+    args = ap.parse_args()
+
     css_files  = glob(CSS_GLOBS)
     html_files = glob(HTML_GLOBS)
     js_files   = glob(JS_GLOBS)
@@ -123,48 +199,17 @@ def main():
         print("Nenhum HTML encontrado.")
         sys.exit(1)
 
-    css_text  = load_files(css_files)
-    html_text = load_files(html_files)
-    js_text   = load_files(js_files)
-
-    # Conjuntos normalizados
-    declared = extract_css_classes(css_text)
-    used = extract_used_from_html(html_text) | extract_used_from_js(js_text)
-
-    # Classificação
-    keep    = sorted([c for c in declared if (c in used) or is_safelisted(c)])
-    remove  = sorted([c for c in declared if (c not in used) and not is_safelisted(c)])
-    missing = sorted([u for u in used     if (u not in declared) and not is_safelisted(u)])
-
-    # Renames sugeridos
-    renames = []
-    for src, dst in RENAME_SUGGESTIONS.items():
-        if src in declared and (dst in used or dst in declared):
-            renames.append((src, dst))
+    cache = ClassCache(enabled=not args.completo)
+    stats = {}
+    texto = build_report(css_files, html_files, js_files, args.jobs, cache, stats)
+    cache.save()
 
     outdir = ROOT / "styles" / "dist"
     outdir.mkdir(parents=True, exist_ok=True)
     report = outdir / "audit-css-HTML+JS.txt"
+    write_if_changed(report, texto)
 
-    with report.open("w", encoding="utf-8") as f:
-        f.write("=== AUDITORIA DE CSS (HTML + JS) ===\n\n")
-        f.write(f"Declaradas: {len(declared)} • Usadas: {len(used)} • KEEP: {len(keep)} • REMOVE: {len(remove)} • MISSING: {len(missing)}\n\n")
-        if renames:
-            f.write("---- RENAME SUGERIDO ----\n")
-            for s,d in renames:
-                f.write(f"{s}  →  {d}\n")
-            f.write("\n")
-        f.write("---- REMOVE (candidatas) ----\n")
-        for c in remove:
-            f.write(c + "\n")
-        f.write("\n---- MISSING (HTML/JS usa e não tem no CSS) ----\n")
-        for m in missing:
-            f.write(m + "\n")
-        f.write("\n---- KEEP (usadas/safelisted) ----\n")
-        for k in keep:
-            f.write(k + "\n")
-
-    print(f"✔ Relatório: {report}")
+    print(f"✔ Relatório: {report} — {stats['arquivos']} arquivos, {stats['reescaneados']} reescaneados")
 
 if __name__ == "__main__":
     main()
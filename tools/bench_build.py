@@ -0,0 +1,205 @@
+# tools/bench_build.py
+# Benchmark do pipeline de build sobre catálogos sintéticos (tools/catalogo_sintetico.py).
+#
+#   python tools/bench_build.py                       # 10, 1k, 10k e 100k raças
+#   python tools/bench_build.py --sizes 10 1000 -o bench.json
+#
+# Cada tamanho roda num subprocesso próprio para que o pico de memória (RSS)
+# seja medido isoladamente. Tudo é gravado em diretórios temporários; a árvore
+# do repositório não é alterada.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+DEFAULT_SIZES = [10, 1000, 10000, 100000]
+STAGES = [
+  "load_all", "aliases", "score", "jsonld", "detail_vars", "template", "write",
+  "gerar_breeds_cliente", "audita_css",
+]
+
+# ---- Medição ----
+class Cronometro:
+    """Acumula tempo de parede e de CPU por etapa (várias chamadas somam)."""
+    def __init__(self):
+        self.wall = dict.fromkeys(STAGES, 0.0)
+        self.cpu = dict.fromkeys(STAGES, 0.0)
+
+    def medir(self, etapa, fn, *args):
+        w0, c0 = time.perf_counter(), time.process_time()
+        out = fn(*args)
+        self.wall[etapa] += time.perf_counter() - w0
+        self.cpu[etapa] += time.process_time() - c0
+        return out
+
+def pico_rss_mb():
+    if resource is None:
+        return None
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KiB, macOS em bytes
+    return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+# ---- Um tamanho (roda no subprocesso) ----
+def bench_um(n, seed, usar_tracemalloc):
+    import gerar_paginas as gp
+    from build_lib import (
+        iter_racas, iter_batches, BreedIndex, score_all, score_row,
+        scores_from_row, write_if_changed
+    )
+    from gerar_breeds_cliente import build_client
+    from catalogo_sintetico import gerar_catalogo, gerar_aliases, write_catalogo
+    import audita_css
+
+    if usar_tracemalloc:
+        tracemalloc.start()
+    crono = Cronometro()
+    with tempfile.TemporaryDirectory(prefix="bench-build-") as tmp:
+        tmp = Path(tmp)
+        catalogo = tmp / "racas.ndjson"
+        write_catalogo(catalogo, gerar_catalogo(n, gp.rules, seed))
+
+        racas = crono.medir("load_all", lambda: list(iter_racas(catalogo)))
+        aliases_map = gerar_aliases(racas, seed)
+        gp.configure(gp.site, gp.rules, aliases_map, tmp)
+
+        def _aliases():
+            idx = BreedIndex(aliases_map)
+            for r in racas:
+                idx.add(r)
+            return idx
+        crono.medir("aliases", _aliases)
+
+        # Páginas de raça em lotes (como no gerar_paginas) para não manter todo o HTML em memória
+        html_files, bytes_html = [], 0
+        for lote in iter_batches(racas, gp.BATCH_SIZE):
+            def _scores():
+                cols = score_all(lote, gp.SCORING)
+                rows = [score_row(cols, i) for i in range(len(lote))]
+                for r, row in zip(lote, rows):
+                    scores_from_row(r, row, gp.SCORING)
+                return rows
+            rows = crono.medir("score", _scores)
+
+            def _jsonld():
+                for r in lote:
+                    url = gp.detail_url(r)
+                    gp.jsonld_breed(r, url)
+                    gp.jsonld_breadcrumb(r["nome"], url, gp.BASE)
+            crono.medir("jsonld", _jsonld)
+
+            vars_ = crono.medir("detail_vars", lambda: [gp.detail_vars(r, row) for r, row in zip(lote, rows)])
+            htmls = crono.medir("template", lambda: [gp.TPL["detalhe-raca.html"].safe_substitute(v) for v in vars_])
+
+            def _write():
+                for v, html in zip(vars_, htmls):
+                    p = tmp / "racas" / f"{v['slug']}.html"
+                    write_if_changed(p, html)
+                    html_files.append(p)
+            crono.medir("write", _write)
+            bytes_html += sum(len(h.encode("utf-8")) for h in htmls)
+
+        crono.medir("gerar_breeds_cliente",
+                    build_client, iter(racas), gp.SCORING, aliases_map, tmp / "data")
+
+        css_files = audita_css.glob(audita_css.CSS_GLOBS)
+        js_files = audita_css.glob(audita_css.JS_GLOBS)
+        crono.medir("audita_css", audita_css.build_report, css_files, html_files, js_files)
+
+    etapas = {
+        e: {"s": round(crono.wall[e], 4), "cpu_s": round(crono.cpu[e], 4),
+            "racas_por_s": round(n / crono.wall[e], 1) if crono.wall[e] else None}
+        for e in STAGES
+    }
+    total = sum(crono.wall.values())
+    out = {
+        "n": n,
+        "etapas": etapas,
+        "total_s": round(total, 4),
+        "racas_por_s": round(n / total, 1) if total else None,
+        "html_bytes": bytes_html,
+        "pico_rss_mb": pico_rss_mb(),
+    }
+    if usar_tracemalloc:
+        out["pico_tracemalloc_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    return out
+
+# ---- Orquestração ----
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def resumo(res):
+    cols = ["n"] + STAGES + ["total", "raças/s", "RSS MB"]
+    linhas = [cols]
+    for r in res:
+        linhas.append([str(r["n"])] + [f"{r['etapas'][e]['s']:.3f}" for e in STAGES]
+                      + [f"{r['total_s']:.3f}", str(r["racas_por_s"]), str(r["pico_rss_mb"])])
+    larg = [max(len(l[i]) for l in linhas) for i in range(len(cols))]
+    return "\n".join("  ".join(c.rjust(w) for c, w in zip(l, larg)) for l in linhas)
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark do build sobre catálogos sintéticos.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, metavar="N",
+                    help="tamanhos do catálogo (padrão: 10 1000 10000 100000)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--tracemalloc", action="store_true",
+                    help="mede também o pico de alocações Python (mais lento)")
+    ap.add_argument("-o", "--out", type=Path, default=None,
+                    help="grava o resultado em JSON (padrão: stdout)")
+    ap.add_argument("--_um", type=int, default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._um is not None:
+        print(json.dumps(bench_um(args._um, args.seed, args.tracemalloc)))
+        return
+
+    resultados = []
+    for n in args.sizes:
+        print(f"… {n} raças", file=sys.stderr)
+        cmd = [sys.executable, __file__, "--_um", str(n), "--seed", str(args.seed)]
+        if args.tracemalloc:
+            cmd.append("--tracemalloc")
+        proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        resultados.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    rel = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "cpus": os.cpu_count(),
+            "seed": args.seed,
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "resultados": resultados,
+    }
+    texto = json.dumps(rel, ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(texto + "\n", encoding="utf-8")
+        print(f"✔ Benchmark: {args.out}", file=sys.stderr)
+    else:
+        print(texto)
+    print(resumo(resultados), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+# tools/bench_colunar.py
+# Tamanho e tempo de parse do breeds-client.json (formato atual) × breeds-client.bin
+# (gerar_breeds_cliente.py --colunar) sobre um catálogo sintético.
+#
+#   python tools/bench_colunar.py                  # 10k raças
+#   python tools/bench_colunar.py -n 1000 --repeticoes 10 -o colunar.json
+#
+# O parse é medido em Python (json.loads × decode_colunar) e, com o Node no
+# PATH, em JS: JSON.parse × o decodeColunar do compare.js — só o índice (o que
+# o comparador monta ao carregar) e com todos os registros materializados.
+# Tudo é gravado num diretório temporário; a árvore do repositório não é alterada.
+import argparse
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+sys.path.insert(0, str(ROOT / "tools"))
+
+# Mede o decodeColunar do compare.js (extraído do IIFE por decodificador_js)
+JS_BENCH = r"""
+const fs = require("fs");
+const [jsonPath, binPath, reps] = process.argv.slice(1);
+const buf = (p) => { const b = fs.readFileSync(p); return b.buffer.slice(b.byteOffset, b.byteOffset + b.length); };
+const jsonBuf = buf(jsonPath), binBuf = buf(binPath);
+
+let vivo = null;   // mantém o resultado alcançável durante a medida do heap
+function medir(fn) {
+  let melhor = Infinity, heap = 0;
+  for (let r = 0; r < +reps; r++) {
+    vivo = null;
+    global.gc?.();
+    const h0 = process.memoryUsage().heapUsed;
+    const t0 = process.hrtime.bigint();
+    vivo = fn();
+    const ms = Number(process.hrtime.bigint() - t0) / 1e6;
+    if (ms < melhor) melhor = ms;
+    global.gc?.();
+    heap = process.memoryUsage().heapUsed - h0;
+  }
+  vivo = null;
+  return { ms: +melhor.toFixed(2), heap_mb: global.gc ? +(heap / 2 ** 20).toFixed(1) : null };
+}
+
+const res = {
+  json: medir(() => JSON.parse(new TextDecoder().decode(jsonBuf))),
+  colunar_indice: medir(() => decodeColunar(binBuf).resumo()),
+  colunar_tudo: medir(() => {
+    const t = decodeColunar(binBuf);
+    return Array.from({ length: t.n }, (_, i) => t.get(i));
+  }),
+};
+console.log(JSON.stringify(res));
+"""
+
+def decodificador_js() -> str:
+    """Fonte de decodeColunar, recortada do compare.js (do `function` ao `}` na mesma indentação)."""
+    linhas = (ROOT / "scripts" / "compare.js").read_text(encoding="utf-8").splitlines()
+    ini = next(i for i, l in enumerate(linhas) if l.lstrip().startswith("function decodeColunar("))
+    recuo = linhas[ini][:len(linhas[ini]) - len(linhas[ini].lstrip())]
+    fim = linhas.index(recuo + "}", ini)
+    return "\n".join(linhas[ini:fim + 1])
+
+def tamanhos(data: bytes) -> dict:
+    return {
+        "bytes": len(data),
+        "gzip": len(gzip.compress(data, compresslevel=9, mtime=0)),
+        "br": len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+def melhor_tempo(fn, arg, reps):
+    melhor = float("inf")
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        fn(arg)
+        melhor = min(melhor, time.perf_counter() - t0)
+    return round(melhor * 1000, 2)
+
+def bench(n, seed, reps):
+    from build_lib import load_site_rules, iter_racas, ScoringContext
+    from gerar_breeds_cliente import build_client, decode_colunar, minify, COLUNAR
+    from catalogo_sintetico import gerar_catalogo, gerar_aliases, write_catalogo
+
+    site, rules = load_site_rules()
+    with tempfile.TemporaryDirectory(prefix="bench-colunar-") as tmp:
+        tmp = Path(tmp)
+        catalogo = tmp / "racas.ndjson"
+        racas = gerar_catalogo(n, rules, seed)
+        write_catalogo(catalogo, racas)
+        out = tmp / "data"
+        build_client(iter_racas(catalogo), ScoringContext(rules), gerar_aliases(racas, seed), out, colunar=True)
+
+        js_path, bin_path = out / "breeds-client.json", out / COLUNAR
+        texto, binario = js_path.read_bytes(), bin_path.read_bytes()
+        recs = json.loads(texto)
+        if decode_colunar(binario) != recs:
+            raise SystemExit("[erro] decode_colunar não reproduz o breeds-client.json")
+        compacto = minify(recs).encode("utf-8")
+
+        res = {
+            "n": n,
+            "tamanho": {"json": tamanhos(texto), "json_compacto": tamanhos(compacto),
+                        "colunar": tamanhos(binario)},
+            "parse_py_ms": {"json": melhor_tempo(json.loads, texto, reps),
+                            "colunar": melhor_tempo(decode_colunar, binario, reps)},
+            "parse_js_ms": None,
+        }
+        node = shutil.which("node")
+        if node:
+            proc = subprocess.run(
+                [node, "--expose-gc", "-e", decodificador_js() + "\n" + JS_BENCH,
+                 str(js_path), str(bin_path), str(reps)],
+                capture_output=True, text=True, check=True)
+            res["parse_js_ms"] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return res
+
+def resumo(r):
+    t = r["tamanho"]
+    linhas = [["", "bytes", "gzip", "br"]]
+    for k in ("json", "json_compacto", "colunar"):
+        linhas.append([k] + [f"{t[k][c]:,}" if t[k][c] is not None else "—" for c in ("bytes", "gzip", "br")])
+    larg = [max(len(l[i]) for l in linhas) for i in range(4)]
+    txt = ["  ".join(c.rjust(w) for c, w in zip(l, larg)) for l in linhas]
+    py = r["parse_py_ms"]
+    txt.append(f"parse Python: json {py['json']} ms × colunar {py['colunar']} ms")
+    js = r["parse_js_ms"]
+    if js:
+        txt.append(f"parse JS: JSON.parse {js['json']['ms']} ms × colunar (índice) {js['colunar_indice']['ms']} ms"
+                   f" × colunar (tudo) {js['colunar_tudo']['ms']} ms")
+        if js["json"]["heap_mb"] is not None:
+            txt.append(f"heap JS: json {js['json']['heap_mb']} MB × colunar (índice) {js['colunar_indice']['heap_mb']} MB"
+                       f" × colunar (tudo) {js['colunar_tudo']['heap_mb']} MB")
+    else:
+        txt.append("parse JS: node não encontrado")
+    return "\n".join(txt)
+
+def main():
+    ap = argparse.ArgumentParser(description="Compara breeds-client.json e o formato colunar (tamanho e parse).")
+    ap.add_argument("-n", type=int, default=10000, help="raças no catálogo sintético (padrão: 10000)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeticoes", type=int, default=5, metavar="N",
+                    help="repetições por medida; vale o melhor tempo (padrão: 5)")
+    ap.add_argument("-o", "--out", type=Path, default=None,
+                    help="grava o resultado em JSON (padrão: stdout)")
+    args = ap.parse_args()
+
+    res = bench(args.n, args.seed, args.repeticoes)
+    texto = json.dumps(res, ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(texto + "\n", encoding="utf-8")
+        print(f"✔ Benchmark: {args.out}", file=sys.stderr)
+    else:
+        print(texto)
+    print(resumo(res), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# tools/bench_preview.py
+# Teste de carga do servidor de preview (tools/servidor_preview.py).
+#
+#   python tools/bench_preview.py                          # 10 conexões, 5 s, gzip
+#   python tools/bench_preview.py -c 50 -d 10 --encoding br -o carga.json
+#   python tools/bench_preview.py --revalidar              # If-None-Match (caminho do 304)
+#
+# Conexões keep-alive concorrentes (asyncio, só stdlib) percorrem as URLs em
+# ciclo; reporta requisições/s, latência (p50/p95/p99) e o tamanho servido
+# por URL (com e sem compressão).
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+def urls_padrao():
+    """Home, lista, comparador, dados e as páginas de raça do catálogo."""
+    from build_lib import iter_racas, slugify
+    urls = ["/", "/racas/", "/comparar/", "/data/breeds-client.json",
+            "/styles/ui.css", "/scripts/main.js", "/assets/icons/sprite.svg"]
+    urls += [f"/racas/{slugify(r['nome'])}.html" for r in iter_racas()]
+    return urls
+
+async def requisicao(reader, writer, host, url, encoding, etag=None):
+    """Envia um GET e lê a resposta inteira; retorna (status, headers, tamanho do corpo)."""
+    h = [f"GET {url} HTTP/1.1", f"Host: {host}"]
+    if encoding:
+        h.append(f"Accept-Encoding: {encoding}")
+    if etag:
+        h.append(f"If-None-Match: {etag}")
+    writer.write(("\r\n".join(h) + "\r\n\r\n").encode("latin-1"))
+    await writer.drain()
+    bruto = await reader.readuntil(b"\r\n\r\n")
+    linhas = bruto.decode("latin-1").split("\r\n")
+    status = int(linhas[0].split(" ", 2)[1])
+    headers = {}
+    for linha in linhas[1:]:
+        k, sep, v = linha.partition(":")
+        if sep:
+            headers[k.strip().lower()] = v.strip()
+    n = int(headers.get("content-length", 0))
+    if n:
+        await reader.readexactly(n)
+    return status, headers, n
+
+async def cliente(host, porta, urls, encoding, revalidar, fim, lat, status, offset):
+    reader, writer = await asyncio.open_connection(host, porta)
+    etags = {}
+    i = offset
+    try:
+        while time.perf_counter() < fim:
+            url = urls[i % len(urls)]
+            i += 1
+            t0 = time.perf_counter()
+            st, headers, _ = await requisicao(reader, writer, host, url, encoding,
+                                              etags.get(url) if revalidar else None)
+            lat.append(time.perf_counter() - t0)
+            status[st] = status.get(st, 0) + 1
+            if "etag" in headers:
+                etags[url] = headers["etag"]
+    finally:
+        writer.close()
+
+async def tamanhos(host, porta, urls):
+    """Bytes servidos por URL: sem compressão, gzip e br (se o servidor oferecer)."""
+    reader, writer = await asyncio.open_connection(host, porta)
+    out = {}
+    try:
+        for url in urls:
+            linha = {}
+            for enc in (None, "gzip", "br"):
+                st, headers, n = await requisicao(reader, writer, host, url, enc)
+                if enc is None or headers.get("content-encoding") == enc:
+                    linha[enc or "identity"] = n
+                linha["status"] = st
+            out[url] = linha
+    finally:
+        writer.close()
+    return out
+
+def percentil(xs, p):
+    return xs[min(len(xs) - 1, int(len(xs) * p))] if xs else None
+
+async def rodar(args):
+    urls = args.urls or urls_padrao()
+    lat, status = [], {}
+    t0 = time.perf_counter()
+    fim = t0 + args.duracao
+    await asyncio.gather(*(
+        cliente(args.host, args.porta, urls, args.encoding, args.revalidar, fim, lat, status, i)
+        for i in range(args.conexoes)
+    ))
+    dur = time.perf_counter() - t0
+    lat.sort()
+    ms = lambda x: round(x * 1000, 3) if x is not None else None
+    return {
+        "config": {"conexoes": args.conexoes, "duracao_s": args.duracao,
+                   "encoding": args.encoding, "revalidar": args.revalidar, "urls": len(urls)},
+        "requisicoes": len(lat),
+        "req_por_s": round(len(lat) / dur, 1),
+        "latencia_ms": {"p50": ms(percentil(lat, 0.50)), "p95": ms(percentil(lat, 0.95)),
+                        "p99": ms(percentil(lat, 0.99)),
+                        "media": ms(statistics.fmean(lat)) if lat else None},
+        "status": {str(k): v for k, v in sorted(status.items())},
+        "tamanhos": await tamanhos(args.host, args.porta, urls),
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Teste de carga do servidor de preview.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--porta", "-p", type=int, default=8000)
+    ap.add_argument("--conexoes", "-c", type=int, default=10)
+    ap.add_argument("--duracao", "-d", type=float, default=5.0, metavar="S")
+    ap.add_argument("--encoding", default="gzip",
+                    help='Accept-Encoding enviado (ex.: "br", "gzip", "" para nenhum)')
+    ap.add_argument("--revalidar", action="store_true",
+                    help="reenvia o ETag recebido (If-None-Match) para medir o caminho do 304")
+    ap.add_argument("--urls", nargs="+", default=None, help="URLs (padrão: home, lista, dados e raças)")
+    ap.add_argument("-o", "--out", type=Path, default=None, help="grava o resultado em JSON")
+    args = ap.parse_args()
+
+    res = asyncio.run(rodar(args))
+    texto = json.dumps(res, ensure_ascii=False, indent=2)
+    if args.out:
+        args.out.write_text(texto + "\n", encoding="utf-8")
+    print(f"{res['requisicoes']} requisições em {args.duracao:.0f}s — {res['req_por_s']} req/s — "
+          f"p50 {res['latencia_ms']['p50']} ms, p99 {res['latencia_ms']['p99']} ms — status {res['status']}",
+          file=sys.stderr)
+    for url, t in res["tamanhos"].items():
+        comp = " ".join(f"{k} {v}" for k, v in t.items() if k not in ("identity", "status"))
+        print(f"  {t['status']} {url}: {t['identity']} B" + (f" ({comp})" if comp else ""), file=sys.stderr)
+    if not args.out:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
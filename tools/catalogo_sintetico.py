@@ -0,0 +1,148 @@
+# tools/catalogo_sintetico.py
+# Gera catálogos sintéticos de raças (racas.json / racas.ndjson) para benchmarks.
+# Os atributos seguem distribuições plausíveis sobre os vocabulários do rules.json.
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+from build_lib import slugify  # noqa: E402
+
+# ---- Distribuições (pesos relativos) ----
+# nº aproximado de raças reconhecidas por grupo FCI; None = SRD / sem grupo
+FCI_GRUPO_PESOS = {1: 50, 2: 50, 3: 35, 4: 3, 5: 50, 6: 75, 7: 40, 8: 25, 9: 30, 10: 15, None: 5}
+PORTE_PESOS = {"mini": 10, "pequeno": 30, "medio": 30, "grande": 22, "gigante": 8}
+PELAGEM_PESOS = {
+  "curta": 35, "media": 15, "longa": 15, "dupla_curta": 15,
+  "dupla_longa": 10, "encaracolada": 7, "sem_pelo": 3,
+}
+# subpelo condicionado à pelagem
+SUBPELO_PESOS = {
+  "dupla_curta": {"denso": 70, "leve": 30},
+  "dupla_longa": {"denso": 85, "leve": 15},
+  "sem_pelo": {"nenhum": 100},
+  "encaracolada": {"nenhum": 70, "leve": 30},
+}
+SUBPELO_PADRAO = {"nenhum": 50, "leve": 35, "denso": 15}
+TOSA_POR_PELAGEM = {
+  "encaracolada": {"regular_4_6": 60, "regular_8_10": 40},
+  "longa": {"regular_8_10": 40, "ocasional": 50, "nao": 10},
+  "media": {"ocasional": 40, "nao": 60},
+}
+# função típica por grupo FCI
+FUNCAO_POR_GRUPO = {
+  1: "herding", 2: "guard", 3: "terrier", 4: "scent", 5: "guard",
+  6: "scent", 7: "pointer", 8: "retriever", 9: "companhia", 10: "sight", None: "companhia",
+}
+CLIMAS = ["temperado", "frio", "tropical", "arido", "variado"]
+MEDIDAS_POR_PORTE = {
+  # (altura cm, peso kg) — faixas mín/máx
+  "mini": ((15, 25), (1, 4)),
+  "pequeno": ((25, 40), (4, 12)),
+  "medio": ((40, 55), (12, 27)),
+  "grande": ((55, 68), (27, 45)),
+  "gigante": ((68, 85), (45, 90)),
+}
+SILABAS = ["ba", "ca", "da", "fe", "gi", "la", "ma", "no", "pa", "ri", "sa", "ta", "vo", "xu", "ze", "lan", "ter", "bor", "min", "gal"]
+SUFIXOS = ["", " Inglês", " Alemão", " Brasileiro", " Japonês", " Francês", " de Pelo Longo", " Miniatura"]
+
+def _pick(rnd, pesos):
+    ks = list(pesos)
+    return rnd.choices(ks, weights=[pesos[k] for k in ks])[0]
+
+def _faixa(rnd, lo_hi, largura):
+    lo, hi = lo_hi
+    a = rnd.randint(lo, max(lo, hi - largura))
+    return f"{a}–{a + largura}"
+
+def _nome(rnd, i):
+    base = "".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 3))).capitalize()
+    return f"{base}{rnd.choice(SUFIXOS)} {i}"
+
+def gerar_raca(rnd, i, rules):
+    grupo = _pick(rnd, FCI_GRUPO_PESOS)
+    porte = _pick(rnd, PORTE_PESOS)
+    pelagem = _pick(rnd, PELAGEM_PESOS)
+    subpelo = _pick(rnd, SUBPELO_PESOS.get(pelagem, SUBPELO_PADRAO))
+    tosa = _pick(rnd, TOSA_POR_PELAGEM.get(pelagem, {"nao": 100}))
+
+    funcoes = [FUNCAO_POR_GRUPO[grupo]]
+    if rnd.random() < 0.3:
+        extra = rnd.choice(list(rules["mental_funcoes"]))
+        if extra not in funcoes:
+            funcoes.append(extra)
+
+    alt, peso = MEDIDAS_POR_PORTE[porte]
+    nome = _nome(rnd, i)
+    return {
+        "slug": slugify(nome),
+        "nome": nome,
+        "notas": {"resumo": f"Raça sintética {i} para benchmark.", "regras": {"rules_version": rules.get("rules_version", "1.0.0")}},
+        "origem": rnd.choice(["Reino Unido", "Alemanha", "França", "Brasil", "Japão", "—"]),
+        "fci_codigo": str(rnd.randint(1, 400)) if grupo else "—",
+        "medidas": {
+            "altura_cm": {"macho": _faixa(rnd, alt, 4), "femea": _faixa(rnd, alt, 4)},
+            "peso_kg": {"macho": _faixa(rnd, peso, 5), "femea": _faixa(rnd, peso, 5)},
+            "expectativa_anos": _faixa(rnd, (8, 16), 2),
+        },
+        "atributos": {
+            "fci_grupo": grupo,
+            "porte": porte,
+            "braquicefalico": rnd.random() < 0.08,
+            "pelagem_tipo": pelagem,
+            "subpelo": subpelo,
+            "shedding_estacao": _pick(rnd, {"baixo": 40, "moderado": 40, "alto": 20}),
+            "necessita_tosa": tosa,
+            "dobras_cutaneas": rnd.random() < 0.06,
+            "funcoes": funcoes,
+            "origem_clima": rnd.sample(CLIMAS, rnd.randint(1, 2)),
+        },
+        "popularidade": {"br": rnd.randint(0, 100), "global": rnd.randint(0, 100), "us": rnd.randint(0, 100)},
+        "foto": "/assets/breeds/_placeholder.jpg",
+        "foto_w": 1200,
+        "foto_h": 800,
+        "foto_credito": "—",
+    }
+
+def gerar_catalogo(n, rules, seed=0):
+    """Itera `n` raças sintéticas (determinístico para a mesma seed)."""
+    rnd = random.Random(seed)
+    for i in range(n):
+        yield gerar_raca(rnd, i, rules)
+
+def gerar_aliases(racas, seed=0):
+    """Mapa slug -> aliases para ~30% das raças (formato de aliases_oficiais.json)."""
+    rnd = random.Random(seed + 1)
+    out = {}
+    for r in racas:
+        if rnd.random() < 0.3:
+            base = r["nome"].rsplit(" ", 1)[0]
+            out[r["slug"]] = [base, base.split(" ")[0]][: rnd.randint(1, 2)]
+    return out
+
+def write_catalogo(path: Path, racas):
+    """Grava em NDJSON (streaming) ou JSON conforme a extensão."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        if path.suffix == ".ndjson":
+            for r in racas:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        else:
+            json.dump(list(racas), f, ensure_ascii=False)
+
+def main():
+    ap = argparse.ArgumentParser(description="Gera um catálogo sintético de raças.")
+    ap.add_argument("n", type=int, help="número de raças")
+    ap.add_argument("-o", "--out", type=Path, required=True, help="arquivo de saída (.json ou .ndjson)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rules = json.loads((ROOT / "data" / "rules.json").read_text(encoding="utf-8"))
+    write_catalogo(args.out, gerar_catalogo(args.n, rules, args.seed))
+    print(f"✔ {args.n} raças em {args.out}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
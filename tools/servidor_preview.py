@@ -0,0 +1,295 @@
+# tools/servidor_preview.py
+# Servidor local de preview (asyncio, só stdlib): serve o site a partir da
+# memória, com ETag forte (hash do conteúdo), 304 e gzip/brotli negociados.
+#
+#   python tools/servidor_preview.py                 # árvore publicada (base_url do site.json)
+#   python tools/servidor_preview.py --local         # renderiza com base_url = http://host:porta
+#
+# Com --local as páginas são geradas por gerar_paginas.build() em
+# .build-cache/preview/ (build incremental) e refeitas quando data/ ou
+# templates/ mudam; o restante (assets, estilos, scripts, dados) vem da raiz.
+import argparse
+import asyncio
+import gzip
+import hashlib
+import mimetypes
+import os
+import sys
+import time
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "scripts"))
+
+PREVIEW_DIR = ROOT / ".build-cache" / "preview"
+
+# Extensões publicadas; diretórios começando com "." e os de código/ferramentas ficam de fora
+EXTENSOES = {
+  ".html", ".css", ".js", ".json", ".svg", ".xml", ".txt", ".webmanifest",
+  ".png", ".jpg", ".jpeg", ".webp", ".avif", ".gif", ".ico", ".woff2", ".bin",
+}
+IGNORAR_DIRS = {"__pycache__", "node_modules", "tools", "templates", "docs"}
+COMPRIMIVEIS = (".html", ".css", ".js", ".json", ".svg", ".xml", ".txt", ".webmanifest", ".bin")
+MIN_COMPRIMIR = 256  # bytes
+
+mimetypes.add_type("application/manifest+json", ".webmanifest")
+mimetypes.add_type("image/avif", ".avif")
+
+# ---- Arquivos em memória ----
+class Entrada:
+    """Um arquivo servido: bytes, ETag e variantes comprimidas (geradas sob demanda)."""
+    __slots__ = ("body", "etag", "ctype", "stamp", "variantes")
+
+    def __init__(self, body, ctype, stamp):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:20]
+        self.ctype = ctype
+        self.stamp = stamp
+        self.variantes = {}
+
+    def comprimivel(self):
+        return len(self.body) >= MIN_COMPRIMIR and self.ctype.split(";")[0] in TIPOS_COMPRIMIVEIS
+
+    def variante(self, enc):
+        """Corpo na codificação `enc` ("br" / "gzip"), calculado uma única vez."""
+        v = self.variantes.get(enc)
+        if v is None:
+            if enc == "br":
+                v = brotli.compress(self.body, quality=5)
+            else:
+                v = gzip.compress(self.body, compresslevel=6, mtime=0)
+            self.variantes[enc] = v
+        return v
+
+TIPOS_COMPRIMIVEIS = {mimetypes.guess_type("x" + e)[0] or "application/octet-stream" for e in COMPRIMIVEIS}
+
+def _ctype(path: Path):
+    t = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    if t.startswith("text/") or t in ("application/json", "application/javascript", "image/svg+xml"):
+        t += "; charset=utf-8"
+    return t
+
+def _varrer(raiz: Path):
+    """(url, caminho) dos arquivos publicáveis sob `raiz`."""
+    for dirpath, dirnames, filenames in os.walk(raiz):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d not in IGNORAR_DIRS]
+        for nome in filenames:
+            p = Path(dirpath) / nome
+            if p.suffix.lower() in EXTENSOES:
+                yield "/" + p.relative_to(raiz).as_posix(), p
+
+class Arquivos:
+    """
+    Snapshot em memória das raízes (a primeira tem prioridade). refresh()
+    relê só o que mudou (mtime/tamanho) e troca o dicionário de uma vez.
+    """
+    def __init__(self, raizes):
+        self.raizes = raizes
+        self.entradas = {}
+        self.refresh()
+
+    def refresh(self):
+        novas, lidos = {}, 0
+        for raiz in self.raizes:
+            if not raiz.exists():
+                continue
+            for url, p in _varrer(raiz):
+                if url in novas:   # já servido por uma raiz prioritária
+                    continue
+                st = p.stat()
+                stamp = (st.st_mtime_ns, st.st_size, str(p))
+                e = self.entradas.get(url)
+                if e is None or e.stamp != stamp:
+                    e = Entrada(p.read_bytes(), _ctype(p), stamp)
+                    lidos += 1
+                novas[url] = e
+        mudou = lidos or len(novas) != len(self.entradas)
+        self.entradas = novas
+        return mudou
+
+    def get(self, path):
+        e = self.entradas.get(path)
+        if e is None and (path.endswith("/") or "." not in path.rsplit("/", 1)[-1]):
+            e = self.entradas.get(path.rstrip("/") + "/index.html")
+        return e
+
+# ---- HTTP ----
+STATUS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+def negociar(accept_encoding):
+    """Escolhe br/gzip/None pelo Accept-Encoding (respeita q=0)."""
+    aceitas = {}
+    for parte in accept_encoding.split(","):
+        nome, _, params = parte.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if nome:
+            aceitas[nome.strip().lower()] = q
+    for enc in (("br", "gzip") if brotli else ("gzip",)):
+        if aceitas.get(enc, aceitas.get("*", 0)) > 0:
+            return enc
+    return None
+
+def etag_confere(if_none_match, etag):
+    if if_none_match.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in if_none_match.split(","))
+
+def resposta(status, headers, body=b""):
+    linhas = [f"HTTP/1.1 {status} {STATUS[status]}"]
+    linhas += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1") + body
+
+class Servidor:
+    def __init__(self, arquivos, log=False):
+        self.arquivos = arquivos
+        self.log = log
+        self.requisicoes = 0
+
+    def responder(self, metodo, alvo, headers):
+        base = {"Date": formatdate(usegmt=True), "Server": "breed-compare-preview"}
+        if metodo not in ("GET", "HEAD"):
+            return resposta(405, {**base, "Allow": "GET, HEAD", "Content-Length": "0"}), 405
+        path = unquote(urlsplit(alvo).path) or "/"
+        e = self.arquivos.get(path)
+        status = 200
+        if e is None:
+            e, status = self.arquivos.get("/404.html"), 404
+            if e is None:
+                return resposta(404, {**base, "Content-Length": "0"}), 404
+
+        enc = negociar(headers.get("accept-encoding", "")) if e.comprimivel() else None
+        etag = f'"{e.etag}{"-" + enc if enc else ""}"'
+        h = {**base, "Content-Type": e.ctype, "Cache-Control": "no-cache", "ETag": etag}
+        if e.comprimivel():
+            h["Vary"] = "Accept-Encoding"
+        if status == 200 and etag_confere(headers.get("if-none-match", ""), etag):
+            return resposta(304, h), 304
+        body = e.variante(enc) if enc else e.body
+        if enc:
+            h["Content-Encoding"] = enc
+        h["Content-Length"] = str(len(body))
+        return resposta(status, h, b"" if metodo == "HEAD" else body), status
+
+    async def conexao(self, reader, writer):
+        try:
+            while True:
+                try:
+                    bruto = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                linhas = bruto.decode("latin-1").split("\r\n")
+                try:
+                    metodo, alvo, versao = linhas[0].split(" ", 2)
+                except ValueError:
+                    writer.write(resposta(400, {"Content-Length": "0", "Connection": "close"}))
+                    break
+                headers = {}
+                for linha in linhas[1:]:
+                    k, sep, v = linha.partition(":")
+                    if sep:
+                        headers[k.strip().lower()] = v.strip()
+                out, status = self.responder(metodo, alvo, headers)
+                writer.write(out)
+                await writer.drain()
+                self.requisicoes += 1
+                if self.log:
+                    print(f"{status} {metodo} {alvo}")
+                conn = headers.get("connection", "").lower()
+                if conn == "close" or (versao == "HTTP/1.0" and conn != "keep-alive"):
+                    break
+        finally:
+            writer.close()
+
+# ---- Rebuild (--local) ----
+class Preview:
+    """Renderiza as páginas com base_url local em PREVIEW_DIR e refaz quando as entradas mudam."""
+    def __init__(self, base_url, jobs):
+        import gerar_paginas as gp
+        self.gp = gp
+        self.base_url = base_url
+        self.jobs = jobs
+        self.entradas = ([ROOT/"data"/n for n in gp.WATCH_DATA] + [gp.CSS_MANIFEST, gp.IMG_MANIFEST]
+                         + [ROOT/"templates"/n for n in gp.TEMPLATES])
+        self.vistos = None
+
+    def talvez_build(self):
+        from build_lib import load_site_rules, iter_racas, catalog_path
+        arquivos = self.entradas + [catalog_path()]
+        agora = self.gp._mtimes(arquivos)
+        if agora == self.vistos:
+            return None
+        self.vistos = agora
+        site, rules = load_site_rules()
+        site = {**site, "base_url": self.base_url}
+        self.gp.load_templates()
+        return self.gp.build(site, rules, iter_racas(), PREVIEW_DIR,
+                             incremental=True, jobs=self.jobs)
+
+async def vigiar(arquivos, preview, intervalo):
+    """Relê do disco o que mudou (e refaz o preview) sem bloquear o loop."""
+    while True:
+        await asyncio.sleep(intervalo)
+        try:
+            if preview is not None:
+                rel = await asyncio.to_thread(preview.talvez_build)
+                if rel is not None:
+                    print(f"[preview] rebuild — {rel.summary()}")
+            if await asyncio.to_thread(arquivos.refresh):
+                print(f"[preview] {len(arquivos.entradas)} arquivos em memória (atualizado)")
+        except (ValueError, KeyError, OSError) as e:
+            print(f"[preview] erro no rebuild: {e}")
+
+async def servir(args):
+    raizes = [ROOT]
+    preview = None
+    if args.local:
+        base = f"http://{args.host}:{args.porta}"
+        preview = Preview(base, args.jobs)
+        rel = preview.talvez_build()
+        print(f"[preview] páginas com base_url {base} — {rel.summary()}")
+        raizes = [PREVIEW_DIR, ROOT]
+
+    t0 = time.perf_counter()
+    arquivos = Arquivos(raizes)
+    total = sum(len(e.body) for e in arquivos.entradas.values())
+    print(f"[preview] {len(arquivos.entradas)} arquivos ({total / 2**20:.1f} MB) em memória "
+          f"em {time.perf_counter() - t0:.2f}s; compressão: {'br, ' if brotli else ''}gzip")
+
+    srv = Servidor(arquivos, log=args.log)
+    server = await asyncio.start_server(srv.conexao, args.host, args.porta)
+    print(f"[preview] http://{args.host}:{args.porta}/ (Ctrl+C para sair)")
+    async with server:
+        await asyncio.gather(server.serve_forever(), vigiar(arquivos, preview, args.intervalo))
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor local de preview (em memória, ETag, gzip/br).")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--porta", "-p", type=int, default=8000)
+    ap.add_argument("--local", action="store_true",
+                    help="renderiza as páginas com base_url apontando para este servidor")
+    ap.add_argument("--jobs", "-j", type=int, default=1, metavar="N",
+                    help="processos para o build do --local (0 = nº de CPUs)")
+    ap.add_argument("--intervalo", type=float, default=1.0, metavar="S",
+                    help="intervalo (s) para verificar mudanças no disco")
+    ap.add_argument("--log", action="store_true", help="imprime cada requisição")
+    args = ap.parse_args()
+    try:
+        asyncio.run(servir(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()